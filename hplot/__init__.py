@@ -105,7 +105,10 @@ from .plotting import (
 )
 from .stats import (
     compute_layer_stats,
+    compute_layer_stats_multi,
+    LayerStatsAccumulator,
     compute_layer_pvalues,
+    compute_layer_pvalues_multi,
     gam_group_curves,
     gam_pooled_effect,
     gam_delta_curve,
@@ -126,7 +129,12 @@ from .pathways import (
     pathway_layer_profile,
     pathway_layer_profile_h5ad,
 )
-from ._geometry import border_layers_from_coords
+from ._geometry import (
+    border_layers_from_coords,
+    border_layers_sweep,
+    IncrementalBorderLayers,
+)
+from ._geocache import GeometryCache
 from .catalogs import (
     load_catalog,
     read_gmt,
@@ -149,7 +157,10 @@ __all__ = [
     "build_layer_distance_map",
     "add_border_distance_axis",
     "compute_layer_stats",
+    "compute_layer_stats_multi",
+    "LayerStatsAccumulator",
     "compute_layer_pvalues",
+    "compute_layer_pvalues_multi",
     "gam_group_curves",
     "gam_pooled_effect",
     "gam_delta_curve",
@@ -168,6 +179,9 @@ __all__ = [
     "pathway_layer_profile",
     "pathway_layer_profile_h5ad",
     "border_layers_from_coords",
+    "border_layers_sweep",
+    "IncrementalBorderLayers",
+    "GeometryCache",
     "load_catalog",
     "read_gmt",
     "write_gmt",
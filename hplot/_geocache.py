@@ -0,0 +1,165 @@
+"""Content-addressed on-disk cache for border-layer geometry.
+
+Border layering is deterministic in (coordinates, base mask, graph, region
+parameters), yet ``pp.border_layers`` and ``pathway_layer_profile_h5ad`` are
+re-run with new signatures or targets far more often than the geometry
+changes. :class:`GeometryCache` keys two kinds of entry on a hash of their
+inputs and stores plain ``.npy`` files, so entries are shared across
+processes and sessions:
+
+* graph entries — the spatial graph's edge list, keyed on (coordinates,
+  graph kind and its ``max_edge`` / ``radius`` / ``n_neighbors``);
+* layer entries — ``signed_hops`` and ``signed_um``, keyed on the graph key
+  plus ``is_base`` and every region / cutoff parameter.
+
+The directory is bounded by ``max_bytes``; the least-recently-used entries
+are evicted first (access time is tracked via each entry's mtime).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+# Bump when the meaning of a stored array changes so stale entries never hit.
+_SCHEMA = "hplot-geometry-v1"
+
+
+def _hash_update(h, obj):
+    if isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        h.update(f"{arr.dtype.str}{arr.shape}".encode())
+        h.update(arr.tobytes())
+    else:
+        h.update(repr(obj).encode())
+        h.update(b"\0")
+
+
+def hash_inputs(*parts):
+    """Hex digest over arrays (dtype, shape and bytes) and scalar reprs."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(_SCHEMA.encode())
+    for part in parts:
+        _hash_update(h, part)
+    return h.hexdigest()
+
+
+def graph_key(points, A=None, max_edge=None, graph="delaunay", radius=None,
+              n_neighbors=None):
+    """Cache key of the spatial graph: coordinates plus its source."""
+    points = np.asarray(points, dtype=np.float64)
+    if A is None:
+        if graph == "radius":
+            return hash_inputs("radius", points, float(radius))
+        if graph == "knn":
+            return hash_inputs("knn", points, int(n_neighbors))
+        return hash_inputs("delaunay", points, None if max_edge is None else float(max_edge))
+    from ._geometry import as_graph
+
+    A = as_graph(A)
+    return hash_inputs("precomputed", points, A.indptr, A.indices)
+
+
+class GeometryCache:
+    """Size-bounded LRU directory of ``.npy`` geometry entries.
+
+    Parameters
+    ----------
+    root : str
+        Cache directory (created on first write).
+    max_bytes : int | None
+        Evict least-recently-used entries once the directory exceeds this
+        size. ``None`` disables eviction.
+    """
+
+    def __init__(self, root, max_bytes=4 * 1024 ** 3):
+        self.root = os.fspath(root)
+        self.max_bytes = max_bytes
+
+    def __repr__(self):
+        return f"GeometryCache({self.root!r}, max_bytes={self.max_bytes!r})"
+
+    def _entry(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key):
+        """``{name: array}`` for a stored entry, or ``None`` on a miss."""
+        path = self._entry(key)
+        if not os.path.isdir(path):
+            return None
+        try:
+            out = {f[:-4]: np.load(os.path.join(path, f), allow_pickle=False)
+                   for f in os.listdir(path) if f.endswith(".npy")}
+            os.utime(path)                      # mark as recently used
+        except (OSError, ValueError):           # evicted or half-written by a peer
+            return None
+        return out or None
+
+    def put(self, key, **arrays):
+        """Store ``arrays`` under ``key`` atomically, then enforce the size bound."""
+        path = self._entry(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(path))
+        try:
+            for name, arr in arrays.items():
+                np.save(os.path.join(tmp, f"{name}.npy"), np.asarray(arr),
+                        allow_pickle=False)
+            try:
+                os.rename(tmp, path)
+            except OSError:                     # a peer stored the same key first
+                shutil.rmtree(tmp, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self.evict()
+
+    def _entries(self):
+        if not os.path.isdir(self.root):
+            return []
+        out = []
+        for shard in os.listdir(self.root):
+            sdir = os.path.join(self.root, shard)
+            if not os.path.isdir(sdir):
+                continue
+            for key in os.listdir(sdir):
+                if key.startswith(".tmp-"):
+                    continue
+                path = os.path.join(sdir, key)
+                try:
+                    size = sum(os.path.getsize(os.path.join(path, f))
+                               for f in os.listdir(path))
+                    out.append((os.path.getmtime(path), size, path))
+                except OSError:
+                    continue
+        return out
+
+    def size_bytes(self):
+        """Total bytes held by complete entries."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Drop least-recently-used entries until under ``max_bytes``."""
+        if self.max_bytes is None:
+            return
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Remove every entry."""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def as_cache(cache):
+    """Accept a :class:`GeometryCache`, a directory path, or ``None``."""
+    if cache is None or isinstance(cache, GeometryCache):
+        return cache
+    return GeometryCache(cache)
@@ -21,7 +21,21 @@ import pandas as pd
 # Spatial graph
 # ---------------------------------------------------------------------------
 
-def delaunay_edges(points, max_edge=None):
+def _edge_keys(simplices, n):
+    """Sorted unique int64 keys ``lo * n + hi`` of a triangulation's edges.
+
+    One 1-D ``np.unique`` over int64 keys replaces the row-wise
+    ``unique(axis=0)`` on sorted pairs, and yields the same (lo, hi)
+    lexicographic order.
+    """
+    a, b, c = (simplices[:, i].astype(np.int64) for i in range(3))
+    keys = np.concatenate([np.minimum(a, b) * n + np.maximum(a, b),
+                           np.minimum(a, c) * n + np.maximum(a, c),
+                           np.minimum(b, c) * n + np.maximum(b, c)])
+    return np.unique(keys)
+
+
+def delaunay_edges(points, max_edge=None, tile_size=None, halo=None):
     """Delaunay triangulation edges, optionally pruned by length.
 
     Parameters
@@ -30,6 +44,13 @@ def delaunay_edges(points, max_edge=None):
         Cell centre coordinates.
     max_edge : float | None
         Drop edges longer than this. ``None`` keeps every edge.
+    tile_size : float | None
+        Triangulate overlapping square tiles of this size one at a time
+        instead of the whole slide at once (:func:`_delaunay_edge_keys_tiled`).
+        Needs ``max_edge``; peak memory is then bounded by the largest tile.
+    halo : float | None
+        Initial tile overlap (microns); defaults to ``4 * max_edge`` and is
+        widened per tile where needed for an exact result.
 
     Returns
     -------
@@ -37,16 +58,16 @@ def delaunay_edges(points, max_edge=None):
         Columns ``source``, ``target`` (int) and ``length`` (float), one row
         per unique undirected edge.
     """
-    from scipy.spatial import Delaunay
-
     points = np.asarray(points, dtype=np.float64)
-    tri = Delaunay(points)
-    simplices = tri.simplices.astype(np.int64)
-    pairs = np.concatenate(
-        [simplices[:, [0, 1]], simplices[:, [0, 2]], simplices[:, [1, 2]]], axis=0
-    )
-    pairs = np.unique(np.sort(pairs, axis=1), axis=0)
-    src, dst = pairs[:, 0], pairs[:, 1]
+    n = points.shape[0]
+    if tile_size is not None:
+        keys = _delaunay_edge_keys_tiled(points, max_edge, tile_size, halo)
+    else:
+        from scipy.spatial import Delaunay
+
+        keys = _edge_keys(Delaunay(points).simplices, n)
+    src, dst = keys // n, keys % n
+    del keys
     length = np.linalg.norm(points[src] - points[dst], axis=1)
     if max_edge is not None:
         keep = length < max_edge
@@ -54,6 +75,169 @@ def delaunay_edges(points, max_edge=None):
     return pd.DataFrame({"source": src, "target": dst, "length": length})
 
 
+def _delaunay_edge_keys_tiled(points, max_edge, tile_size, halo=None):
+    """Pruned Delaunay edge keys built tile by tile.
+
+    Each tile is triangulated together with a ``halo`` of surrounding cells;
+    edges of ``max_edge`` or longer are dropped per tile and only edges
+    touching the tile's own cells are kept, as int64 ``lo * n + hi`` keys that
+    are deduplicated once at the end. Every Delaunay edge of the whole set is
+    also Delaunay in a subset holding both endpoints, but the subset may add
+    spurious edges whose would-be witnesses lie outside the window. A local
+    triangle whose circumcircle stays inside the window is a global Delaunay
+    triangle, so a kept edge is certain once it borders such a triangle; if a
+    tile still has uncertain edges its halo is doubled and it is redone. The
+    edge set therefore equals the monolithic one exactly.
+    """
+    from scipy.spatial import Delaunay
+    from scipy.spatial import QhullError
+
+    if max_edge is None:
+        raise ValueError("Tiled Delaunay needs max_edge: only pruned edges are "
+                         "guaranteed to match the whole-slide triangulation.")
+    if tile_size <= 0:
+        raise ValueError(f"tile_size must be positive; got {tile_size!r}.")
+    if halo is None:
+        halo = 4.0 * float(max_edge)
+    n = points.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    keys, order, starts, stops = _tile_index(points, tile_size)
+    slot = {tuple(key): i for i, key in enumerate(keys)}
+    gmin, gmax = points.min(axis=0), points.max(axis=0)
+    max_sq = float(max_edge) ** 2
+
+    chunks = []
+    for i, (tx, ty) in enumerate(keys):
+        core = order[starts[i]:stops[i]]
+        h = float(halo)
+        while True:
+            reach = int(np.ceil(h / tile_size))
+            parts = [order[starts[j]:stops[j]]
+                     for dx in range(-reach, reach + 1) for dy in range(-reach, reach + 1)
+                     if (j := slot.get((tx + dx, ty + dy))) is not None]
+            cand = np.concatenate(parts)
+            lo = points[core].min(axis=0) - h
+            hi = points[core].max(axis=0) + h
+            sub = cand[np.all((points[cand] >= lo) & (points[cand] <= hi), axis=1)]
+            covers = bool(np.all(lo <= gmin) and np.all(hi >= gmax))
+            try:
+                simplices = Delaunay(points[sub]).simplices
+            except (QhullError, ValueError):
+                if covers:
+                    raise
+                h *= 2.0
+                continue
+            tile_keys = _edge_keys(simplices, sub.size)
+            la, lb = tile_keys // sub.size, tile_keys % sub.size
+            in_core = np.isin(sub, core)
+            d = points[sub[la]] - points[sub[lb]]
+            keep = (np.einsum("ij,ij->i", d, d) < max_sq) & (in_core[la] | in_core[lb])
+            if covers:
+                break
+            safe = _circumcircle_inside(points[sub], simplices,
+                                        np.where(lo <= gmin, -np.inf, lo),
+                                        np.where(hi >= gmax, np.inf, hi))
+            certain = _edge_keys(simplices[safe], sub.size)
+            if np.isin(tile_keys[keep], certain, assume_unique=True).all():
+                break
+            h *= 2.0
+        a, b = sub[la[keep]], sub[lb[keep]]
+        chunks.append(np.minimum(a, b) * n + np.maximum(a, b))
+    if not chunks:
+        return np.zeros(0, dtype=np.int64)
+    return np.unique(np.concatenate(chunks))
+
+
+def _circumcircle_inside(points, simplices, lo, hi):
+    """Triangles whose circumcircle lies within the box ``[lo, hi]``."""
+    a = points[simplices[:, 0]]
+    b = points[simplices[:, 1]] - a
+    c = points[simplices[:, 2]] - a
+    bb = np.einsum("ij,ij->i", b, b)
+    cc = np.einsum("ij,ij->i", c, c)
+    det = 2.0 * (b[:, 0] * c[:, 1] - b[:, 1] * c[:, 0])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = np.stack([(c[:, 1] * bb - b[:, 1] * cc) / det,
+                      (b[:, 0] * cc - c[:, 0] * bb) / det], axis=1)
+    r = np.sqrt(np.einsum("ij,ij->i", u, u))[:, None]
+    centre = a + u
+    return np.all((centre - r >= lo) & (centre + r <= hi), axis=1)
+
+
+def _edge_table(points, src, dst):
+    src = src.astype(np.int64, copy=False)
+    dst = dst.astype(np.int64, copy=False)
+    length = np.linalg.norm(points[src] - points[dst], axis=1)
+    return pd.DataFrame({"source": src, "target": dst, "length": length})
+
+
+def radius_edges(points, radius):
+    """Edges between every pair of cells at most ``radius`` apart.
+
+    One ``cKDTree.query_pairs`` call in C, returned as an edge table like
+    :func:`delaunay_edges` (``source < target``, lexicographic order).
+    """
+    from scipy.spatial import cKDTree
+
+    points = np.asarray(points, dtype=np.float64)
+    if radius is None or radius <= 0:
+        raise ValueError(f"radius must be positive; got {radius!r}.")
+    n = points.shape[0]
+    if n < 2:
+        return _edge_table(points, np.zeros(0, np.int64), np.zeros(0, np.int64))
+    pairs = cKDTree(points).query_pairs(float(radius), output_type="ndarray")
+    keys = np.sort(pairs[:, 0].astype(np.int64) * n + pairs[:, 1])
+    del pairs
+    return _edge_table(points, keys // n, keys % n)
+
+
+def knn_edges(points, n_neighbors, workers=-1):
+    """Symmetric k-nearest-neighbour edges (union of both directions).
+
+    The neighbour query runs on ``workers`` threads (``-1`` all cores); each
+    cell's own index is dropped even when duplicated coordinates push it out
+    of the first column.
+    """
+    from scipy.spatial import cKDTree
+
+    points = np.asarray(points, dtype=np.float64)
+    n = points.shape[0]
+    if n_neighbors is None or int(n_neighbors) < 1:
+        raise ValueError(f"n_neighbors must be >= 1; got {n_neighbors!r}.")
+    n_neighbors = int(n_neighbors)
+    if n < 2:
+        return _edge_table(points, np.zeros(0, np.int64), np.zeros(0, np.int64))
+    _, nbr = cKDTree(points).query(points, k=min(n_neighbors + 1, n), workers=workers)
+    rows = np.broadcast_to(np.arange(n)[:, None], nbr.shape)
+    keep = nbr != rows
+    keep &= np.cumsum(keep, axis=1) <= n_neighbors
+    a, b = rows[keep].astype(np.int64), nbr[keep].astype(np.int64)
+    del rows, keep, nbr
+    keys = np.unique(np.minimum(a, b) * n + np.maximum(a, b))
+    return _edge_table(points, keys // n, keys % n)
+
+
+_GRAPHS = ("delaunay", "radius", "knn")
+
+
+def spatial_edges(points, graph="delaunay", *, max_edge=25.0, radius=None,
+                  n_neighbors=None, delaunay_tile_size=None):
+    """Edge table of the ``graph`` spatial graph built from coordinates.
+
+    ``"delaunay"`` prunes the triangulation at ``max_edge``
+    (:func:`delaunay_edges`), ``"radius"`` links cells at most ``radius``
+    apart (:func:`radius_edges`) and ``"knn"`` is the symmetric
+    ``n_neighbors``-nearest-neighbour graph (:func:`knn_edges`).
+    """
+    _check_graph(graph, radius, n_neighbors)
+    if graph == "radius":
+        return radius_edges(points, radius)
+    if graph == "knn":
+        return knn_edges(points, n_neighbors)
+    return delaunay_edges(points, max_edge=max_edge, tile_size=delaunay_tile_size)
+
+
 def adjacency_from_edges(n, edges):
     """Symmetric 0/1 CSR adjacency (no self-loops) from an edge table."""
     from scipy.sparse import csr_matrix
@@ -83,8 +267,108 @@ def binarize_adjacency(conn):
     return A
 
 
+def _index_dtype(bound):
+    return np.int32 if bound < np.iinfo(np.int32).max else np.int64
+
+
+class SpatialGraph:
+    """Structure-only symmetric graph: CSR ``indptr``/``indices`` and no data.
+
+    Indices are int32 whenever the graph fits, and :func:`as_graph` reuses the
+    arrays of an already-clean scipy CSR matrix instead of copying them, so a
+    whole-slide graph costs one set of index arrays. Every routine in this
+    module accepts either a ``SpatialGraph`` or a scipy sparse matrix.
+    """
+
+    __slots__ = ("indptr", "indices")
+
+    def __init__(self, indptr, indices):
+        self.indptr = indptr
+        self.indices = indices
+
+    def __repr__(self):
+        return f"SpatialGraph(n={self.n}, nnz={self.nnz}, dtype={self.indices.dtype})"
+
+    @property
+    def n(self):
+        return self.indptr.size - 1
+
+    @property
+    def shape(self):
+        return (self.n, self.n)
+
+    @property
+    def nnz(self):
+        return int(self.indptr[-1])
+
+    @classmethod
+    def empty(cls, n):
+        return cls(np.zeros(n + 1, dtype=np.int32), np.zeros(0, dtype=np.int32))
+
+    def rows(self):
+        """Row index of every stored entry (an ``nnz``-length temporary)."""
+        return np.repeat(np.arange(self.n, dtype=self.indices.dtype),
+                         np.diff(self.indptr))
+
+    def to_csr(self):
+        """Boolean scipy CSR sharing this graph's index arrays."""
+        from scipy.sparse import csr_matrix
+
+        return csr_matrix((np.ones(self.nnz, dtype=bool), self.indices, self.indptr),
+                          shape=self.shape, copy=False)
+
+
+def as_graph(A):
+    """Coerce a sparse connectivity matrix to a :class:`SpatialGraph`.
+
+    Every stored entry is an edge whatever its weight, and self-loops are
+    dropped, exactly as in :func:`binarize_adjacency`. Without self-loops and
+    with int32 indices (as squidpy writes them) the CSR arrays are used as-is,
+    without a copy. ``A`` is trusted to be symmetric.
+    """
+    from scipy.sparse import csr_matrix, issparse
+
+    if isinstance(A, SpatialGraph):
+        return A
+    if not (issparse(A) and A.format == "csr"):
+        A = csr_matrix(A)
+    n = A.shape[0]
+    indptr, indices = A.indptr, A.indices
+    structure = SpatialGraph(indptr, indices)
+    if structure.to_csr().diagonal().any():     # structural, so stored zeros count
+        rows = structure.rows()
+        keep = rows != indices
+        indices = indices[keep]
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(rows[keep], minlength=n))])
+    return SpatialGraph(indptr.astype(_index_dtype(indptr[-1]), copy=False),
+                        indices.astype(_index_dtype(n), copy=False))
+
+
+def graph_from_edges(n, edges):
+    """:class:`SpatialGraph` from an edge table (same graph as :func:`adjacency_from_edges`)."""
+    if n == 0 or len(edges) == 0:
+        return SpatialGraph.empty(n)
+    idx = _index_dtype(n)
+    s = edges["source"].to_numpy(dtype=idx)
+    t = edges["target"].to_numpy(dtype=idx)
+    rows = np.concatenate([s, t])
+    cols = np.concatenate([t, s])
+    del s, t
+    order = np.argsort(rows, kind="stable")
+    indices = cols[order]
+    del cols, order
+    indptr = np.zeros(n + 1, dtype=_index_dtype(rows.size))
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return SpatialGraph(indptr, indices)
+
+
 def _khop_reachability(A, k):
-    """``(A + I)^k`` binarised: k-hop reachability with self-loops."""
+    """``(A + I)^k`` binarised: k-hop reachability with self-loops.
+
+    Materialises the full reachability matrix, whose fill-in grows roughly
+    quadratically with ``k``; kept for small graphs and as the reference for
+    :func:`khop_counts`, which the pipeline uses instead.
+    """
     from scipy.sparse import eye
 
     n = A.shape[0]
@@ -97,6 +381,69 @@ def _khop_reachability(A, k):
     return Mk
 
 
+def khop_counts(A, is_base, k, block_size=4096):
+    """Per-cell k-hop neighbourhood size and base-cell count.
+
+    Equivalent to ``Mk @ 1`` and ``Mk @ is_base`` for ``Mk`` from
+    :func:`_khop_reachability`, but ``Mk`` is never formed: the k-hop balls of
+    ``block_size`` cells at a time are grown as a boolean ``(block, N)`` sparse
+    frontier, so peak memory is ``block_size`` times the ball size rather than
+    ``N`` times it.
+
+    Parameters
+    ----------
+    A : SpatialGraph | scipy.sparse matrix
+        Symmetric adjacency (see :func:`as_graph`).
+    is_base : (N,) or (N, C) bool array-like
+        Base-compartment indicator, or one column per compartment; all
+        columns are counted in the same sparse product.
+    k : int
+        Neighbourhood radius in hops (the cell itself is always included;
+        ``k <= 1`` means the direct neighbours, matching ``_khop_reachability``).
+    block_size : int
+        Number of ball centres expanded per sparse product.
+
+    Returns
+    -------
+    (nn, b) : tuple[np.ndarray, np.ndarray]
+        ``int64`` neighbourhood sizes ``(N,)`` and base-cell counts, shaped
+        like ``is_base``.
+    """
+    A = as_graph(A)
+    n = A.n
+    is_base = np.asarray(is_base, dtype=bool)
+    nn = np.ones(n, dtype=np.int64)
+    b = is_base.astype(np.int64)
+    if n == 0:
+        return nn, b
+    # bool products OR rather than add, so entries stay 0/1 without overflow;
+    # X | X @ A grows the ball by one hop without forming A + I
+    M = A.to_csr()
+    base_idx = is_base.astype(np.int64)
+    block_size = max(int(block_size), 1)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        X = _khop_balls(M, np.arange(start, stop, dtype=A.indices.dtype), k)
+        nn[start:stop] = np.diff(X.indptr)
+        b[start:stop] = np.asarray(X @ base_idx).reshape(b[start:stop].shape)
+    return nn, b
+
+
+def _khop_balls(M, centres, k):
+    """Boolean ``(len(centres), N)`` CSR: row ``i`` is the k-hop ball of ``centres[i]``.
+
+    ``M`` is the boolean adjacency from :meth:`SpatialGraph.to_csr`.
+    """
+    from scipy.sparse import csr_matrix
+
+    m = centres.size
+    X = csr_matrix((np.ones(m, dtype=bool), centres,
+                    np.arange(m + 1, dtype=centres.dtype)), shape=(m, M.shape[0]))
+    for _ in range(max(k, 1)):    # k <= 1 both mean A + I, as in Mk
+        X = (X + X @ M).tocsr()
+    return X
+
+
 # ---------------------------------------------------------------------------
 # Base region / border / distance
 # ---------------------------------------------------------------------------
@@ -107,49 +454,416 @@ def base_region_mask(Mk, is_base, n_min, ratio):
     ones = np.ones_like(is_base)
     b = np.asarray(Mk @ is_base).ravel()
     nn = np.asarray(Mk @ ones).ravel()
-    safe = np.maximum(nn, 1.0)
-    return (nn >= n_min) & (b / safe >= ratio)
+    return region_from_counts(nn, b, n_min, ratio)
+
+
+def region_from_counts(nn, b, n_min, ratio):
+    """:func:`base_region_mask` thresholding on precomputed k-hop counts.
+
+    ``nn`` and ``b`` are the outputs of :func:`khop_counts`; the ratio is taken
+    in float32 exactly as ``base_region_mask`` does on ``Mk`` products. The
+    threshold is cast to float32 too, so a numpy-float ``ratio`` compares the
+    same way as a Python float under NumPy 2's promotion rules.
+    """
+    nn = np.asarray(nn, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    safe = np.maximum(nn, np.float32(1.0))
+    return (nn >= n_min) & (b / safe >= np.float32(ratio))
 
 
 def border_mask(A, is_region):
     """Base-region cells that have at least one non-base-region neighbour."""
+    A = as_graph(A)
     is_region = np.asarray(is_region, dtype=bool)
-    non_region = 1.0 - is_region.astype(np.float32)
-    cnt = np.asarray(A @ non_region).ravel()
-    return is_region & (cnt > 0)
+    rows = np.flatnonzero(is_region)
+    out = np.zeros_like(is_region)
+    out[rows] = _any_neighbour(A, rows, ~is_region)
+    return out
+
+
+def _any_neighbour(A, rows, flag):
+    """For each of ``rows``, whether any neighbour has ``flag`` set.
+
+    ``flag`` is a per-cell boolean array, or a callable mapping neighbour
+    indices to booleans so a local caller need not build a full-size mask.
+    """
+    nbr = _csr_gather(A.indptr, A.indices, rows)
+    ends = np.cumsum(A.indptr[rows + 1] - A.indptr[rows])
+    hit = flag(nbr) if callable(flag) else flag[nbr]
+    # running count of flagged neighbours, differenced per row
+    csum = np.concatenate([[0], np.cumsum(hit, dtype=np.int64)])
+    return csum[ends] > csum[np.concatenate([[0], ends[:-1]])]
 
 
-def border_hops(A, border):
+def _csr_gather(indptr, indices, rows):
+    """Concatenated neighbour lists of ``rows`` (with repeats), no Python loop."""
+    starts = indptr[rows]
+    lens = indptr[rows + 1] - starts
+    total = int(lens.sum())
+    if total == 0:
+        return indices[:0]
+    offs = np.repeat(starts - np.cumsum(lens) + lens, lens)
+    return indices[offs + np.arange(total, dtype=offs.dtype)]
+
+
+def multi_source_bfs(indptr, indices, sources, max_hops=None, limit=None):
+    """Level-synchronous multi-source BFS over raw CSR arrays.
+
+    Parameters
+    ----------
+    indptr, indices : np.ndarray
+        CSR structure of a symmetric graph (``data`` is never read).
+    sources : (N,) bool array-like or int array-like
+        Source mask, or source node indices.
+    max_hops : int | None
+        Stop expanding after this many levels; nodes further away are left
+        at ``inf`` as if unreachable. ``None`` explores the whole component.
+    limit : (N,) array-like | None
+        Per-node cutoff: a node is only labelled (and expanded) at a level
+        ``<= limit[node]``, otherwise it stays ``inf``. The search stops once
+        no frontier node is left.
+
+    Returns
+    -------
+    np.ndarray
+        float64 hop distance to the nearest source, ``inf`` when unreached.
+    """
+    n = indptr.size - 1
+    sources = np.asarray(sources)
+    if sources.dtype == bool:
+        sources = np.flatnonzero(sources)
+    dist = np.full(n, np.inf)
+    frontier = np.unique(sources.astype(np.int64))
+    dist[frontier] = 0.0
+    if limit is not None:
+        limit = np.asarray(limit, dtype=np.float64)
+    level = 0
+    while frontier.size and (max_hops is None or level < max_hops):
+        nbr = _csr_gather(indptr, indices, frontier)
+        nbr = np.unique(nbr[np.isinf(dist[nbr])])
+        level += 1
+        if limit is not None:
+            nbr = nbr[limit[nbr] >= level]
+        dist[nbr] = level
+        frontier = nbr
+    return dist
+
+
+def border_hops(A, border, max_hops=None, limit=None):
     """Unweighted shortest hop count from every node to the nearest border cell.
 
-    Multi-source BFS via a virtual source node connected to all border cells.
-    Unreachable cells return ``inf``.
+    Multi-source BFS (:func:`multi_source_bfs`) straight on ``A``'s CSR
+    arrays, O(V + E) with no copy of ``A``. Unreachable cells, and cells more
+    than ``max_hops`` (or their own ``limit``) hops away when a cutoff is
+    given, return ``inf``.
+    """
+    A = as_graph(A)
+    border = np.asarray(border, dtype=bool)
+    if not border.any():
+        return np.full(A.n, np.inf)
+    return multi_source_bfs(A.indptr, A.indices, border, max_hops=max_hops,
+                            limit=limit)
+
+
+def _hop_limit(region, max_hops=None, min_layer=None, max_layer=None):
+    """Per-cell BFS cutoff for the layer window ``[min_layer, max_layer]``.
+
+    Every region/non-region boundary runs through a border cell, so the
+    shortest hop path from the border to an inside cell stays inside the
+    region and one to an outside cell stays outside. Capping region cells at
+    ``-min_layer`` hops and the rest at ``max_layer`` therefore leaves every
+    in-window hop count exact. ``None`` when no window is set.
     """
-    from scipy.sparse import csr_matrix, hstack, vstack
-    from scipy.sparse.csgraph import shortest_path
+    if min_layer is None and max_layer is None:
+        return None
+    cap_in = np.inf if min_layer is None else max(-float(min_layer), 0.0)
+    cap_out = np.inf if max_layer is None else max(float(max_layer), 0.0)
+    if max_hops is not None:
+        cap_in, cap_out = min(cap_in, max_hops), min(cap_out, max_hops)
+    return np.where(np.asarray(region, dtype=bool), cap_in, cap_out)
+
+
+def _apply_window(signed_um, signed_hops, min_layer=None, max_layer=None):
+    """Blank (``nan``) cells whose signed layer falls outside the window."""
+    out = np.zeros(signed_hops.shape, dtype=bool)
+    with np.errstate(invalid="ignore"):
+        if min_layer is not None:
+            out |= signed_hops < min_layer
+        if max_layer is not None:
+            out |= signed_hops > max_layer
+    signed_um[out] = np.nan
+    signed_hops[out] = np.nan
+    return signed_um, signed_hops
+
+
+def geodesic_border_distance(points, A, border, max_um=None):
+    """Graph-geodesic micron distance from every node to the nearest border cell.
+
+    One multi-source Dijkstra over ``A`` with every edge weighted by its
+    Euclidean length (float32 weights), so the micron axis follows the same
+    graph as the hop layers instead of cutting across lumens and folds.
+
+    Parameters
+    ----------
+    points : (N, 2) array-like
+        Cell centre coordinates (microns).
+    A : SpatialGraph | scipy.sparse matrix
+        Symmetric adjacency.
+    border : (N,) bool array-like
+        Source cells.
+    max_um : float | None
+        Stop the search at this distance; cells further away return ``inf``.
+
+    Returns
+    -------
+    np.ndarray
+        float64 path length to the nearest border cell, ``inf`` when unreached.
+    """
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra
 
+    A = as_graph(A)
+    points = np.asarray(points, dtype=np.float64)
     border = np.asarray(border, dtype=bool)
-    n = A.shape[0]
     if not border.any():
-        return np.full(n, np.inf)
-    idx = np.where(border)[0].astype(np.int32)
-    top = csr_matrix((np.ones(idx.size, dtype=np.uint8),
-                      (np.zeros(idx.size, dtype=np.int32), idx)),
-                     shape=(1, n), dtype=np.uint8)
-    aug = vstack([hstack([A, top.T.tocsr()]),
-                  hstack([top, csr_matrix((1, 1), dtype=np.uint8)])]).tocsr()
-    d = shortest_path(aug, method="D", directed=False, indices=n, unweighted=True)[:n]
-    d = np.where(np.isinf(d), np.inf, np.maximum(d - 1.0, 0.0))
-    d[border] = 0.0
-    return d
+        return np.full(A.n, np.inf)
+    rows = A.rows()
+    length = np.linalg.norm(points[rows] - points[A.indices], axis=1).astype(np.float32)
+    del rows
+    # zero-length edges (duplicate centroids) would vanish from the graph
+    length = np.maximum(length, np.finfo(np.float32).tiny)
+    W = csr_matrix((length, A.indices, A.indptr), shape=A.shape)
+    return dijkstra(W, directed=False, indices=np.flatnonzero(border),
+                    min_only=True, limit=np.inf if max_um is None else float(max_um))
 
 
 # ---------------------------------------------------------------------------
 # Public entry point
 # ---------------------------------------------------------------------------
 
+def _signed_layers(points, region, border, hops, border_points, dist_um=None,
+                   edge_um=None):
+    """Apply the sign convention to ``hops`` and the micron distance.
+
+    ``points``/``region``/``border``/``hops`` describe the cells to report;
+    ``border_points`` are the border-cell centroids to measure against with a
+    KD-tree, unless an unsigned ``dist_um`` (e.g. geodesic) is supplied. Only
+    cells with a finite hop count are queried. When every graph edge is at
+    most ``edge_um`` long, a cell ``h`` hops out has a border centroid within
+    ``h * edge_um``, which bounds the search (``distance_upper_bound``); any
+    miss is re-queried unbounded, so the distances are exact either way.
+    """
+    from scipy.spatial import cKDTree
+
+    signed_hops = hops.copy()
+    signed_hops[region] *= -1.0
+    live = np.isfinite(hops)
+    signed_hops[~live] = np.nan
+
+    signed_um = np.full(points.shape[0], np.nan, dtype=float)
+    if len(border_points):
+        if dist_um is None:
+            dist_um = np.full(points.shape[0], np.inf)
+            rows = np.flatnonzero(live)
+            if rows.size:
+                tree = cKDTree(border_points)
+                bound = np.inf
+                if edge_um is not None:
+                    bound = float(hops[rows].max()) * float(edge_um) * (1 + 1e-9)
+                d, _ = tree.query(points[rows], k=1,
+                                  distance_upper_bound=max(bound, 1e-12))
+                miss = np.isinf(d)
+                if miss.any():
+                    d[miss], _ = tree.query(points[rows[miss]], k=1)
+                dist_um[rows] = d
+        signed_um = np.where(np.isfinite(dist_um), dist_um, np.nan).astype(float)
+        signed_um[region] *= -1.0
+        signed_um[border] = 0.0
+    signed_um[~np.isfinite(signed_hops)] = np.nan
+    return signed_um, signed_hops
+
+
+def _resolve_n_jobs(n_jobs, n_tasks):
+    """joblib-style worker count: ``None``/1 serial, negatives count from cpus."""
+    import os
+
+    if n_jobs is None:
+        return 1
+    n_jobs = int(n_jobs)
+    if n_jobs == 0:
+        raise ValueError("n_jobs=0 is invalid; use 1 for serial or -1 for all cores.")
+    if n_jobs < 0:
+        n_jobs = max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+    return max(min(n_jobs, n_tasks), 1)
+
+
+def _check_distance(distance):
+    """``True`` for the geodesic micron axis, ``False`` for Euclidean."""
+    if distance not in ("euclidean", "geodesic"):
+        raise ValueError(f"Unknown distance={distance!r}; use 'euclidean' or 'geodesic'.")
+    return distance == "geodesic"
+
+
+def _check_graph(graph, radius=None, n_neighbors=None):
+    """Validate the coordinate-graph choice before any work is done."""
+    if graph not in _GRAPHS:
+        raise ValueError(f"Unknown graph={graph!r}; use one of {_GRAPHS}.")
+    if graph == "radius" and (radius is None or radius <= 0):
+        raise ValueError(f"graph='radius' needs a positive radius; got {radius!r}.")
+    if graph == "knn" and (n_neighbors is None or int(n_neighbors) < 1):
+        raise ValueError(f"graph='knn' needs n_neighbors >= 1; got {n_neighbors!r}.")
+
+
+def _edge_bound(graph, max_edge=None, radius=None):
+    """Longest possible edge (microns) of a coordinate graph, if known."""
+    if graph == "delaunay":
+        return max_edge
+    if graph == "radius":
+        return radius
+    return None
+
+
+def _tile_index(points, tile_size):
+    """Cells grouped by square tile: ``(keys, order, starts, stops)``.
+
+    ``order[starts[i]:stops[i]]`` are the cells of tile ``keys[i]``, an
+    ``(ix, iy)`` pair of integer tile coordinates.
+    """
+    lo = points.min(axis=0)
+    cell = np.floor((points - lo) / tile_size).astype(np.int64)
+    width = int(cell[:, 1].max()) + 1
+    flat = cell[:, 0] * width + cell[:, 1]
+    order = np.argsort(flat, kind="stable")
+    flat_sorted = flat[order]
+    uniq, starts = np.unique(flat_sorted, return_index=True)
+    stops = np.append(starts[1:], flat_sorted.size)
+    keys = np.stack([uniq // width, uniq % width], axis=1)
+    return keys, order, starts, stops
+
+
+def border_layers_tiled(points, is_base, *, tile_size, max_hops, halo=None,
+                        k=2, n_min=10, ratio=0.2, max_edge=25.0,
+                        reconcile=False, distance="euclidean", max_um=None):
+    """Tile-by-tile :func:`border_layers_from_coords` for whole-slide mosaics.
+
+    The slide is cut into ``tile_size`` squares; each tile is triangulated,
+    region-called and BFS'd together with a ``halo`` of surrounding cells, and
+    only its own (core) cells are written back. A path of ``h`` pruned Delaunay
+    hops spans at most ``h * max_edge`` microns, so with the default halo of
+    ``(k + max_hops + 1) * max_edge`` the core answer equals the monolithic
+    one run with the same ``max_hops`` cutoff. Peak memory is bounded by the
+    largest tile plus halo.
+
+    Parameters
+    ----------
+    points, is_base, k, n_min, ratio, max_edge, distance, max_um
+        As in :func:`border_layers_from_coords`. A geodesic path to a border
+        within ``max_hops`` hops is at most ``max_hops * max_edge`` long, so it
+        also stays inside the halo.
+    tile_size : float
+        Tile edge length (microns).
+    max_hops : int
+        Hop cutoff; cells further from any border are left ``nan``.
+    halo : float | None
+        Halo width (microns); defaults to ``(k + max_hops + 1) * max_edge``.
+    reconcile : bool
+        Seam-reconciliation pass: first stitch the per-core region and border
+        calls, then re-run each tile's BFS and KD-tree from the stitched border,
+        so halo cells never act on a tile-local border call.
+
+    Returns
+    -------
+    (signed_um, signed_hops) : tuple[np.ndarray, np.ndarray]
+        Same convention as :func:`border_layers_from_coords`.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    is_base = np.asarray(is_base, dtype=bool)
+    n = points.shape[0]
+    if max_hops is None:
+        raise ValueError("Tiled border layers need a finite max_hops cutoff.")
+    if max_edge is None:
+        raise ValueError("Tiled border layers need max_edge: it bounds how far a "
+                         "kept hop reaches, and so the halo each tile needs.")
+    if tile_size is None or tile_size <= 0:
+        raise ValueError(f"tile_size must be positive; got {tile_size!r}.")
+    if halo is None:
+        halo = (k + max_hops + 1) * float(max_edge)
+    geodesic = _check_distance(distance)
+
+    def _dist(A, sub, bor):
+        if not geodesic:
+            return None
+        return geodesic_border_distance(points[sub], A, bor, max_um=max_um)
+
+    signed_um = np.full(n, np.nan, dtype=float)
+    signed_hops = np.full(n, np.nan, dtype=float)
+    if n == 0:
+        return signed_um, signed_hops
+
+    keys, order, starts, stops = _tile_index(points, tile_size)
+    slot = {tuple(key): i for i, key in enumerate(keys)}
+    reach = int(np.ceil(halo / tile_size))
+
+    def _tiles():
+        """Yield ``(core, sub, core_local)`` global/local index arrays per tile."""
+        for i, (tx, ty) in enumerate(keys):
+            core = order[starts[i]:stops[i]]
+            parts = []
+            for dx in range(-reach, reach + 1):
+                for dy in range(-reach, reach + 1):
+                    j = slot.get((tx + dx, ty + dy))
+                    if j is not None:
+                        parts.append(order[starts[j]:stops[j]])
+            cand = np.concatenate(parts)
+            box_lo = points[core].min(axis=0) - halo
+            box_hi = points[core].max(axis=0) + halo
+            inside = np.all((points[cand] >= box_lo) & (points[cand] <= box_hi), axis=1)
+            sub = np.sort(cand[inside])
+            yield core, sub, np.searchsorted(sub, core)
+
+    def _tile_graph(sub):
+        if sub.size < 4:    # too few cells to triangulate: isolated, never region
+            return SpatialGraph.empty(sub.size)
+        return graph_from_edges(sub.size, delaunay_edges(points[sub], max_edge=max_edge))
+
+    if reconcile:
+        region = np.zeros(n, dtype=bool)
+        border = np.zeros(n, dtype=bool)
+        for core, sub, loc in _tiles():
+            A = _tile_graph(sub)
+            nn, b = khop_counts(A, is_base[sub], k)
+            reg = region_from_counts(nn, b, n_min, ratio)
+            region[core] = reg[loc]
+            border[core] = border_mask(A, reg)[loc]
+        for core, sub, loc in _tiles():
+            A = _tile_graph(sub)
+            hops = border_hops(A, border[sub], max_hops=max_hops)
+            dist = _dist(A, sub, border[sub])
+            signed_um[core], signed_hops[core] = _signed_layers(
+                points[core], region[core], border[core], hops[loc],
+                points[sub[border[sub]]], None if dist is None else dist[loc])
+        return signed_um, signed_hops
+
+    for core, sub, loc in _tiles():
+        A = _tile_graph(sub)
+        nn, b = khop_counts(A, is_base[sub], k)
+        reg = region_from_counts(nn, b, n_min, ratio)
+        bor = border_mask(A, reg)
+        hops = border_hops(A, bor, max_hops=max_hops)
+        dist = _dist(A, sub, bor)
+        signed_um[core], signed_hops[core] = _signed_layers(
+            points[core], reg[loc], bor[loc], hops[loc], points[sub[bor]],
+            None if dist is None else dist[loc])
+    return signed_um, signed_hops
+
+
 def border_layers_from_coords(points, is_base, *, A=None, k=2, n_min=10,
-                              ratio=0.2, max_edge=25.0):
+                              ratio=0.2, max_edge=25.0, max_hops=None,
+                              min_layer=None, max_layer=None,
+                              tile_size=None, tile_halo=None,
+                              reconcile_seams=False, distance="euclidean",
+                              max_um=None, graph="delaunay", radius=None,
+                              n_neighbors=None, delaunay_tile_size=None, cache=None):
     """Signed border-hop layer and signed micron distance for every cell.
 
     Parameters
@@ -159,13 +873,46 @@ def border_layers_from_coords(points, is_base, *, A=None, k=2, n_min=10,
     is_base : (N,) bool array-like
         Whether each cell belongs to the base compartment (e.g. tumour).
     A : scipy.sparse matrix | None
-        Precomputed symmetric 0/1 adjacency. When ``None`` a Delaunay graph is
-        built from ``points`` (pruned at ``max_edge``).
+        Precomputed symmetric 0/1 adjacency. When ``None`` the ``graph``
+        spatial graph is built from ``points``.
     k, n_min, ratio : int, int, float
         Neighbourhood radius (hops), minimum neighbourhood size, and minimum
         base fraction used to call the base *region*.
     max_edge : float
         Delaunay edge-length cap (microns); ignored when ``A`` is supplied.
+    max_hops : int | None
+        Stop the border BFS after this many hops; cells further away are
+        reported as unreachable (``nan``).
+    min_layer, max_layer : int | None
+        Analysis window on ``signed_hops`` (e.g. ``-7`` and ``15``). The BFS
+        stops at ``-min_layer`` hops inside the region and at ``max_layer``
+        hops outside, and only in-window cells get a micron distance; cells
+        outside the window are ``nan`` in both outputs. In-window values are
+        unchanged.
+    tile_size, tile_halo, reconcile_seams
+        When ``tile_size`` is set, run :func:`border_layers_tiled` (Delaunay
+        graph only; requires ``max_hops`` and ``max_edge``) instead of one
+        whole-slide pass.
+    distance : {"euclidean", "geodesic"}
+        ``"euclidean"`` measures ``signed_um`` straight to the nearest border
+        centroid (KD-tree); ``"geodesic"`` runs one multi-source Dijkstra over
+        the length-weighted graph (:func:`geodesic_border_distance`).
+    max_um : float | None
+        Geodesic search cutoff (microns); cells further away get ``nan``
+        ``signed_um``. Ignored for ``"euclidean"``.
+    graph : {"delaunay", "radius", "knn"}
+        Graph built when ``A`` is ``None``: Delaunay pruned at ``max_edge``,
+        all pairs within ``radius`` microns, or the symmetric
+        ``n_neighbors``-nearest-neighbour graph (:func:`spatial_edges`).
+    radius, n_neighbors : float | None, int | None
+        Parameters of the ``"radius"`` and ``"knn"`` graphs.
+    delaunay_tile_size : float | None
+        Build the (whole-slide) Delaunay graph tile by tile to bound its peak
+        memory; the edge set is unchanged (see :func:`delaunay_edges`).
+    cache : hplot.GeometryCache | str | None
+        On-disk geometry cache (or its directory). The Delaunay edge list and
+        the signed outputs are stored under a hash of every input above, so a
+        repeat call with the same geometry skips the computation entirely.
 
     Returns
     -------
@@ -175,34 +922,710 @@ def border_layers_from_coords(points, is_base, *, A=None, k=2, n_min=10,
         distance to the nearest border-cell centroid with the same sign
         convention.
     """
-    from scipy.spatial import cKDTree
+    from ._geocache import as_cache, graph_key, hash_inputs
 
     points = np.asarray(points, dtype=np.float64)
     is_base = np.asarray(is_base, dtype=bool)
     n = points.shape[0]
 
+    if tile_size is not None and (A is not None or graph != "delaunay"):
+        raise ValueError("tile_size builds per-tile Delaunay graphs; it cannot "
+                         "be combined with a precomputed A or another graph.")
+    if A is not None:
+        A = as_graph(A)
+        edge_um = None
+    else:
+        _check_graph(graph, radius, n_neighbors)
+        edge_um = _edge_bound(graph, max_edge, radius)
+
+    geodesic = _check_distance(distance)
+    cache = as_cache(cache)
+    if cache is not None:
+        gkey = graph_key(points, A, max_edge=max_edge, graph=graph, radius=radius,
+                         n_neighbors=n_neighbors)
+        lkey = hash_inputs("layers", gkey, is_base, int(k), int(n_min), float(ratio),
+                           max_hops, tile_size, tile_halo, bool(reconcile_seams),
+                           distance, max_um if geodesic else None,
+                           min_layer, max_layer)
+        hit = cache.get(lkey)
+        if hit is not None:
+            return hit["signed_um"], hit["signed_hops"]
+
+    if tile_size is not None:
+        if min_layer is not None and max_layer is not None:
+            # a closed window bounds every hop count that is kept
+            reach = int(max(-min_layer, max_layer, 0))
+            max_hops = reach if max_hops is None else min(max_hops, reach)
+        out = border_layers_tiled(points, is_base, tile_size=tile_size,
+                                  max_hops=max_hops, halo=tile_halo, k=k,
+                                  n_min=n_min, ratio=ratio, max_edge=max_edge,
+                                  reconcile=reconcile_seams, distance=distance,
+                                  max_um=max_um)
+    else:
+        if A is None:
+            hit = cache.get(gkey) if cache is not None else None
+            if hit is not None:
+                edges = pd.DataFrame({"source": hit["edges"][:, 0],
+                                      "target": hit["edges"][:, 1]})
+            else:
+                edges = spatial_edges(points, graph, max_edge=max_edge,
+                                      radius=radius, n_neighbors=n_neighbors,
+                                      delaunay_tile_size=delaunay_tile_size)
+                if cache is not None:
+                    cache.put(gkey, edges=edges[["source", "target"]].to_numpy(np.int32))
+            A = graph_from_edges(n, edges)
+
+        nn, b = khop_counts(A, is_base, k)
+        region = region_from_counts(nn, b, n_min, ratio)
+        border = border_mask(A, region)
+        hops = border_hops(A, border, max_hops=max_hops,
+                           limit=_hop_limit(region, max_hops, min_layer, max_layer))
+        dist = (geodesic_border_distance(points, A, border, max_um=max_um)
+                if geodesic else None)
+        out = _signed_layers(points, region, border, hops, points[border], dist,
+                             edge_um=edge_um)
+    out = _apply_window(*out, min_layer=min_layer, max_layer=max_layer)
+
+    if cache is not None:
+        cache.put(lkey, signed_um=out[0], signed_hops=out[1])
+    return out
+
+
+def border_layers_multi(points, bases, *, A=None, k=2, n_min=10, ratio=0.2,
+                        max_edge=25.0, max_hops=None, min_layer=None,
+                        max_layer=None, distance="euclidean", max_um=None,
+                        graph="delaunay", radius=None, n_neighbors=None,
+                        n_jobs=None):
+    """Border layers for several base compartments over one spatial graph.
+
+    The graph is built once and the k-hop base counts of every compartment
+    come from a single sparse product against the ``(N, C)`` indicator
+    matrix (:func:`khop_counts`). The per-compartment border, BFS and
+    micron-distance steps then run on a thread pool; they share the graph
+    instead of copying it, and scipy's KD-tree and Dijkstra release the GIL.
+
+    Parameters
+    ----------
+    points, A, k, n_min, ratio, max_edge, max_hops, min_layer, max_layer, distance, max_um, graph, radius, n_neighbors
+        As in :func:`border_layers_from_coords`.
+    bases : dict[str, (N,) bool array-like]
+        Compartment name -> base indicator.
+    n_jobs : int | None
+        Threads for the per-compartment steps (``None``/1 serial, -1 all cores).
+
+    Returns
+    -------
+    dict[str, tuple[np.ndarray, np.ndarray]]
+        Compartment name -> ``(signed_um, signed_hops)``, in ``bases`` order.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n = points.shape[0]
+    geodesic = _check_distance(distance)
+    names = list(bases)
+    if not names:
+        return {}
     if A is None:
-        edges = delaunay_edges(points, max_edge=max_edge)
-        A = adjacency_from_edges(n, edges)
+        A = graph_from_edges(n, spatial_edges(points, graph, max_edge=max_edge,
+                                              radius=radius, n_neighbors=n_neighbors))
+        edge_um = _edge_bound(graph, max_edge, radius)
     else:
-        A = binarize_adjacency(A)
+        A = as_graph(A)
+        edge_um = None
 
-    Mk = _khop_reachability(A, k)
-    region = base_region_mask(Mk, is_base, n_min, ratio)
-    border = border_mask(A, region)
-    hops = border_hops(A, border)
+    indicator = np.column_stack([np.asarray(bases[c], dtype=bool) for c in names])
+    nn, b = khop_counts(A, indicator, k)
 
-    signed_hops = hops.copy()
-    signed_hops[region] *= -1.0
-    signed_hops[~np.isfinite(hops)] = np.nan
+    def _one(j):
+        region = region_from_counts(nn, b[:, j], n_min, ratio)
+        border = border_mask(A, region)
+        hops = border_hops(A, border, max_hops=max_hops,
+                           limit=_hop_limit(region, max_hops, min_layer, max_layer))
+        dist = (geodesic_border_distance(points, A, border, max_um=max_um)
+                if geodesic else None)
+        out = _signed_layers(points, region, border, hops, points[border], dist,
+                             edge_um=edge_um)
+        return _apply_window(*out, min_layer=min_layer, max_layer=max_layer)
 
-    signed_um = np.full(n, np.nan, dtype=float)
-    if border.any():
-        tree = cKDTree(points[border])
-        dist_um, _ = tree.query(points, k=1)
-        signed_um = dist_um.astype(float)
-        signed_um[region] *= -1.0
-        signed_um[border] = 0.0
-    signed_um[~np.isfinite(signed_hops)] = np.nan
+    workers = _resolve_n_jobs(n_jobs, len(names))
+    if workers > 1:
+        from concurrent.futures import ThreadPoolExecutor
 
-    return signed_um, signed_hops
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_one, range(len(names))))
+    else:
+        results = [_one(j) for j in range(len(names))]
+    return dict(zip(names, results))
+
+
+def border_layers_blocks(points, bases, blocks, *, A=None, k=2, n_min=10,
+                         ratio=0.2, max_edge=25.0, max_hops=None,
+                         min_layer=None, max_layer=None, distance="euclidean",
+                         max_um=None, graph="delaunay", radius=None,
+                         n_neighbors=None, n_jobs=None):
+    """Border layers for many independent samples over one block-diagonal graph.
+
+    Meant for cohorts of many small tissues (e.g. TMA cores), where a Python
+    loop of :func:`border_layers_from_coords` calls is dominated by per-call
+    overhead. Every sample's graph becomes one diagonal block of a single
+    graph, so k-hop counting, the border mask and the multi-source BFS run
+    once for the whole cohort; only the per-sample KD-trees stay separate
+    and are built on a thread pool. No edge crosses a block, so the result
+    is identical to the per-sample loop.
+
+    Parameters
+    ----------
+    points, A, k, n_min, ratio, max_edge, max_hops, min_layer, max_layer, distance, max_um, graph, radius, n_neighbors
+        As in :func:`border_layers_from_coords`. Entries of ``A`` linking two
+        different blocks are ignored.
+    bases : (N,) bool array-like | dict[str, (N,) bool array-like]
+        Base indicator, or several compartments as in :func:`border_layers_multi`.
+    blocks : (N,) array-like
+        Sample label of every cell.
+    n_jobs : int | None
+        Threads for the per-sample KD-tree queries.
+
+    Returns
+    -------
+    (results, failed) : tuple
+        ``results`` is ``(signed_um, signed_hops)`` over all N cells, or a
+        dict of them per compartment when ``bases`` is a dict. ``failed``
+        maps each sample whose graph construction raised to the error
+        message; its cells are left ``nan``.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    points = np.asarray(points, dtype=np.float64)
+    n = points.shape[0]
+    geodesic = _check_distance(distance)
+    multi = isinstance(bases, dict)
+    names = list(bases) if multi else [""]
+    indicator = np.column_stack([np.asarray(bases[c] if multi else bases, dtype=bool)
+                                 for c in names])
+    labels, block_id = np.unique(np.asarray(blocks), return_inverse=True)
+    order = np.argsort(block_id, kind="stable")
+    bounds = np.searchsorted(block_id[order], np.arange(labels.size + 1))
+    members = [order[bounds[i]:bounds[i + 1]] for i in range(labels.size)]
+
+    failed = {}
+    edge_um = None
+    if A is None:
+        _check_graph(graph, radius, n_neighbors)
+        edge_um = _edge_bound(graph, max_edge, radius)
+        parts = []
+        for label, idx in zip(labels, members):
+            try:
+                e = spatial_edges(points[idx], graph, max_edge=max_edge,
+                                  radius=radius, n_neighbors=n_neighbors)
+            except Exception as exc:  # e.g. QhullError on collinear/degenerate coords
+                failed[label] = f"{type(exc).__name__}: {exc}"
+                continue
+            parts.append(np.column_stack([idx[e["source"].to_numpy()],
+                                          idx[e["target"].to_numpy()]]))
+        pairs = np.concatenate(parts) if parts else np.zeros((0, 2), dtype=np.int64)
+        A = graph_from_edges(n, pd.DataFrame({"source": pairs[:, 0],
+                                              "target": pairs[:, 1]}))
+    else:
+        A = as_graph(A)
+        rows = A.rows()
+        cross = block_id[rows] != block_id[A.indices]
+        if cross.any():
+            keep = ~cross
+            A = SpatialGraph(
+                np.concatenate([[0], np.cumsum(np.bincount(rows[keep], minlength=n))]
+                               ).astype(A.indptr.dtype),
+                A.indices[keep])
+        del rows, cross
+
+    nn, b = khop_counts(A, indicator, k)
+    ok = [i for i, label in enumerate(labels) if label not in failed]
+    workers = _resolve_n_jobs(n_jobs, len(ok))
+
+    results = {}
+    for j, name in enumerate(names):
+        region = region_from_counts(nn, b[:, j], n_min, ratio)
+        border = border_mask(A, region)
+        hops = border_hops(A, border, max_hops=max_hops,
+                           limit=_hop_limit(region, max_hops, min_layer, max_layer))
+        dist = (geodesic_border_distance(points, A, border, max_um=max_um)
+                if geodesic else None)
+        signed_um = np.full(n, np.nan, dtype=float)
+        signed_hops = np.full(n, np.nan, dtype=float)
+
+        def _one(i):
+            idx = members[i]
+            bidx = idx[border[idx]]
+            out = _signed_layers(points[idx], region[idx], border[idx], hops[idx],
+                                 points[bidx], None if dist is None else dist[idx],
+                                 edge_um=edge_um)
+            return idx, _apply_window(*out, min_layer=min_layer, max_layer=max_layer)
+
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                done = list(pool.map(_one, ok))
+        else:
+            done = [_one(i) for i in ok]
+        for idx, (um, sh) in done:
+            signed_um[idx] = um
+            signed_hops[idx] = sh
+        results[name] = (signed_um, signed_hops)
+    return (results if multi else results[""]), failed
+
+
+def border_layers_sweep(points, is_base, *, ks=(2,), n_mins=(10,), ratios=(0.2,),
+                        A=None, max_edge=25.0, max_hops=None,
+                        distance="euclidean", max_um=None):
+    """Evaluate border layering over a ``(k, n_min, ratio)`` grid in one go.
+
+    For calibrating the region call on a new tissue. The spatial graph is
+    built once, :func:`khop_counts` runs once per ``k``, and every
+    ``(n_min, ratio)`` pair is thresholded in a single vectorised comparison
+    (bit-identical to :func:`region_from_counts`). BFS and the micron
+    distance then run once per *distinct* region, since neighbouring settings
+    often call the same cells.
+
+    Parameters
+    ----------
+    points, is_base, A, max_edge, max_hops, distance, max_um
+        As in :func:`border_layers_from_coords`.
+    ks, n_mins, ratios : sequence
+        Grid values; every combination is evaluated.
+
+    Returns
+    -------
+    (summary, signed_um, signed_hops) : tuple[pandas.DataFrame, np.ndarray, np.ndarray]
+        ``summary`` has one row per setting (``k, n_min, ratio, region_id,
+        n_region, n_border, region_frac, n_unreachable, min_layer,
+        max_layer, n_layers``); row ``i`` of the ``(n_settings, N)`` arrays
+        holds that setting's :func:`border_layers_from_coords` output.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    is_base = np.asarray(is_base, dtype=bool)
+    n = points.shape[0]
+    geodesic = _check_distance(distance)
+
+    if A is None:
+        A = graph_from_edges(n, delaunay_edges(points, max_edge=max_edge))
+    else:
+        A = as_graph(A)
+
+    grid = [(int(n_min), float(ratio)) for n_min in n_mins for ratio in ratios]
+    n_min_arr = np.array([g[0] for g in grid])[:, None]
+    # float32 so the comparison rounds exactly like region_from_counts
+    ratio_arr = np.array([g[1] for g in grid], dtype=np.float32)[:, None]
+
+    rows, ums, hopss = [], [], []
+    seen = {}
+    for k in ks:
+        nn, b = khop_counts(A, is_base, int(k))
+        nn32 = nn.astype(np.float32)
+        frac = b.astype(np.float32) / np.maximum(nn32, np.float32(1.0))
+        regions = (nn32 >= n_min_arr) & (frac >= ratio_arr)
+        for (n_min, ratio), region in zip(grid, regions):
+            key = np.packbits(region).tobytes()
+            if key not in seen:
+                border = border_mask(A, region)
+                hops = border_hops(A, border, max_hops=max_hops)
+                dist = (geodesic_border_distance(points, A, border, max_um=max_um)
+                        if geodesic else None)
+                um, sh = _signed_layers(points, region, border, hops,
+                                        points[border], dist)
+                seen[key] = (len(seen), int(border.sum()), um, sh)
+            region_id, n_border, um, sh = seen[key]
+            finite = sh[np.isfinite(sh)]
+            n_region = int(region.sum())
+            rows.append({
+                "k": int(k),
+                "n_min": n_min,
+                "ratio": ratio,
+                "region_id": region_id,
+                "n_region": n_region,
+                "n_border": n_border,
+                "region_frac": n_region / n if n else np.nan,
+                "n_unreachable": int(n - finite.size),
+                "min_layer": float(finite.min()) if finite.size else np.nan,
+                "max_layer": float(finite.max()) if finite.size else np.nan,
+                "n_layers": int(np.unique(finite).size),
+            })
+            ums.append(um)
+            hopss.append(sh)
+
+    shape = (0, n)
+    signed_um = np.vstack(ums) if ums else np.empty(shape)
+    signed_hops = np.vstack(hopss) if hopss else np.empty(shape)
+    return pd.DataFrame(rows), signed_um, signed_hops
+
+
+# ---------------------------------------------------------------------------
+# Incremental relayering
+# ---------------------------------------------------------------------------
+
+def _invalidate_hops(A, hops, removed):
+    """Indices of the cells whose hop count relied on a ``removed`` source.
+
+    Walks outward from ``removed`` one BFS level at a time; a cell at old
+    distance ``L + 1`` stays valid while some neighbour at distance ``L`` is
+    still valid, since that neighbour's path to a surviving source is intact.
+    """
+    invalid = np.zeros(hops.size, dtype=bool)
+    invalid[removed] = True
+    frontier, level, out = removed, 0.0, [removed]
+    while frontier.size:
+        nbr = np.unique(_csr_gather(A.indptr, A.indices, frontier))
+        cand = nbr[(hops[nbr] == level + 1) & ~invalid[nbr]]
+        if cand.size:
+            lv = level
+            cand = cand[~_any_neighbour(A, cand,
+                                        lambda nb: (hops[nb] == lv) & ~invalid[nb])]
+        invalid[cand] = True
+        out.append(cand)
+        frontier, level = cand, level + 1
+    return np.concatenate(out)
+
+
+def _relax_hops(A, hops, seeds, max_hops=None):
+    """BFS relaxation started from ``seeds`` at their current ``hops`` values.
+
+    Lowers ``hops`` in place wherever a seed offers a shorter path; seeds at
+    different distances enter the wave at their own level. Returns the
+    indices of the lowered cells.
+    """
+    seeds = seeds[np.isfinite(hops[seeds])]
+    lowered = [seeds[:0]]
+    if not seeds.size:
+        return lowered[0]
+    order = np.argsort(hops[seeds], kind="stable")
+    seeds, seed_d = seeds[order], hops[seeds][order]
+    pos, frontier = 0, seeds[:0]
+    d = seed_d[0]
+    while True:
+        stop = np.searchsorted(seed_d, d, side="right")
+        frontier = np.union1d(frontier, seeds[pos:stop])
+        pos = stop
+        if not frontier.size:
+            if pos >= seeds.size:
+                return np.concatenate(lowered)
+            d, frontier = seed_d[pos], frontier[:0]
+            continue
+        if max_hops is not None and d >= max_hops:
+            return np.concatenate(lowered)
+        nbr = np.unique(_csr_gather(A.indptr, A.indices, frontier))
+        frontier = nbr[hops[nbr] > d + 1]
+        hops[frontier] = d + 1
+        lowered.append(frontier)
+        d += 1
+
+
+class IncrementalBorderLayers:
+    """Border layering that is cheaply updated when ``is_base`` flips locally.
+
+    Holds the graph, the k-hop counts, region, border, hop and nearest-border
+    state of a full :func:`border_layers_from_coords` run. :meth:`update` then
+    takes the cells whose base annotation changed and repairs only what they
+    can reach: base counts inside the changed cells' k-hop balls, the region
+    and border there, the BFS distances from the affected frontier, the
+    nearest border centroid of the cells owned by removed or nearby border
+    cells, and the outputs of those cells alone. The result is identical to
+    a full recompute on the new ``is_base``.
+
+    The constructor runs the full layering once. To pick up from an earlier
+    session instead, save :meth:`state` (e.g. ``GeometryCache.put(key,
+    **layers.state())``) and restore it with :meth:`from_state`, which
+    rebuilds nothing.
+
+    Parameters
+    ----------
+    points, is_base, A, k, n_min, ratio, max_edge, max_hops, distance, max_um
+        As in :func:`border_layers_from_coords`. ``distance="geodesic"`` is
+        supported but its Dijkstra is re-run in full on every update.
+
+    Attributes
+    ----------
+    signed_um, signed_hops : np.ndarray
+        Current outputs, same convention as :func:`border_layers_from_coords`.
+    """
+
+    def __init__(self, points, is_base, *, A=None, k=2, n_min=10, ratio=0.2,
+                 max_edge=25.0, max_hops=None, distance="euclidean", max_um=None):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.is_base = np.array(is_base, dtype=bool)
+        n = self.points.shape[0]
+        self.A = (graph_from_edges(n, delaunay_edges(self.points, max_edge=max_edge))
+                  if A is None else as_graph(A))
+        self.k, self.n_min, self.ratio = int(k), n_min, ratio
+        self.max_hops, self.max_um = max_hops, max_um
+        self.geodesic = _check_distance(distance)
+        self._M = self.A.to_csr()
+
+        self.nn, self.b = khop_counts(self.A, self.is_base, self.k)
+        self.region = region_from_counts(self.nn, self.b, n_min, ratio)
+        self.border = border_mask(self.A, self.region)
+        self.hops = border_hops(self.A, self.border, max_hops=max_hops)
+        self._refresh_nearest()
+        self._finish()
+
+    _STATE = ("indptr", "indices", "is_base", "nn", "b", "region", "border", "hops",
+              "near_dist", "near_idx", "signed_um", "signed_hops")
+
+    def state(self):
+        """The arrays :meth:`from_state` needs, as a flat ``{name: array}`` dict.
+
+        Plain arrays only, so the dict can be stored with
+        :meth:`hplot.GeometryCache.put` or ``np.savez``.
+        """
+        out = {name: getattr(self, name) for name in self._STATE[2:]}
+        out["indptr"], out["indices"] = self.A.indptr, self.A.indices
+        return out
+
+    @classmethod
+    def from_state(cls, points, state, *, k=2, n_min=10, ratio=0.2, max_hops=None,
+                   distance="euclidean", max_um=None):
+        """Resume from the arrays of an earlier :meth:`state`.
+
+        Parameters
+        ----------
+        points : (N, 2) array-like
+            The same cell coordinates the state was computed on.
+        state : Mapping[str, np.ndarray]
+            Output of :meth:`state`, e.g. as returned by
+            :meth:`hplot.GeometryCache.get`. ``indptr``, ``indices``,
+            ``is_base``, ``nn``, ``b`` and ``hops`` are required. Missing
+            ``region`` / ``border``, nearest-border (``near_dist`` /
+            ``near_idx``) or output (``signed_um`` / ``signed_hops``) arrays
+            are recomputed from the rest.
+        k, n_min, ratio, max_hops, distance, max_um
+            The parameters of the run that produced ``state``; they are not
+            checked against it.
+
+        Returns
+        -------
+        IncrementalBorderLayers
+        """
+        missing = [name for name in ("indptr", "indices", "is_base", "nn", "b", "hops")
+                   if name not in state]
+        if missing:
+            raise KeyError(f"state is missing {', '.join(missing)}.")
+        self = cls.__new__(cls)
+        self.points = np.asarray(points, dtype=np.float64)
+        self.A = SpatialGraph(np.asarray(state["indptr"]), np.asarray(state["indices"]))
+        if self.A.n != self.points.shape[0]:
+            raise ValueError(f"state holds {self.A.n} cells but points has "
+                             f"{self.points.shape[0]}.")
+        self.k, self.n_min, self.ratio = int(k), n_min, ratio
+        self.max_hops, self.max_um = max_hops, max_um
+        self.geodesic = _check_distance(distance)
+        self._M = self.A.to_csr()
+
+        # copies: update() works on these in place
+        self.is_base = np.array(state["is_base"], dtype=bool)
+        self.nn, self.b = np.array(state["nn"]), np.array(state["b"])
+        self.hops = np.array(state["hops"], dtype=float)
+        self.region = (np.array(state["region"], dtype=bool) if "region" in state
+                       else region_from_counts(self.nn, self.b, n_min, ratio))
+        self.border = (np.array(state["border"], dtype=bool) if "border" in state
+                       else border_mask(self.A, self.region))
+        if self.geodesic or "near_dist" not in state or "near_idx" not in state:
+            self._refresh_nearest()
+        else:
+            self._src = np.flatnonzero(self.border)
+            self.near_dist = np.array(state["near_dist"], dtype=float)
+            self.near_idx = np.array(state["near_idx"], dtype=np.int64)
+            self._reach = np.zeros(self.points.shape[0])
+            owned = self.near_idx >= 0
+            np.maximum.at(self._reach, self.near_idx[owned], self.near_dist[owned])
+            self._index_owners()
+        if "signed_um" in state and "signed_hops" in state:
+            self.signed_um = np.array(state["signed_um"], dtype=float)
+            self.signed_hops = np.array(state["signed_hops"], dtype=float)
+        else:
+            self._finish()
+        return self
+
+    def _refresh_nearest(self):
+        """Nearest border centroid of every cell, from scratch.
+
+        Alongside ``near_dist`` / ``near_idx`` this keeps ``_reach``, for each
+        border cell an upper bound on the distance of the cells it is nearest
+        to, and an owner -> cells index (:meth:`_index_owners`).
+        """
+        from scipy.spatial import cKDTree
+
+        n = self.points.shape[0]
+        self._src = np.flatnonzero(self.border)
+        self.near_dist = np.full(n, np.inf)
+        self.near_idx = np.full(n, -1, dtype=np.int64)
+        self._reach = np.zeros(n)
+        if self.geodesic or not self._src.size:
+            return
+        d, j = cKDTree(self.points[self._src]).query(self.points, k=1)
+        self.near_dist[:] = d
+        self.near_idx[:] = self._src[j]
+        np.maximum.at(self._reach, self.near_idx, d)
+        self._index_owners()
+
+    def _index_owners(self):
+        """CSR index of the cells owned by each border cell.
+
+        Cells whose owner changes afterwards are collected in ``_moved``
+        instead of re-sorting; the index is rebuilt once they pass N / 8.
+        """
+        n = self.points.shape[0]
+        order = np.argsort(self.near_idx, kind="stable")
+        self._own_cells = order[self.near_idx[order] >= 0]
+        counts = np.bincount(self.near_idx[self._own_cells], minlength=n)
+        self._own_ptr = np.concatenate([[0], np.cumsum(counts)])
+        self._moved = np.zeros(0, dtype=np.int64)
+
+    def _owned(self, owners):
+        """Cells whose nearest border cell is one of ``owners``."""
+        if not owners.size:
+            return owners
+        cells = np.union1d(_csr_gather(self._own_ptr, self._own_cells, owners),
+                           self._moved)
+        return cells[np.isin(self.near_idx[cells], owners)]
+
+    def _reassign(self, cells, dist, owner):
+        """Give ``cells`` a new nearest border cell, keeping reach and index valid."""
+        self.near_dist[cells] = dist
+        self.near_idx[cells] = owner
+        np.maximum.at(self._reach, owner, dist)
+        self._moved = np.union1d(self._moved, cells)
+
+    def _repair_nearest(self, removed, added):
+        """Update the nearest border centroid after ``removed`` / ``added``.
+
+        Only the cells that were nearest to a removed border cell, and those
+        of the surviving border cells close enough to an added one to lose
+        cells to it, are queried. Returns the cells whose distance changed.
+        """
+        from scipy.spatial import cKDTree
+
+        had_border = self._src.size > 0
+        self._src = np.union1d(np.setdiff1d(self._src, removed), added)
+        if not had_border or not self._src.size:
+            self._refresh_nearest()
+            return None
+        pts = self.points
+
+        # cells that lost their border cell: re-query against the new border
+        lost = self._owned(removed)
+        self._reach[removed] = 0.0
+        if lost.size:
+            d, j = cKDTree(pts[self._src]).query(pts[lost], k=1)
+            self._reassign(lost, d, self._src[j])
+        if not added.size:
+            return self._settle(lost)
+
+        # a surviving border cell b can only lose cells to an added cell a
+        # when |a - b| < 2 * reach[b], since such a cell lies within reach of b
+        old = np.setdiff1d(self._src, added)
+        tree = cKDTree(pts[added])
+        owners = old[:0]
+        if old.size:
+            # widened a little: the farthest owned cell sits exactly on reach
+            r = 2.0 * self._reach[old] * (1 + 1e-9) + 1e-12
+            owners = old[tree.query_ball_point(pts[old], r=r, return_length=True) > 0]
+        cand = np.union1d(self._owned(owners), added)
+        d, j = tree.query(pts[cand], k=1)
+        closer = d < self.near_dist[cand]
+        cand = cand[closer]
+        self._reassign(cand, d[closer], added[j[closer]])
+        return self._settle(np.union1d(lost, cand))
+
+    def _settle(self, moved):
+        """Rebuild the owner index once too many cells have moved; pass ``moved`` on."""
+        if self._moved.size > self.points.shape[0] // 8:
+            self._index_owners()
+        return moved
+
+    def _finish(self, cells=None):
+        """Recompute the signed outputs, everywhere or only for ``cells``.
+
+        Per cell the outputs depend only on its own region, border, hop and
+        distance values, so writing ``cells`` alone gives the full result.
+        """
+        if cells is None or self.geodesic:
+            dist = None
+            if self.geodesic:
+                dist = geodesic_border_distance(self.points, self.A, self.border,
+                                                max_um=self.max_um)
+            elif self.border.any():
+                dist = self.near_dist
+            self.signed_um, self.signed_hops = _signed_layers(
+                self.points, self.region, self.border, self.hops,
+                self.points[self.border], dist)
+            return
+        h = self.hops[cells]
+        live = np.isfinite(h)
+        region = self.region[cells]
+        sh = np.where(region, -h, h)
+        sh[~live] = np.nan
+        um = np.full(cells.size, np.nan)
+        if self._src.size:
+            d = self.near_dist[cells]
+            um = np.where(np.isfinite(d), d, np.nan)
+            um[region] *= -1.0
+            um[self.border[cells]] = 0.0
+        um[~live] = np.nan
+        self.signed_hops[cells] = sh
+        self.signed_um[cells] = um
+
+    def update(self, changed):
+        """Flip ``is_base`` for ``changed`` cells and repair the layering.
+
+        Parameters
+        ----------
+        changed : array-like
+            Indices (or a boolean mask) of cells whose base annotation flipped.
+
+        Returns
+        -------
+        (signed_um, signed_hops) : tuple[np.ndarray, np.ndarray]
+        """
+        changed = np.asarray(changed)
+        if changed.dtype == bool:
+            changed = np.flatnonzero(changed)
+        changed = np.unique(changed.astype(np.int64))
+        if not changed.size:
+            return self.signed_um, self.signed_hops
+        A = self.A
+
+        # 1. base counts inside the changed cells' k-hop balls (balls are symmetric)
+        self.is_base[changed] = ~self.is_base[changed]
+        delta = np.where(self.is_base[changed], 1, -1).astype(self.b.dtype)
+        balls = _khop_balls(self._M, changed.astype(A.indices.dtype), self.k)
+        np.add.at(self.b, balls.indices, np.repeat(delta, np.diff(balls.indptr)))
+        touched = np.unique(balls.indices)
+
+        # 2. region, then border on the flipped cells and their neighbours
+        region = region_from_counts(self.nn[touched], self.b[touched],
+                                    self.n_min, self.ratio)
+        flipped = touched[region != self.region[touched]]
+        self.region[flipped] = ~self.region[flipped]
+        cand = np.union1d(flipped, _csr_gather(A.indptr, A.indices, flipped))
+        was = self.border[cand]
+        now = np.zeros(cand.size, dtype=bool)
+        inside = self.region[cand]
+        now[inside] = _any_neighbour(A, cand[inside], lambda nb: ~self.region[nb])
+        removed, added = cand[was & ~now], cand[now & ~was]
+        self.border[cand] = now
+
+        # 3. BFS repair: drop distances that relied on removed sources, then
+        # relax from new sources and from the intact cells around the hole
+        hole = _invalidate_hops(A, self.hops, removed)
+        self.hops[hole] = np.inf
+        self.hops[added] = 0.0
+        rim = np.setdiff1d(_csr_gather(A.indptr, A.indices, hole), hole)
+        lowered = _relax_hops(A, self.hops, np.union1d(added, rim),
+                              max_hops=self.max_hops)
+
+        # 4. nearest border centroid, then the outputs of every cell touched
+        if self.geodesic:
+            self._finish()
+            return self.signed_um, self.signed_hops
+        moved = self._repair_nearest(removed, added)
+        if moved is None:
+            self._finish()
+        else:
+            self._finish(np.unique(np.concatenate(
+                [flipped, cand, hole, added, lowered, moved])))
+        return self.signed_um, self.signed_hops
@@ -0,0 +1,227 @@
+"""Chunked, optionally multi-process execution of permutation nulls.
+
+The permutation tests in :mod:`hplot.stats` all have the same shape: a fixed,
+read-only set of arrays (ranks, a deviation tensor, ...) and ``n_perm``
+independent draws, each reduced to a few null statistics. :func:`run_chunks`
+splits the draws ``[0, n_perm)`` into contiguous chunks, evaluates a
+module-level *kernel* on every chunk and returns the per-chunk results in chunk
+order, so the caller's concatenation is deterministic.
+
+Seeding
+-------
+* ``chunk_size=None`` and one worker: a single chunk driven by
+  ``numpy.random.default_rng(seed)``, i.e. the historical serial stream.
+* ``chunk_size=None`` and ``n_jobs`` workers: one chunk per worker, each with
+  its own ``SeedSequence(seed).spawn`` child. Reproducible for a given
+  ``(seed, n_jobs)``.
+* ``chunk_size=c``: chunks of ``c`` draws, chunk ``i`` seeded with the ``i``-th
+  spawned child. The chunking no longer depends on the worker count, so the
+  result is the same for every ``n_jobs``.
+
+Workers receive the shared arrays once, through
+:class:`multiprocessing.shared_memory.SharedMemory`, rather than pickled with
+every task.
+
+Sequential stopping
+-------------------
+The helpers at the end implement Besag & Clifford's (1991) sequential
+Monte-Carlo p-value. Draws come in geometrically growing rounds
+(:func:`sequential_rounds`), each seeded independently (:func:`round_seed`).
+A hypothesis stops once it has collected ``h`` exceedances. It then gets
+``p = h / L``, where the ``h``-th exceedance came at draw ``L``. A hypothesis
+still short of ``h`` at the cap gets ``(g + 1) / (n + 1)``. Kernels report the
+positions of the first ``h`` exceedances (:func:`first_hits`), which is all
+the bookkeeping needs.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from ._geometry import _resolve_n_jobs
+
+# worker-side views of the shared arrays, set by the pool initializer
+_SHARED = None
+_HANDLES = []
+
+
+def plan_chunks(n_perm, seed=None, n_jobs=None, chunk_size=None):
+    """``[(start, stop, seed_or_seedsequence), ...]`` covering ``range(n_perm)``.
+
+    See the module docstring for how the three seeding modes are chosen.
+    """
+    n_perm = int(n_perm)
+    if chunk_size is not None:
+        chunk_size = int(chunk_size)
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer.")
+        bounds = list(range(0, n_perm, chunk_size)) + [n_perm]
+    else:
+        workers = _resolve_n_jobs(n_jobs, max(n_perm, 1))
+        if workers == 1:
+            return [(0, n_perm, seed)]
+        bounds = np.linspace(0, n_perm, workers + 1).round().astype(int).tolist()
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    children = seed.spawn(len(bounds) - 1)
+    return [(lo, hi, ss) for lo, hi, ss in zip(bounds[:-1], bounds[1:], children)]
+
+
+def _share(arrays):
+    from multiprocessing import shared_memory
+
+    handles, specs = [], {}
+    try:
+        for name, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            handles.append(shm)
+            np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[...] = arr
+            specs[name] = (shm.name, arr.shape, arr.dtype.str)
+    except BaseException:
+        _release(handles, unlink=True)
+        raise
+    return handles, specs
+
+
+def _release(handles, unlink=False):
+    for shm in handles:
+        shm.close()
+        if unlink:
+            shm.unlink()
+
+
+def _attach(specs):
+    """Pool initializer: map the parent's shared blocks as read-only arrays."""
+    global _SHARED
+    from multiprocessing import shared_memory
+
+    out = {}
+    for name, (shm_name, shape, dtype) in specs.items():
+        # pool workers share the parent's resource tracker, so attaching here
+        # does not hand them ownership; the parent unlinks after the run
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _HANDLES.append(shm)
+        arr = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+        arr.flags.writeable = False
+        out[name] = arr
+    _SHARED = out
+
+
+def _run_chunk(kernel, start, stop, seed, params):
+    return kernel(np.random.default_rng(seed), start, stop, _SHARED,
+                  progress=False, **params)
+
+
+def _bar(total, desc):
+    try:
+        from tqdm.auto import tqdm as _tqdm
+    except ImportError:
+        return None
+    return _tqdm(total=total, desc=desc, leave=False)
+
+
+def run_chunks(kernel, n_perm, shared, *, seed=None, n_jobs=None,
+               chunk_size=None, progress=False, **params):
+    """Evaluate ``kernel(rng, start, stop, shared, progress, **params)`` per chunk.
+
+    Parameters
+    ----------
+    kernel : callable
+        Module-level function (it is pickled to the workers) returning the
+        null statistics of draws ``start..stop-1``.
+    n_perm : int
+        Total number of draws.
+    shared : dict[str, numpy.ndarray]
+        Read-only inputs; placed in shared memory when workers are used.
+    seed, n_jobs, chunk_size
+        See :func:`plan_chunks`.
+    progress : bool
+        Show a ``tqdm`` bar if available: the kernel's own bar when running
+        serially, one tick per finished chunk otherwise.
+    **params
+        Small picklable keyword arguments forwarded to ``kernel``.
+
+    Returns
+    -------
+    list
+        The kernel results, in chunk order.
+    """
+    chunks = plan_chunks(n_perm, seed, n_jobs, chunk_size)
+    workers = min(_resolve_n_jobs(n_jobs, len(chunks)), len(chunks))
+    if workers <= 1:
+        return [kernel(np.random.default_rng(s), lo, hi, shared,
+                       progress=progress, **params)
+                for lo, hi, s in chunks]
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    bar = _bar(len(chunks), "permutation chunks") if progress else None
+    handles, specs = _share(shared)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(specs,)) as pool:
+            futures = [pool.submit(_run_chunk, kernel, lo, hi, s, params)
+                       for lo, hi, s in chunks]
+            if bar is not None:
+                for _ in as_completed(futures):
+                    bar.update(1)
+            return [f.result() for f in futures]
+    finally:
+        if bar is not None:
+            bar.close()
+        _release(handles, unlink=True)
+
+
+def sequential_rounds(n_perm, n_perm_max):
+    """``[(lo, hi), ...]``: ``n_perm`` draws, then doubling the total up to the cap."""
+    bounds = [0, int(n_perm)]
+    while bounds[-1] < n_perm_max:
+        bounds.append(min(2 * bounds[-1], int(n_perm_max)))
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def round_seed(seed, r):
+    """Seed of round ``r``: ``seed`` itself for the first round, so a sequential
+    run starts with exactly the draws of the fixed-``n_perm`` run; later rounds
+    get streams independent of it and of its chunk children."""
+    base = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return base if r == 0 else np.random.SeedSequence([base.entropy, r])
+
+
+def first_hits(hit, h, offset=0):
+    """Draw indices of the first ``h`` exceedances per hypothesis.
+
+    ``hit`` is ``(n_draws, ...)`` boolean, one row per draw. Returns a float
+    array ``(h, ...)`` of ``offset + row`` with ``inf`` where fewer than ``h``
+    exceedances occurred.
+    """
+    cs = np.cumsum(hit, axis=0)
+    out = np.full((h,) + hit.shape[1:], np.inf)
+    if hit.shape[0] == 0:
+        return out
+    for j in range(h):
+        reached = cs >= j + 1
+        out[j] = np.where(reached[-1], offset + np.argmax(reached, axis=0), np.inf)
+    return out
+
+
+def merge_first(a, b, h):
+    """Keep the ``h`` earliest exceedance positions of two :func:`first_hits` arrays."""
+    return np.sort(np.concatenate([a, b], axis=0), axis=0)[:h]
+
+
+def besag_clifford_p(first, used):
+    """Sequential p-values and draws used, from :func:`first_hits` positions.
+
+    ``first`` is ``(h, ...)`` and ``used`` the number of draws each hypothesis
+    saw. Stopped hypotheses get ``h / L`` with ``L`` the draw of their ``h``-th
+    exceedance; the rest get ``(g + 1) / (used + 1)``.
+    """
+    h = first.shape[0]
+    done = np.isfinite(first[-1])
+    g = np.isfinite(first).sum(axis=0)
+    n = np.where(done, np.where(done, first[-1], 0) + 1, used).astype(np.int64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = np.where(done, h / np.maximum(n, 1), (g + 1.0) / (n + 1.0))
+    return p, n
@@ -121,7 +121,7 @@ def _cmd_test(args):
 
 
 def _cluster_mass_summary(df, pvals, args, target):
-    from hplot.stats import compute_layer_pvalues
+    from hplot.stats import _adjust_pvalues, _layer_pvalue_permutations
     col = "p_adj" if args.correction else "p_value"
     sig = pvals[pvals[col] < args.threshold]
     if sig.empty:
@@ -129,26 +129,21 @@ def _cluster_mass_summary(df, pvals, args, target):
               "cluster-mass not computed.")
         return
     obs_mass = (args.threshold - sig[col]).clip(lower=0).sum()
-    rng = np.random.default_rng(args.seed)
-    null_masses = []
-    for _ in range(args.permutations):
-        df_perm = df.copy()
-        g_vals = df_perm[args.group].to_numpy()
-        rng.shuffle(g_vals)
-        df_perm[args.group] = g_vals
-        try:
-            pv_perm = compute_layer_pvalues(
-                df_perm, prop=target, layer_col=args.layer,
-                group_col=args.group,
-                groups=tuple(args.groups) if args.groups else None,
-                test=args.test, distance_col=args.distance,
-                min_n=args.min_n, correction=args.correction,
-            )
-            sig_p = pv_perm[pv_perm[col] < args.threshold]
-            null_masses.append((args.threshold - sig_p[col]).clip(lower=0).sum())
-        except Exception:
-            null_masses.append(0.0)
-    perm_p = float((np.array(null_masses) >= obs_mass).mean())
+    try:
+        _, null_p = _layer_pvalue_permutations(
+            df, prop=target, layer_col=args.layer, group_col=args.group,
+            groups=tuple(args.groups) if args.groups else None,
+            test=args.test, min_n=args.min_n, unit_col=args.sample,
+            n_perm=args.permutations, seed=args.seed,
+        )
+    except ValueError as e:
+        sys.exit(f"[hplot test]  Error: {e}")
+    if args.correction:
+        null_p = np.vstack([_adjust_pvalues(row, args.correction) for row in null_p])
+    with np.errstate(invalid="ignore"):
+        null_masses = np.where(null_p < args.threshold,
+                               args.threshold - null_p, 0.0).sum(axis=1)
+    perm_p = float((null_masses >= obs_mass).mean())
     print(f"[hplot test]  Cluster-mass: obs={obs_mass:.4f}  "
           f"perm-p={perm_p:.4f}  (n_perm={args.permutations},"
           f" threshold={args.threshold})")
@@ -185,6 +180,10 @@ def _add_test_parser(sub):
     p.add_argument("--threshold",     type=float, default=0.05,
                    help="Per-layer significance threshold for cluster-mass.")
     p.add_argument("--seed",          type=int, default=42, help="Random seed.")
+    p.add_argument("--sample",        default=None,
+                   help="Patient / sample id column: permute group labels per "
+                        "patient so all of its layer rows move together "
+                        "(default: every row is permuted independently).")
     p.add_argument("--exclude-base", dest="exclude_base", action="store_true",
                    help="Derive the target from counts as "
                         "target_count / (all_count - base_count) before testing.")
@@ -339,6 +338,8 @@ def _run_screen_from_csv(args):
         cluster_alpha=args.cluster_alpha, min_w=args.min_w,
         min_per_group=args.min_per_group, n_perm=args.permutations,
         seed=args.seed, layer_um=layer_um, progress=args.progress,
+        n_jobs=args.n_jobs, chunk_size=args.chunk_size,
+        n_perm_max=args.n_perm_max, n_exceed=args.n_exceed,
     )
     return res["long"], res["wide"], layer_um
 
@@ -373,6 +374,16 @@ def _add_screen_args(p):
     p.add_argument("--seed", type=int, default=0, help="Random seed (default 0).")
     p.add_argument("--progress", action="store_true",
                    help="Show a tqdm bar over permutations.")
+    p.add_argument("--n-jobs", dest="n_jobs", type=int, default=None,
+                   help="Worker processes for the permutations (-1 = all cores).")
+    p.add_argument("--chunk-size", dest="chunk_size", type=int, default=None,
+                   help="Permutations per seeded chunk; makes the result "
+                        "independent of --n-jobs.")
+    p.add_argument("--n-perm-max", dest="n_perm_max", type=int, default=None,
+                   help="Sequential stopping: keep drawing for undecided units "
+                        "up to this many permutations.")
+    p.add_argument("--n-exceed", dest="n_exceed", type=int, default=10,
+                   help="Exceedances after which a unit stops (default 10).")
 
 
 # ── screen ─────────────────────────────────────────────────────────────────
@@ -1,6 +1,6 @@
 import numpy as np
 import pandas as pd
-from .stats import compute_layer_stats, compute_layer_pvalues, PVALUE_TEST_LABELS
+from .stats import LayerStatsAccumulator, compute_layer_pvalues, PVALUE_TEST_LABELS
 from .plotting import plot_hplot
 
 
@@ -42,14 +42,16 @@ class HPlot:
 
     def fit(self, df, targets, layer, group=None, distance=None, unit=None, ci=0.95, color_map=None, palette=None, legend_order=None, legend_title=None, legend_kwargs=None,
             pvalue=False, pvalue_test="mannwhitney", pvalue_groups=None, pvalue_correction=None, pvalue_min_n=3,
-            smoother="mean", gam_grid=None, gam_n_splines=10, gam_lam_grid=None, gam_ci_width=0.95, gam_group_order=None):
+            smoother="mean", gam_grid=None, gam_n_splines=10, gam_lam_grid=None, gam_ci_width=0.95, gam_group_order=None,
+            keep_data=True):
         # Normalise targets to a list
         target_cols = [targets] if isinstance(targets, str) else list(targets)
         multi = len(target_cols) > 1
         # Drop rows with NA in required columns
         cols = target_cols + [layer] + ([group] if group else [])
         df = df.dropna(subset=cols)
-        self.df_ = df.copy()
+        # keep_data=False leaves df_ unset so fitted objects stay small to pickle
+        self.df_ = df.copy() if keep_data else None
         self.targets = targets
         self.layer = layer
         self.group = group
@@ -70,17 +72,9 @@ class HPlot:
         self.gam_curves_ = {}
 
         if smoother == "mean":
-            if self.group:
-                groups = df[group].unique()
-                for grp in groups:
-                    df_sub = df[df[group] == grp]
-                    for prop in target_cols:
-                        key = f"{grp} \u2013 {prop}" if multi else grp
-                        self.target_grouped_stats_[key] = compute_layer_stats(df_sub, prop, layer, distance, ci=ci)
-            else:
-                for prop in target_cols:
-                    key = prop if multi else "overall"
-                    self.target_grouped_stats_[key] = compute_layer_stats(df, prop, layer, distance, ci=ci)
+            # one grouped reduction keyed by (group, layer) over every target
+            acc = LayerStatsAccumulator(target_cols, layer, group, distance).update(df)
+            self.target_grouped_stats_ = acc.to_stats(ci=ci)
         else:  # smoother == "gam"
             from .stats import gam_group_curves
             grid = gam_grid
@@ -89,6 +83,8 @@ class HPlot:
             grid = np.asarray(grid, dtype=float)
             self.gam_grid_ = grid
             dist_by_layer = df.groupby(layer)[distance].mean() if distance else None
+            if self.group:
+                n_by_group_layer = df.groupby([group, layer], observed=True)[target_cols].count()
             for prop in target_cols:
                 if self.group:
                     gorder = list(gam_group_order) if gam_group_order is not None else list(pd.unique(df[group].dropna()))
@@ -99,7 +95,10 @@ class HPlot:
                     self.gam_curves_[prop] = curves
                     for grp, (pred, ci_arr) in curves.items():
                         key = f"{grp} \u2013 {prop}" if multi else grp
-                        n_by_layer = df[df[group] == grp].groupby(layer)[prop].count()
+                        try:
+                            n_by_layer = n_by_group_layer[prop].xs(grp, level=0)
+                        except KeyError:    # group absent from the data
+                            n_by_layer = pd.Series(dtype=float)
                         self.target_grouped_stats_[key] = _gam_curve_to_stats_df(
                             grid, pred, ci_arr, dist_by_layer, n_by_layer)
                 else:
@@ -136,6 +135,31 @@ class HPlot:
             )
         return self
 
+    @classmethod
+    def from_accumulator(cls, acc, ci=0.95, use_t=True, unit=None, color_map=None,
+                         palette=None, legend_order=None, legend_title=None,
+                         legend_kwargs=None):
+        """Build a fitted HPlot from a :class:`~hplot.stats.LayerStatsAccumulator`.
+
+        Yields the same mean +/- CI curves (and curve keys) as
+        ``fit(df, ...)`` with ``smoother="mean"`` on the concatenated rows the
+        accumulator saw, without ever holding those rows; ``df_`` stays
+        ``None``, so the p-value track is unavailable.
+        """
+        self = cls()
+        self.targets = acc.targets[0] if len(acc.targets) == 1 else list(acc.targets)
+        self.layer = acc.layer
+        self.group = acc.group
+        self.distance = acc.distance
+        self.unit = unit
+        self.color_map = color_map
+        self.palette = palette
+        self.legend_order = legend_order
+        self.legend_title = legend_title
+        self.legend_kwargs = legend_kwargs
+        self.target_grouped_stats_ = acc.to_stats(ci=ci, use_t=use_t)
+        return self
+
     def plot(self, ci_show=True, ax=None, display_base_type="tumor", display_target_type="immune cells",
              value_kind="proportion", ylabel=None,
              pvalue_show=False, pvalue_label=None, pvalue_color="black", pvalue_threshold=0.05,
@@ -189,7 +189,7 @@ def pathway_layer_profile_h5ad(path, signatures, *, base_col,
                                k=2, n_min=10, ratio=0.2, max_edge=25.0,
                                sample=None, extra=None, cell_mask=None,
                                max_rank=1500, chunk=8000, cache_path=None,
-                               force=False):
+                               force=False, geometry_cache=None):
     """Border-layer a run from disk and return its per-layer signature profile.
 
     Convenience wrapper: reads the ``.h5ad``, derives the signed border layer
@@ -211,6 +211,9 @@ def pathway_layer_profile_h5ad(path, signatures, *, base_col,
         Cells outside the mask are dropped before layering statistics are taken.
     cache_path : str | None
         Joblib cache for the returned frame.
+    geometry_cache : str | hplot.GeometryCache | None
+        Content-addressed cache for the border layering itself, so re-running
+        a run with a different ``signatures`` set skips the geometry.
 
     Returns
     -------
@@ -236,7 +239,8 @@ def pathway_layer_profile_h5ad(path, signatures, *, base_col,
     coords = np.asarray(adata.obsm[spatial_key], dtype=np.float64)
     is_base = np.asarray(adata.obs[base_col]).astype(bool)
     _um, signed = border_layers_from_coords(coords, is_base, A=None, k=k, n_min=n_min,
-                                            ratio=ratio, max_edge=max_edge)
+                                            ratio=ratio, max_edge=max_edge,
+                                            cache=geometry_cache)
     keep = np.isfinite(signed)
     if cell_mask is not None:
         keep = keep & np.asarray(cell_mask(adata)).astype(bool)
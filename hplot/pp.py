@@ -16,7 +16,66 @@ import warnings
 import numpy as np
 
 from ._anndata import _require_anndata, _sample_vector
-from ._geometry import border_layers_from_coords
+from ._geometry import (
+    _check_graph,
+    _resolve_n_jobs,
+    border_layers_blocks,
+    border_layers_from_coords,
+    border_layers_multi,
+)
+
+
+def _border_layers_sample(coords, is_base, A_sub, params):
+    """One sample's geometry; returns ``(result, error)`` instead of raising.
+
+    ``is_base`` is a mask, or a dict of masks for multi-compartment runs, in
+    which case ``result`` maps compartment name -> ``(um, hops)``. Module-level
+    so a process pool can pickle it; the caller turns ``error`` into the same
+    warning the serial loop emits.
+    """
+    try:
+        if isinstance(is_base, dict):
+            out = border_layers_multi(coords, is_base, A=A_sub, **params)
+        else:
+            out = border_layers_from_coords(coords, is_base, A=A_sub, **params)
+    except Exception as exc:  # e.g. QhullError on collinear/degenerate coords
+        return None, f"{type(exc).__name__}: {exc}"
+    return out, None
+
+
+def _border_layers_cohort(coords, base, sample, tasks, A_full, params, n_jobs):
+    """Block-diagonal run over ``tasks``; per-sample ``(result, error)`` pairs.
+
+    Mirrors what :func:`_border_layers_sample` yields for each task, so the
+    caller's warning/collection loop is the same for both paths.
+    """
+    cells = np.concatenate(tasks) if tasks else np.zeros(0, dtype=np.int64)
+    if isinstance(base, dict):
+        sub_base = {name: m[cells] for name, m in base.items()}
+    else:
+        sub_base = base[cells]
+    A_sub = None if A_full is None else A_full[cells][:, cells]
+    try:
+        out, failed = border_layers_blocks(coords[cells], sub_base, sample[cells],
+                                           A=A_sub, n_jobs=n_jobs, **params)
+    except Exception as exc:
+        msg = f"{type(exc).__name__}: {exc}"
+        return [(None, msg) for _ in tasks]
+
+    pos = np.cumsum([0] + [idx.size for idx in tasks])
+    pairs = []
+    for i, idx in enumerate(tasks):
+        label = sample[idx[0]]
+        if label in failed:
+            pairs.append((None, failed[label]))
+            continue
+        sl = slice(pos[i], pos[i + 1])
+        if isinstance(out, dict):
+            pairs.append(({name: (um[sl], hops[sl]) for name, (um, hops) in out.items()},
+                          None))
+        else:
+            pairs.append(((out[0][sl], out[1][sl]), None))
+    return pairs
 
 
 def border_layers(
@@ -31,33 +90,81 @@ def border_layers(
     n_min=10,
     ratio=0.2,
     max_edge=25.0,
+    graph="delaunay",
+    radius=None,
+    n_neighbors=None,
+    distance="euclidean",
+    max_um=None,
+    min_layer=None,
+    max_layer=None,
     build_graph_if_missing=True,
     layer_key="hplot_layer",
     distance_key="hplot_distance_um",
+    n_jobs=None,
+    block_diagonal=False,
+    geometry_cache=None,
     copy=False,
 ):
     """Assign a signed border layer + micron distance to every cell.
 
     Graph source (both, with fallback): if ``adata.obsp[connectivity_key]``
-    exists it is used as the spatial graph; otherwise a Delaunay graph is built
-    from ``adata.obsm[spatial_key]`` (pruned at ``max_edge``) when
-    ``build_graph_if_missing`` is True.
+    exists it is used as the spatial graph; otherwise a ``graph`` graph
+    (Delaunay pruned at ``max_edge`` by default) is built from
+    ``adata.obsm[spatial_key]`` when ``build_graph_if_missing`` is True.
 
     Parameters
     ----------
     adata : AnnData
     cluster_key : str
         ``.obs`` column defining cell compartments.
-    base_categories : str | sequence[str]
+    base_categories : str | sequence[str] | dict[str, str | sequence[str]]
         Value(s) of ``cluster_key`` that make up the base (e.g. tumour) region.
+        A dict ``{name: categories}`` layers several compartments (tumour,
+        lymphoid aggregate, vessel, ...) over one graph build and writes
+        ``<layer_key>_<name>`` / ``<distance_key>_<name>`` per compartment
+        (see :func:`hplot._geometry.border_layers_multi`). The geometry cache
+        is not used in this mode.
     sample_key : str | None
         ``.obs`` column identifying independent tissues; the border graph is
         computed per sample so hops never cross samples.
     k, n_min, ratio, max_edge : see :func:`hplot._geometry.border_layers_from_coords`.
+    graph : {"delaunay", "radius", "knn"}
+        Graph built from coordinates when none is precomputed: pruned
+        Delaunay, all pairs within ``radius`` microns, or the symmetric
+        ``n_neighbors``-nearest-neighbour graph (KD-tree queries, no squidpy
+        round trip).
+    radius, n_neighbors : float | None, int | None
+        Parameters of the ``"radius"`` and ``"knn"`` graphs.
+    distance : {"euclidean", "geodesic"}
+        Micron axis written to ``distance_key``: straight-line distance to the
+        nearest border cell, or the shortest path along the spatial graph.
+    max_um : float | None
+        Geodesic search cutoff (microns); cells further away get NaN distance.
+    min_layer, max_layer : int | None
+        Analysis window on the signed layer (e.g. ``-7`` and ``15``): the BFS
+        and the distance queries stop at the window, and cells outside it are
+        left NaN. In-window layers and distances are unchanged.
     build_graph_if_missing : bool
-        Build a Delaunay graph when no precomputed graph is present.
+        Build the ``graph`` graph when no precomputed graph is present.
     layer_key, distance_key : str
         ``.obs`` columns written with the signed hop layer and signed microns.
+    n_jobs : int | None
+        Worker processes for the per-sample geometry (``None``/1 serial, -1 all
+        cores). Each sample's coordinates and sub-graph are shipped to a
+        worker; results and warnings are collected in sample order, so the
+        output does not depend on ``n_jobs``. With a single sample and a
+        compartment dict, the workers are per-compartment threads instead.
+    block_diagonal : bool
+        Lay all samples out as one block-diagonal graph and run the k-hop
+        count, border mask and BFS once for the whole cohort
+        (:func:`hplot._geometry.border_layers_blocks`); ``n_jobs`` then sets the
+        threads for the per-sample KD-trees. Identical output, much less
+        per-sample overhead for cohorts of many small tissues (e.g. TMA cores).
+        The geometry cache is not used in this mode.
+    geometry_cache : str | hplot.GeometryCache | None
+        Directory (or cache object) for the content-addressed geometry cache;
+        re-running with the same coordinates, base mask and parameters loads
+        each sample's layers from disk instead of recomputing them.
     copy : bool
         Return a modified copy instead of writing in place.
 
@@ -69,16 +176,28 @@ def border_layers(
     _require_anndata()
     adata = adata.copy() if copy else adata
 
-    if isinstance(base_categories, str):
-        base_categories = [base_categories]
+    multi = isinstance(base_categories, dict)
+    if multi:
+        if not base_categories:
+            raise ValueError("base_categories dict is empty; pass {name: categories}.")
+        compartments = {}
+        for name, cats in base_categories.items():
+            if "/" in str(name):    # HDF5 separator: would corrupt uns on write_h5ad
+                raise ValueError(f"Compartment name {name!r} must not contain '/'.")
+            cats = [cats] if isinstance(cats, str) else cats
+            compartments[str(name)] = [str(c) for c in cats]
+    else:
+        if isinstance(base_categories, str):
+            base_categories = [base_categories]
+        compartments = {"": [str(c) for c in base_categories]}
     if cluster_key not in adata.obs.columns:
         raise KeyError(f"cluster_key={cluster_key!r} not in adata.obs.")
     if spatial_key not in adata.obsm:
         raise KeyError(f"spatial_key={spatial_key!r} not in adata.obsm.")
 
     coords = np.asarray(adata.obsm[spatial_key], dtype=np.float64)[:, :2]
-    is_base = adata.obs[cluster_key].astype(str).isin(
-        [str(c) for c in base_categories]).to_numpy()
+    labels = adata.obs[cluster_key].astype(str)
+    masks = {name: labels.isin(cats).to_numpy() for name, cats in compartments.items()}
     sample = _sample_vector(adata, sample_key)
 
     have_graph = connectivity_key in adata.obsp
@@ -88,40 +207,78 @@ def border_layers(
             "run sq.gr.spatial_neighbors(adata) first or allow Delaunay fallback."
         )
     A_full = adata.obsp[connectivity_key] if have_graph else None
+    if A_full is None:
+        _check_graph(graph, radius, n_neighbors)
+
+    signed = {name: (np.full(adata.n_obs, np.nan, dtype=float),
+                     np.full(adata.n_obs, np.nan, dtype=float))
+              for name in compartments}
+
+    params = dict(k=k, n_min=n_min, ratio=ratio, max_edge=max_edge, graph=graph,
+                  radius=radius, n_neighbors=n_neighbors, distance=distance,
+                  max_um=max_um, min_layer=min_layer, max_layer=max_layer)
+    samples = [(s, np.where(sample == s)[0]) for s in np.unique(sample)]
+    tasks = [idx for _, idx in samples if idx.size >= 4]
+    workers = _resolve_n_jobs(n_jobs, len(tasks))
+    if multi:
+        # one process per sample already saturates the cores; otherwise spend
+        # n_jobs on the per-compartment threads
+        params["n_jobs"] = 1 if workers > 1 else n_jobs
+    else:
+        params["cache"] = geometry_cache
 
-    signed_um = np.full(adata.n_obs, np.nan, dtype=float)
-    signed_hops = np.full(adata.n_obs, np.nan, dtype=float)
+    def _payload(idx):
+        if A_full is None:
+            A_sub = None
+        elif idx.size == adata.n_obs:       # one sample: hand over the graph as-is
+            A_sub = A_full
+        else:
+            A_sub = A_full[idx][:, idx]
+        base = ({name: m[idx] for name, m in masks.items()} if multi
+                else masks[""][idx])
+        return coords[idx], base, A_sub, params
 
-    for s in np.unique(sample):
-        idx = np.where(sample == s)[0]
+    if block_diagonal:
+        results = iter(_border_layers_cohort(
+            coords, masks if multi else masks[""], sample, tasks, A_full,
+            {key: v for key, v in params.items() if key not in ("cache", "n_jobs")},
+            n_jobs))
+    elif workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_border_layers_sample, *_payload(idx))
+                       for idx in tasks]
+            results = iter([f.result() for f in futures])
+    else:
+        results = (_border_layers_sample(*_payload(idx)) for idx in tasks)
+
+    # Warnings are raised here, in sample order, whichever way the work ran.
+    for s, idx in samples:
         if idx.size < 4:
             warnings.warn(
                 f"Sample {s!r} has {idx.size} cells (< 4); border layers left NaN.",
                 stacklevel=2,
             )
             continue
-        A_sub = A_full[idx][:, idx] if A_full is not None else None
-        try:
-            um, hops = border_layers_from_coords(
-                coords[idx], is_base[idx], A=A_sub, k=k, n_min=n_min,
-                ratio=ratio, max_edge=max_edge,
-            )
-        except Exception as exc:  # e.g. QhullError on collinear/degenerate coords
+        out, err = next(results)
+        if err is not None:
             warnings.warn(
-                f"Border-layer computation failed for sample {s!r} "
-                f"({type(exc).__name__}: {exc}); left NaN.",
+                f"Border-layer computation failed for sample {s!r} ({err}); left NaN.",
                 stacklevel=2,
             )
             continue
-        signed_um[idx] = um
-        signed_hops[idx] = hops
+        for name, (um, hops) in (out.items() if multi else [("", out)]):
+            signed[name][0][idx] = um
+            signed[name][1][idx] = hops
+
+    def _n_layers(hops):
+        return int(np.unique(hops[np.isfinite(hops)]).size)
 
-    adata.obs[layer_key] = signed_hops
-    adata.obs[distance_key] = signed_um
-    adata.uns["hplot_border"] = {
+    info = {
         "cluster_key": str(cluster_key),
-        "base_categories": [str(c) for c in base_categories],
-        "graph_source": "precomputed" if A_full is not None else "delaunay",
+        "base_categories": [] if multi else compartments[""],
+        "graph_source": "precomputed" if A_full is not None else str(graph),
         "connectivity_key": str(connectivity_key),
         "spatial_key": str(spatial_key),
         "sample_key": "" if sample_key is None else str(sample_key),
@@ -129,8 +286,36 @@ def border_layers(
         "n_min": int(n_min),
         "ratio": float(ratio),
         "max_edge": float(max_edge),
+        "radius": float("nan") if radius is None else float(radius),
+        "n_neighbors": -1 if n_neighbors is None else int(n_neighbors),
+        "distance": str(distance),
+        "max_um": float("nan") if max_um is None else float(max_um),
+        "min_layer": float("nan") if min_layer is None else float(min_layer),
+        "max_layer": float("nan") if max_layer is None else float(max_layer),
         "layer_key": str(layer_key),
         "distance_key": str(distance_key),
-        "n_border_layers": int(np.unique(signed_hops[np.isfinite(signed_hops)]).size),
+        "n_jobs": int(_resolve_n_jobs(n_jobs, len(tasks)) if block_diagonal else workers),
+        "block_diagonal": bool(block_diagonal),
+        "geometry_cache": "" if geometry_cache is None or multi or block_diagonal else str(
+            getattr(geometry_cache, "root", geometry_cache)),
     }
+    if multi:
+        # per-compartment columns; tl.hplot(layer_key=...) picks one, and
+        # exclude_base needs base_categories passed explicitly
+        info["compartments"] = {}
+        for name, cats in compartments.items():
+            lkey, dkey = f"{layer_key}_{name}", f"{distance_key}_{name}"
+            adata.obs[lkey] = signed[name][1]
+            adata.obs[dkey] = signed[name][0]
+            info["compartments"][name] = {
+                "base_categories": cats,
+                "layer_key": lkey,
+                "distance_key": dkey,
+                "n_border_layers": _n_layers(signed[name][1]),
+            }
+    else:
+        adata.obs[layer_key] = signed[""][1]
+        adata.obs[distance_key] = signed[""][0]
+        info["n_border_layers"] = _n_layers(signed[""][1])
+    adata.uns["hplot_border"] = info
     return adata if copy else None
@@ -1,5 +1,8 @@
 import pandas as pd
 import numpy as np
+
+from ._permute import (_bar, besag_clifford_p, first_hits, merge_first, round_seed,
+                       run_chunks, sequential_rounds)
 from scipy.stats import (t, norm, mannwhitneyu, ttest_ind, chi2, rankdata,
                          kruskal, wilcoxon)
 
@@ -11,50 +14,336 @@ PVALUE_TEST_LABELS = {
 }
 
 
+def _cell_moments(values, codes, n_cells):
+    """Per-cell ``n``, column sums and centred sums of squares of ``values``.
+
+    ``codes`` assigns every row of the ``(N, T)`` ``values`` to one of
+    ``n_cells`` cells (e.g. layers). One sparse indicator product gives the
+    sums and a second the squared deviations from the cell mean (two-pass,
+    as ``np.std``); NaNs propagate as in ``np.mean``.
+    """
+    from scipy.sparse import csr_matrix
+
+    n_rows = codes.size
+    onehot = csr_matrix((np.ones(n_rows), (codes, np.arange(n_rows))),
+                        shape=(n_cells, n_rows))
+    n = np.bincount(codes, minlength=n_cells)
+    total = np.asarray(onehot @ values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dev = values - (total / n[:, None])[codes]
+    return n, total, np.asarray(onehot @ (dev * dev))
+
+
+def _moments_ci(n, total, m2, ci, use_t):
+    """``mean, ci_lower, ci_upper`` from cell moments (t or normal CI)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / n[:, None]
+        sem = np.sqrt(m2 / (n[:, None] - 1)) / np.sqrt(n)[:, None]
+    q = 1 - (1 - ci) / 2
+    z = np.full(n.shape, norm.ppf(q))
+    small = n > 1
+    tq = small if use_t else small & (n <= 30)
+    z[tq] = t.ppf(q, df=n[tq] - 1)
+    half = z[:, None] * sem
+    half[~small] = 0.0
+    return mean, mean - half, mean + half
+
+
+def _layer_cell_stats(values, codes, n_cells, ci, use_t):
+    """Per-cell ``mean, ci_lower, ci_upper, n`` of ``values`` columns.
+
+    The t quantile is evaluated once over the whole ``n`` array.
+    """
+    n, total, m2 = _cell_moments(values, codes, n_cells)
+    return (*_moments_ci(n, total, m2, ci, use_t), n)
+
+
+def _layer_cell_distance(df, distance_col, codes, n_cells):
+    """NaN-skipping per-cell mean of ``distance_col`` (``None`` if unset)."""
+    if not distance_col:
+        return np.full(n_cells, None, dtype=object)
+    d = df[distance_col].to_numpy(dtype=float)
+    ok = ~np.isnan(d)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (np.bincount(codes[ok], weights=d[ok], minlength=n_cells)
+                / np.bincount(codes[ok], minlength=n_cells))
+
+
 def compute_layer_stats(df, prop, layer_col, distance_col, ci=0.95, use_t=True):
-    grouped = df.groupby(layer_col)
-    summary = []
-
-    for layer, group in grouped:
-        values = group[prop].values
-        n = len(values)
-
-        if n > 1:
-            distance = group[distance_col].mean() if distance_col else None
-            mean = np.mean(values)
-            std = np.std(values, ddof=1)
-            sem = std / np.sqrt(n)
-
-            if use_t or n <= 30:
-                z = t.ppf(1 - (1 - ci) / 2, df=n - 1)
-            else:
-                z = norm.ppf(1 - (1 - ci) / 2)
-
-            ci_lower = mean - z * sem
-            ci_upper = mean + z * sem
-
-            summary.append({
-                'layer': layer,
-                'distance': distance,
-                "mean": mean,
-                "ci_lower": ci_lower,
-                "ci_upper": ci_upper,
-                "n": n
-            })
-        else:
-            distance = group[distance_col].mean() if distance_col else None
-            mean = np.mean(values)
-            
-            summary.append({
-                'layer': layer,
-                'distance': distance,
-                "mean": mean,
-                "ci_lower": mean,
-                "ci_upper": mean,
-                "n": n   
-            })        
+    """Per-layer mean of ``prop`` with a t (or normal) confidence interval.
+
+    Returns one row per layer (``layer, distance, mean, ci_lower, ci_upper,
+    n``), sorted by layer; layers with a single row get a zero-width CI.
+    """
+    values = df[prop].to_numpy(dtype=float)[:, None]
+    codes, layers = pd.factorize(df[layer_col], sort=True)
+    keep = codes >= 0
+    if not keep.all():
+        values, codes, df = values[keep], codes[keep], df[keep]
+    if codes.size == 0:
+        return pd.DataFrame()
+
+    mean, lo, hi, n = _layer_cell_stats(values, codes, len(layers), ci, use_t)
+    return pd.DataFrame({
+        "layer": np.asarray(layers),
+        "distance": _layer_cell_distance(df, distance_col, codes, len(layers)),
+        "mean": mean[:, 0],
+        "ci_lower": lo[:, 0],
+        "ci_upper": hi[:, 0],
+        "n": n,
+    })
+
+
+def compute_layer_stats_multi(df, props, layer_col, distance_col=None,
+                              group_col=None, ci=0.95, use_t=True):
+    """:func:`compute_layer_stats` for many targets and groups in one pass.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Long table with one row per observation.
+    props : str | sequence[str]
+        Target columns to summarise.
+    layer_col, distance_col, ci, use_t
+        As in :func:`compute_layer_stats`.
+    group_col : str | None
+        Optional grouping column; groups appear in order of first appearance
+        and rows with a missing group are dropped.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Long frame with columns ``[group,] target, layer, distance, mean,
+        ci_lower, ci_upper, n``, ordered by (group, target, layer). The rows
+        of one (group, target) equal ``compute_layer_stats`` on that subset.
+    """
+    props = [props] if isinstance(props, str) else list(props)
+    for col in props + [layer_col] + ([group_col] if group_col else []):
+        if col not in df.columns:
+            raise KeyError(f"Column '{col}' not found in DataFrame.")
 
-    return pd.DataFrame(summary)
+    lcode, layers = pd.factorize(df[layer_col], sort=True)
+    n_layers = len(layers)
+    if group_col:
+        gcode, groups = pd.factorize(df[group_col], sort=False)
+    else:
+        gcode, groups = np.zeros(len(df), dtype=np.intp), [None]
+    keep = (lcode >= 0) & (gcode >= 0)
+    cell = (gcode * n_layers + lcode)[keep]
+    # only (group, layer) cells that actually hold rows
+    used, codes = np.unique(cell, return_inverse=True)
+    sub = df[keep] if not keep.all() else df
+    values = sub[props].to_numpy(dtype=float)
+
+    mean, lo, hi, n = _layer_cell_stats(values, codes, used.size, ci, use_t)
+    dist = _layer_cell_distance(sub, distance_col, codes, used.size)
+
+    n_t = len(props)
+    # (cell, target) -> rows ordered by group, target, layer
+    gi, li = used // max(n_layers, 1), used % max(n_layers, 1)
+    order = np.lexsort((np.tile(li, n_t), np.repeat(np.arange(n_t), used.size),
+                        np.tile(gi, n_t)))
+    cell_idx = np.tile(np.arange(used.size), n_t)[order]
+    tgt_idx = np.repeat(np.arange(n_t), used.size)[order]
+    out = {}
+    if group_col:
+        out["group"] = np.asarray(groups, dtype=object)[gi[cell_idx]]
+    out["target"] = np.asarray(props, dtype=object)[tgt_idx]
+    out["layer"] = np.asarray(layers)[li[cell_idx]]
+    out["distance"] = dist[cell_idx]
+    out["mean"] = mean[cell_idx, tgt_idx]
+    out["ci_lower"] = lo[cell_idx, tgt_idx]
+    out["ci_upper"] = hi[cell_idx, tgt_idx]
+    out["n"] = n[cell_idx]
+    return pd.DataFrame(out)
+
+
+class LayerStatsAccumulator:
+    """Mergeable per-(group, target, layer) sufficient statistics.
+
+    Holds, for every (group, layer) cell, the row count, the per-target sum
+    and centred sum of squares, and the distance sum / count. Chunks can be
+    added with :meth:`update` and partial accumulators (e.g. one per node)
+    combined with :meth:`merge` (Chan's parallel update, so the variance
+    stays numerically stable), then turned into the same mean +/- CI curves
+    as :func:`compute_layer_stats` without ever concatenating the raw rows
+    (see :meth:`hplot.HPlot.from_accumulator`).
+
+    Parameters
+    ----------
+    targets : str | sequence[str]
+        Target columns.
+    layer : str
+        Layer column.
+    group : str | None
+        Optional grouping column.
+    distance : str | None
+        Optional distance column, averaged per layer (NaNs skipped).
+
+    Rows with a missing target, layer or group are dropped, as in
+    :meth:`hplot.HPlot.fit`.
+    """
+
+    def __init__(self, targets, layer, group=None, distance=None):
+        self.targets = [targets] if isinstance(targets, str) else list(targets)
+        self.layer = layer
+        self.group = group
+        self.distance = distance
+        self.groups_ = []                       # first-appearance order
+        self._cells = {}                        # (group index, layer) -> row
+        self._cell_group = np.zeros(0, dtype=np.int64)
+        self._cell_layer = []
+        self.n = np.zeros(0, dtype=np.int64)
+        self.sum = np.zeros((0, len(self.targets)))
+        self.m2 = np.zeros((0, len(self.targets)))
+        self.dist_sum = np.zeros(0)
+        self.dist_n = np.zeros(0, dtype=np.int64)
+
+    def __repr__(self):
+        return (f"LayerStatsAccumulator(targets={self.targets!r}, layer={self.layer!r}, "
+                f"group={self.group!r}, n_rows={int(self.n.sum())})")
+
+    def _rows(self, gidx, layers):
+        """Row of every ``(group index, layer)`` cell, appending new cells."""
+        rows = np.empty(len(gidx), dtype=np.int64)
+        new_g = []
+        for i, key in enumerate(zip(gidx.tolist(), layers)):
+            row = self._cells.get(key)
+            if row is None:
+                row = self._cells[key] = len(self._cell_layer)
+                self._cell_layer.append(key[1])
+                new_g.append(key[0])
+            rows[i] = row
+        if new_g:
+            k, t_ = len(new_g), len(self.targets)
+            self._cell_group = np.concatenate([self._cell_group, new_g])
+            self.n = np.concatenate([self.n, np.zeros(k, dtype=np.int64)])
+            self.sum = np.vstack([self.sum, np.zeros((k, t_))])
+            self.m2 = np.vstack([self.m2, np.zeros((k, t_))])
+            self.dist_sum = np.concatenate([self.dist_sum, np.zeros(k)])
+            self.dist_n = np.concatenate([self.dist_n, np.zeros(k, dtype=np.int64)])
+        return rows
+
+    def _group_index(self, labels):
+        lookup = {g: i for i, g in enumerate(self.groups_)}
+        out = np.empty(len(labels), dtype=np.int64)
+        for i, g in enumerate(labels):
+            if g not in lookup:
+                lookup[g] = len(self.groups_)
+                self.groups_.append(g)
+            out[i] = lookup[g]
+        return out
+
+    def _combine(self, rows, n, total, m2, dsum, dn):
+        na = self.n[rows]
+        nt = na + n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = total / n[:, None] - self.sum[rows] / na[:, None]
+            cross = delta * delta * (na * n / nt)[:, None]
+        both = (na > 0) & (n > 0)
+        self.m2[rows] += m2 + np.where(both[:, None], cross, 0.0)
+        self.sum[rows] += total
+        self.n[rows] = nt
+        self.dist_sum[rows] += dsum
+        self.dist_n[rows] += dn
+
+    def update(self, df):
+        """Add the rows of ``df`` (one chunk of the long table); returns self."""
+        cols = self.targets + [self.layer] + ([self.group] if self.group else [])
+        for col in cols + ([self.distance] if self.distance else []):
+            if col not in df.columns:
+                raise KeyError(f"Column '{col}' not found in DataFrame.")
+        df = df.dropna(subset=cols)
+        if df.empty:
+            return self
+        lcode, layers = pd.factorize(df[self.layer], sort=True)
+        if self.group:
+            gcode, glabels = pd.factorize(df[self.group], sort=False)
+        else:
+            gcode, glabels = np.zeros(len(df), dtype=np.intp), [None]
+        gidx = self._group_index(list(glabels))
+        used, codes = np.unique(gcode * len(layers) + lcode, return_inverse=True)
+        n, total, m2 = _cell_moments(df[self.targets].to_numpy(dtype=float),
+                                     codes, used.size)
+        if self.distance:
+            d = df[self.distance].to_numpy(dtype=float)
+            ok = ~np.isnan(d)
+            dsum = np.bincount(codes[ok], weights=d[ok], minlength=used.size)
+            dn = np.bincount(codes[ok], minlength=used.size)
+        else:
+            dsum, dn = np.zeros(used.size), np.zeros(used.size, dtype=np.int64)
+        rows = self._rows(gidx[used // len(layers)],
+                          list(np.asarray(layers)[used % len(layers)]))
+        self._combine(rows, n, total, m2, dsum, dn)
+        return self
+
+    def _check_compatible(self, other):
+        if (self.targets, self.layer, self.group, self.distance) != (
+                other.targets, other.layer, other.group, other.distance):
+            raise ValueError("Cannot merge accumulators over different columns: "
+                             f"{self!r} vs {other!r}.")
+
+    def merge(self, other):
+        """Fold another accumulator (same columns) into this one; returns self."""
+        self._check_compatible(other)
+        if other.n.size:
+            gidx = self._group_index(other.groups_)[other._cell_group]
+            rows = self._rows(gidx, other._cell_layer)
+            self._combine(rows, other.n, other.sum, other.m2,
+                          other.dist_sum, other.dist_n)
+        return self
+
+    def save(self, path):
+        """Write the statistics to a compressed ``.npz`` (no pickling)."""
+        meta = np.array([self.layer, self.group or "", self.distance or ""])
+        np.savez_compressed(
+            path, meta=meta, targets=np.array(self.targets, dtype=str),
+            groups=np.array(self.groups_ if self.group else [""]),
+            cell_group=self._cell_group, cell_layer=np.array(self._cell_layer),
+            n=self.n, sum=self.sum, m2=self.m2,
+            dist_sum=self.dist_sum, dist_n=self.dist_n)
+
+    @classmethod
+    def load(cls, path):
+        """Read an accumulator written by :meth:`save`."""
+        with np.load(path, allow_pickle=False) as z:
+            layer, group, distance = (str(v) for v in z["meta"])
+            acc = cls(list(z["targets"]), layer, group or None, distance or None)
+            acc.groups_ = z["groups"].tolist() if acc.group else [None]
+            acc._cell_group = z["cell_group"]
+            acc._cell_layer = z["cell_layer"].tolist()
+            acc._cells = {key: i for i, key in enumerate(
+                zip(acc._cell_group.tolist(), acc._cell_layer))}
+            acc.n, acc.sum, acc.m2 = z["n"], z["sum"], z["m2"]
+            acc.dist_sum, acc.dist_n = z["dist_sum"], z["dist_n"]
+        return acc
+
+    def to_stats(self, ci=0.95, use_t=True):
+        """Per-curve :func:`compute_layer_stats` frames, keyed as in ``HPlot.fit``."""
+        mean, lo, hi = _moments_ci(self.n, self.sum, self.m2, ci, use_t)
+        layers = np.asarray(self._cell_layer)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            dist = self.dist_sum / self.dist_n
+        multi = len(self.targets) > 1
+        out = {}
+        for g_i, grp in enumerate(self.groups_):
+            rows = np.flatnonzero(self._cell_group == g_i)
+            rows = rows[np.argsort(layers[rows], kind="stable")]
+            for j, prop in enumerate(self.targets):
+                if self.group:
+                    key = f"{grp} \u2013 {prop}" if multi else grp
+                else:
+                    key = prop if multi else "overall"
+                out[key] = pd.DataFrame({
+                    "layer": layers[rows],
+                    "distance": (dist[rows] if self.distance
+                                 else np.full(rows.size, None, dtype=object)),
+                    "mean": mean[rows, j],
+                    "ci_lower": lo[rows, j],
+                    "ci_upper": hi[rows, j],
+                    "n": self.n[rows],
+                })
+        return out
 
 
 def _adjust_pvalues(pvals, method):
@@ -140,14 +429,56 @@ def compute_layer_pvalues(
     -------
     pandas.DataFrame
         Columns: ``layer, distance, p_value, p_adj, stat, n1, n2`` sorted by
-        layer.
+        layer; empty, with the same columns, when no row has a layer.
     """
-    for col in (prop, layer_col, group_col):
-        if col not in df.columns:
-            raise KeyError(f"Column '{col}' not found in DataFrame.")
-    if distance_col is not None and distance_col not in df.columns:
-        raise KeyError(f"Column '{distance_col}' not found in DataFrame.")
+    return _layer_pvalue_frames(df, [prop], layer_col, group_col, groups, test,
+                                distance_col, min_n, correction)[0]
+
+
+def compute_layer_pvalues_multi(
+    df,
+    props,
+    layer_col,
+    group_col,
+    groups=None,
+    test="mannwhitney",
+    distance_col=None,
+    min_n=3,
+    correction=None,
+):
+    """:func:`compute_layer_pvalues` for many target columns in one batch.
 
+    Every (target, layer) comparison is collected first and all of them are
+    tested together (:func:`_two_sample_tests`), so a 1000-target screen
+    costs a handful of vectorised scipy calls instead of one per layer and
+    target.
+
+    Parameters
+    ----------
+    props : str | sequence[str]
+        Target columns; each is tested exactly as ``compute_layer_pvalues``
+        would (its own NaN rows dropped, ``p_adj`` corrected across layers
+        within the target).
+    df, layer_col, group_col, groups, test, distance_col, min_n, correction
+        As in :func:`compute_layer_pvalues`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Long frame with columns ``target, layer, distance, p_value, stat, n1,
+        n2, p_adj``, ordered by target then layer.
+    """
+    props = [props] if isinstance(props, str) else list(props)
+    frames = _layer_pvalue_frames(df, props, layer_col, group_col, groups, test,
+                                  distance_col, min_n, correction)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat([f.assign(target=p_)[["target"] + list(f.columns)]
+                      for p_, f in zip(props, frames)], ignore_index=True)
+
+
+def _resolve_group_pair(df, group_col, groups):
+    """``(group_a, group_b)``: ``groups`` or the two values of ``group_col``."""
     if groups is None:
         uniq = pd.unique(df[group_col].dropna())
         if len(uniq) != 2:
@@ -155,57 +486,255 @@ def compute_layer_pvalues(
                 "compute_layer_pvalues needs exactly two groups; found "
                 f"{len(uniq)} in '{group_col}'. Pass groups=(a, b) to choose a pair."
             )
-        group_a, group_b = uniq[0], uniq[1]
-    else:
-        if len(groups) != 2:
-            raise ValueError("groups must be a pair (group_a, group_b).")
-        group_a, group_b = groups
+        return uniq[0], uniq[1]
+    if len(groups) != 2:
+        raise ValueError("groups must be a pair (group_a, group_b).")
+    return tuple(groups)
+
 
+def _check_two_sample_test(test):
     if test not in ("mannwhitney", "ttest", "welch"):
         raise ValueError(
             f"Unknown test '{test}'. Use 'mannwhitney', 'ttest' or 'welch'."
         )
 
-    def _run_test(a, b):
+
+def _mwu_method(a, b):
+    """The method scipy's ``mannwhitneyu(method="auto")`` picks for one pair."""
+    if a.size > 8 and b.size > 8:
+        return "asymptotic"
+    xy = np.concatenate([a, b])
+    return "asymptotic" if np.unique(xy).size < xy.size else "exact"
+
+
+def _two_sample_tests(pairs, test):
+    """``(stat, p)`` arrays for a list of ``(a, b)`` sample pairs.
+
+    Pairs of equal sizes (and, for Mann-Whitney, the same exact/asymptotic
+    choice ``method="auto"`` would make for that pair alone) are stacked
+    into ``(k, n)`` arrays and tested in one vectorised scipy call along
+    ``axis=1``; each result equals the per-pair call. A bucket that raises
+    is retried pair by pair, and a pair that raises yields NaN.
+    """
+    stat = np.full(len(pairs), np.nan)
+    pval = np.full(len(pairs), np.nan)
+
+    def _run(a, b, method="auto"):
+        if test == "mannwhitney":
+            return mannwhitneyu(a, b, alternative="two-sided", axis=-1, method=method)
+        return ttest_ind(a, b, equal_var=test == "ttest", axis=-1)
+
+    buckets = {}
+    for i, (a, b) in enumerate(pairs):
+        key = (a.size, b.size)
+        if test == "mannwhitney":
+            key += (_mwu_method(a, b),)
+        buckets.setdefault(key, []).append(i)
+    for key, idx in buckets.items():
+        method = key[2] if test == "mannwhitney" else "auto"
         try:
-            if test == "mannwhitney":
-                res = mannwhitneyu(a, b, alternative="two-sided")
-                return res.statistic, res.pvalue
-            equal_var = test == "ttest"
-            res = ttest_ind(a, b, equal_var=equal_var)
-            return res.statistic, res.pvalue
+            res = _run(np.stack([pairs[i][0] for i in idx]),
+                       np.stack([pairs[i][1] for i in idx]), method)
+            stat[idx], pval[idx] = res.statistic, res.pvalue
         except ValueError:
-            return np.nan, np.nan
+            for i in idx:
+                try:
+                    res = _run(*pairs[i], method)
+                    stat[i], pval[i] = res.statistic, res.pvalue
+                except ValueError:
+                    pass
+    return stat, pval
 
-    rows = []
-    for layer, group in df.groupby(layer_col):
-        distance = group[distance_col].mean() if distance_col else None
-        a = group.loc[group[group_col] == group_a, prop].dropna().to_numpy()
-        b = group.loc[group[group_col] == group_b, prop].dropna().to_numpy()
-        n1, n2 = a.size, b.size
-
-        if n1 >= min_n and n2 >= min_n:
-            stat, pval = _run_test(a, b)
-        else:
-            stat, pval = np.nan, np.nan
-
-        rows.append({
-            "layer": layer,
-            "distance": distance,
-            "p_value": pval,
-            "stat": stat,
-            "n1": n1,
-            "n2": n2,
-        })
 
-    out = pd.DataFrame(rows).sort_values("layer").reset_index(drop=True)
-    out["p_adj"] = _adjust_pvalues(out["p_value"].to_numpy(), correction)
-    return out
+def _layer_pvalue_permutations(df, prop, layer_col, group_col, groups=None,
+                               test="mannwhitney", min_n=3, unit_col=None,
+                               n_perm=999, seed=None, batch_size=256):
+    """:func:`compute_layer_pvalues` p-values under group-label permutations.
+
+    Labels are exchanged between *units* of the two compared groups:
+    ``unit_col`` values (e.g. patients, so all rows of one patient move
+    together), or single rows when ``unit_col`` is ``None``. Each layer's
+    pooled values never change under a permutation, only which of them
+    fall in which arm, so the rows are split per layer once and every batch
+    of ``batch_size`` permutations is tested with one vectorised scipy call
+    per (layer, arm size) -- the same test and ``min_n`` gate as
+    :func:`compute_layer_pvalues`, without copying the table.
+
+    Parameters
+    ----------
+    df, prop, layer_col, group_col, groups, test, min_n
+        As in :func:`compute_layer_pvalues`.
+    unit_col : str | None
+        Column identifying the exchangeable unit; every unit must carry a
+        single group label.
+    n_perm : int
+        Number of permutations.
+    seed : int | numpy.random.Generator | None
+        Seed (or generator) for the label shuffles.
+    batch_size : int
+        Permutations drawn and tested together.
+
+    Returns
+    -------
+    (layers, pvalues) : tuple[numpy.ndarray, numpy.ndarray]
+        Sorted layer values and an ``(n_perm, n_layers)`` array of
+        uncorrected p-values (NaN where a layer is untested).
+    """
+    for col in [prop, layer_col, group_col] + ([unit_col] if unit_col else []):
+        if col not in df.columns:
+            raise KeyError(f"Column '{col}' not found in DataFrame.")
+    group_a, group_b = _resolve_group_pair(df, group_col, groups)
+    _check_two_sample_test(test)
+
+    codes, layers = pd.factorize(df[layer_col], sort=True)
+    n_layers = len(layers)
+    grp = df[group_col]
+    arm = np.where((grp == group_a).to_numpy(), 0,
+                   np.where((grp == group_b).to_numpy(), 1, -1))
+    in_arm = arm >= 0
+    if unit_col is None:
+        unit_arm = arm[in_arm]
+        unit = np.arange(unit_arm.size)
+    else:
+        ucode, _ = pd.factorize(df[unit_col])
+        in_arm &= ucode >= 0
+        uc, unit = np.unique(ucode[in_arm], return_inverse=True)
+        unit_arm = np.full(uc.size, -1)
+        unit_arm[unit] = arm[in_arm]
+        if np.any(unit_arm[unit] != arm[in_arm]):
+            raise ValueError(f"Every '{unit_col}' must belong to a single group "
+                             f"to permute labels per {unit_col}.")
+    # pooled rows per layer: unit index and value (fixed under permutation)
+    v = df[prop].to_numpy(dtype=float)[in_arm]
+    lc = codes[in_arm]
+    ok = (lc >= 0) & ~np.isnan(v)
+    per_layer = []
+    for li in range(n_layers):
+        m = ok & (lc == li)
+        vals = v[m]
+        per_layer.append((unit[m], vals, np.unique(vals).size < vals.size))
+
+    rng = np.random.default_rng(seed)
+    pvals = np.full((n_perm, n_layers), np.nan)
+    for start in range(0, n_perm, batch_size):
+        stop = min(start + batch_size, n_perm)
+        labels = rng.permuted(np.tile(unit_arm, (stop - start, 1)), axis=1)
+        for li, (members, vals, ties) in enumerate(per_layer):
+            in_a = labels[:, members] == 0
+            n1 = in_a.sum(axis=1)
+            for m in np.unique(n1):
+                if m < min_n or vals.size - m < min_n:
+                    continue
+                rows = np.flatnonzero(n1 == m)
+                # stable: arm members keep their table order, as in the per-layer test
+                order = np.argsort(~in_a[rows], axis=1, kind="stable")
+                a, b = vals[order[:, :m]], vals[order[:, m:]]
+                try:
+                    if test == "mannwhitney":
+                        method = ("asymptotic" if (m > 8 and vals.size - m > 8) or ties
+                                  else "exact")
+                        res = mannwhitneyu(a, b, alternative="two-sided", axis=1,
+                                           method=method)
+                    else:
+                        res = ttest_ind(a, b, equal_var=test == "ttest", axis=1)
+                except ValueError:
+                    continue
+                pvals[start + rows, li] = res.pvalue
+    return np.asarray(layers), pvals
+
+
+def _layer_pvalue_frames(df, props, layer_col, group_col, groups, test,
+                         distance_col, min_n, correction):
+    """One :func:`compute_layer_pvalues` frame per target, tested in one batch."""
+    for col in list(props) + [layer_col, group_col]:
+        if col not in df.columns:
+            raise KeyError(f"Column '{col}' not found in DataFrame.")
+    if distance_col is not None and distance_col not in df.columns:
+        raise KeyError(f"Column '{distance_col}' not found in DataFrame.")
+
+    group_a, group_b = _resolve_group_pair(df, group_col, groups)
+    _check_two_sample_test(test)
+
+    codes, layers = pd.factorize(df[layer_col], sort=True)
+    n_layers = len(layers)
+    grp = df[group_col]
+    arm = np.where((grp == group_a).to_numpy(), 0,
+                   np.where((grp == group_b).to_numpy(), 1, -1))
+    in_arm = (codes >= 0) & (arm >= 0)
+    cell_all = codes * 2 + arm
+    dist = _layer_cell_distance(df[codes >= 0], distance_col, codes[codes >= 0],
+                                n_layers)
+
+    pairs, owner = [], []
+    sizes = []
+    for t_i, prop in enumerate(props):
+        v = df[prop].to_numpy(dtype=float)
+        ok = in_arm & ~np.isnan(v)
+        cell = cell_all[ok]
+        # stable: rows keep their table order within each (layer, arm)
+        order = np.argsort(cell, kind="stable")
+        vals = v[ok][order]
+        counts = np.bincount(cell, minlength=2 * n_layers).reshape(n_layers, 2)
+        bounds = np.concatenate([[0], np.cumsum(counts.ravel())])
+        sizes.append(counts)
+        for li in np.flatnonzero((counts[:, 0] >= min_n) & (counts[:, 1] >= min_n)):
+            a = vals[bounds[2 * li]:bounds[2 * li + 1]]
+            b = vals[bounds[2 * li + 1]:bounds[2 * li + 2]]
+            pairs.append((a, b))
+            owner.append((t_i, li))
+    stat, pval = _two_sample_tests(pairs, test)
+
+    frames = []
+    owner = np.asarray(owner, dtype=np.int64).reshape(-1, 2)
+    for t_i in range(len(props)):
+        st = np.full(n_layers, np.nan)
+        pv = np.full(n_layers, np.nan)
+        mine = owner[:, 0] == t_i
+        st[owner[mine, 1]] = stat[mine]
+        pv[owner[mine, 1]] = pval[mine]
+        out = pd.DataFrame({
+            "layer": np.asarray(layers),
+            "distance": dist,
+            "p_value": pv,
+            "stat": st,
+            "n1": sizes[t_i][:, 0],
+            "n2": sizes[t_i][:, 1],
+        })
+        out["p_adj"] = _adjust_pvalues(out["p_value"].to_numpy(), correction)
+        frames.append(out)
+    return frames
 
 # ---------------------------------------------------------------------------
 # Single-slide spatial-uniformity permutation test
 # ---------------------------------------------------------------------------
 
+def _uniformity_stat(vals, codes, n_layers):
+    """Sum of squared deviations of the per-layer means from their mean."""
+    ok = ~np.isnan(vals)
+    n = np.bincount(codes[ok], minlength=n_layers)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        props = np.bincount(codes[ok], weights=vals[ok], minlength=n_layers) / n
+    if not np.isfinite(props).any():
+        return 0.0
+    return float(np.nansum((props - np.nanmean(props)) ** 2))
+
+
+def _uniformity_null_chunk(rng, start, stop, shared, progress=False, *, n_layers):
+    """Null statistics of draws ``start..stop-1``; each draw reshuffles the last."""
+    vals = np.array(shared["tgt"])
+    codes = shared["codes"]
+    bar = _bar(stop - start, "perm") if progress else None
+    out = np.empty(stop - start)
+    for i in range(stop - start):
+        rng.shuffle(vals)
+        out[i] = _uniformity_stat(vals, codes, n_layers)
+        if bar is not None:
+            bar.update(1)
+    if bar is not None:
+        bar.close()
+    return out
+
+
 def spatial_uniformity_test(
     cells_df,
     layer_col,
@@ -213,6 +742,8 @@ def spatial_uniformity_test(
     n_perm=2000,
     seed=42,
     progress=True,
+    n_jobs=None,
+    chunk_size=None,
 ):
     """Single-slide spatial-uniformity permutation test.
 
@@ -244,6 +775,13 @@ def spatial_uniformity_test(
         RNG seed. Default 42.
     progress : bool
         Show a tqdm progress bar if available. Default True.
+    n_jobs : int | None
+        Worker processes for the null (``None``/1 serial, -1 all cores).
+    chunk_size : int | None
+        Draws per independently seeded chunk. ``None`` keeps one stream per
+        worker (the historical single stream when serial), so the null
+        depends on ``n_jobs``; an integer makes it independent of ``n_jobs``.
+        See :mod:`hplot._permute`.
 
     Returns
     -------
@@ -251,31 +789,15 @@ def spatial_uniformity_test(
         ``observed_stat`` (float), ``perm_p`` (float),
         ``null_distribution`` (numpy.ndarray of length ``n_perm``).
     """
-    rng_local = np.random.default_rng(seed)
-    df = cells_df.dropna(subset=[layer_col]).copy()
-    df[layer_col] = df[layer_col].astype(int)
-
-    def _curve_stat(tgt_values):
-        tmp = df[[layer_col]].copy()
-        tmp["_tgt"] = np.asarray(tgt_values, dtype=float)
-        props = tmp.groupby(layer_col)["_tgt"].mean()
-        return float(np.sum((props - props.mean()) ** 2))
-
-    tgt_vals = df[target_col].to_numpy(dtype=float).copy()
-    observed_stat = _curve_stat(tgt_vals)
-
-    iterator = range(n_perm)
-    if progress:
-        try:
-            from tqdm.auto import tqdm as _tqdm
-            iterator = _tqdm(iterator, desc="perm", leave=False)
-        except ImportError:
-            pass
-
-    null_dist = np.empty(n_perm)
-    for i in iterator:
-        rng_local.shuffle(tgt_vals)
-        null_dist[i] = _curve_stat(tgt_vals)
+    df = cells_df.dropna(subset=[layer_col])
+    codes, layers = pd.factorize(df[layer_col].astype(int))
+    tgt_vals = df[target_col].to_numpy(dtype=float)
+    observed_stat = _uniformity_stat(tgt_vals, codes, len(layers))
+
+    null_dist = np.concatenate(run_chunks(
+        _uniformity_null_chunk, n_perm, dict(tgt=tgt_vals, codes=codes),
+        seed=seed, n_jobs=n_jobs, chunk_size=chunk_size, progress=progress,
+        n_layers=len(layers)))
     perm_p = float((null_dist >= observed_stat).mean())
     return dict(observed_stat=observed_stat, perm_p=perm_p,
                 null_distribution=null_dist)
@@ -671,24 +1193,90 @@ def binarize(series, min_per_group=10, method="median"):
     return g
 
 
+def _band_scan(h, mask, min_w):
+    """Largest-mass contiguous run of ``h`` within ``mask``, for every row at once.
+
+    ``h`` and ``mask`` are ``(n_rows, n_layers)``. A run is a maximal stretch
+    of ``mask``; its running mass counts once it is at least ``min_w`` layers
+    long, and a row's best band is the first position where that mass reaches
+    its (positive) maximum. The scan walks the layers once with per-row state,
+    so each running sum is accumulated in the same order as a scalar loop.
+
+    Returns ``(mass, start_idx, end_idx)`` arrays of length ``n_rows``, with
+    ``mass == 0`` and ``-1`` indices where no run qualifies.
+    """
+    h = np.asarray(h, dtype=float)
+    mask = np.asarray(mask, dtype=bool)
+    n_rows, n_layers = h.shape
+    best = np.zeros(n_rows)
+    bs = np.full(n_rows, -1)
+    be = np.full(n_rows, -1)
+    rm = np.zeros(n_rows)
+    rl = np.zeros(n_rows, dtype=int)
+    start = np.zeros(n_rows, dtype=int)
+    for li in range(n_layers):
+        on = mask[:, li]
+        start = np.where(on & (rl == 0), li, start)
+        rm = np.where(on, rm + h[:, li], 0.0)
+        rl = np.where(on, rl + 1, 0)
+        better = (rl >= min_w) & (rm > best)
+        best = np.where(better, rm, best)
+        bs = np.where(better, start, bs)
+        be = np.where(better, li, be)
+    return best, bs, be
+
+
 def _cms_best_band(H, thr, min_w):
     """Find the contiguous supra-threshold run with largest cluster mass."""
-    L = len(H)
     supra = np.where(np.isnan(H), False, H > thr)
-    best = 0.0; bs = be = -1; rm = 0.0; rl = 0; start = 0
-    for l in range(L):
-        if supra[l]:
-            if rl == 0:
-                start = l
-            rm += H[l]; rl += 1
-            if rl >= min_w and rm > best:
-                best = rm; bs = start; be = l
-        else:
-            rm = 0.0; rl = 0
+    m, bs, be = (a[0] for a in _band_scan(H[None, :], supra[None, :], min_w))
     if be < 0:
         return 0.0, (-1, -1, -1)
     peak = bs + int(np.nanargmax(H[bs:be + 1]))
-    return best, (bs, be, peak)
+    return float(m), (int(bs), int(be), peak)
+
+
+def _cms_best_band_batch(H, thr, min_w):
+    """:func:`_cms_best_band` masses for every row of a ``(B, L)`` H matrix."""
+    return _band_scan(H, np.where(np.isnan(H), False, H > thr), min_w)[0]
+
+
+def _cms_shared(cache, g_lab):
+    """Flatten the ragged :func:`_cms_prep` cache into arrays a worker can map."""
+    live = [c for c in cache if c is not None]
+    sizes = [0 if c is None else c[2] for c in cache]
+    return dict(
+        g_lab=g_lab,
+        R=np.concatenate([c[0] for c in live]) if live else np.empty(0),
+        pos=np.concatenate([c[3] for c in live]) if live else np.empty(0, int),
+        offs=np.concatenate([[0], np.cumsum(sizes)]).astype(int),
+        C=np.array([1.0 if c is None else c[1] for c in cache]),
+    )
+
+
+def _cms_null_chunk(rng, start, stop, shared, progress=False, *, k, min_per_group,
+                    thr, min_w, batch_size):
+    """Best-band masses of label permutations ``start..stop-1``."""
+    g_lab, R, pos, offs, C = (shared[key] for key in ("g_lab", "R", "pos", "offs", "C"))
+    n = stop - start
+    null = np.empty(n)
+    bar = _bar(n, "label permutations") if progress else None
+    for b0 in range(0, n, batch_size):
+        b1 = min(b0 + batch_size, n)
+        # one permutation per row, drawn in the same order as a serial loop
+        gp = np.stack([rng.permutation(g_lab) for _ in range(b1 - b0)])
+        Hn = np.full((b1 - b0, len(C)), np.nan)
+        for li in range(len(C)):
+            lo, hi = offs[li], offs[li + 1]
+            if hi > lo:
+                Hn[:, li] = _cms_H_batch(R[lo:hi], C[li], int(hi - lo),
+                                         gp[:, pos[lo:hi]], k, min_per_group)
+        null[b0:b1] = _cms_best_band_batch(Hn, thr, min_w)
+        if bar is not None:
+            bar.update(b1 - b0)
+    if bar is not None:
+        bar.close()
+    return null
 
 
 def _cms_prep(mat, labeled, n_layers):
@@ -727,6 +1315,25 @@ def _cms_H_from(R, C, N, grp, k, min_per_group):
     return (12.0 / (N * (N + 1)) * s - 3.0 * (N + 1)) / C
 
 
+def _cms_H_batch(R, C, N, grp, k, min_per_group):
+    """:func:`_cms_H_from` for a ``(B, N)`` batch of group assignments.
+
+    Per-group rank sums are one matmul of the one-hot assignment with the
+    ranks; ranks are multiples of 1/2, so the sums are exact and H matches
+    the scalar path bit for bit.
+    """
+    s = np.zeros(grp.shape[0])
+    ok = np.ones(grp.shape[0], dtype=bool)
+    for g in range(k):
+        onehot = (grp == g).astype(float)
+        ng = onehot.sum(axis=1)
+        ok &= ng >= min_per_group
+        with np.errstate(divide="ignore", invalid="ignore"):
+            s += (onehot @ R) ** 2 / ng
+    H = (12.0 / (N * (N + 1)) * s - 3.0 * (N + 1)) / C
+    return np.where(ok, H, np.nan)
+
+
 def cluster_mass_screen(
     mat,
     group_of,
@@ -738,6 +1345,11 @@ def cluster_mass_screen(
     n_perm=2000,
     seed=42,
     progress=True,
+    batch_size=512,
+    n_jobs=None,
+    chunk_size=None,
+    n_perm_max=None,
+    n_exceed=10,
 ):
     """Kruskal-Wallis cluster-mass permutation test for spatial border profiles.
 
@@ -780,6 +1392,25 @@ def cluster_mass_screen(
     progress : bool
         Show a ``tqdm`` progress bar during permutations if the package is
         available.  Default True.
+    batch_size : int
+        Permutations evaluated together: H for a batch is one matrix product
+        per layer and group, and the best-band scan runs across the batch.
+        Results do not depend on it.  Default 512.
+    n_jobs : int | None
+        Worker processes for the permutations (``None``/1 serial, -1 all
+        cores); the rank cache reaches them through shared memory.
+    chunk_size : int | None
+        Permutations per independently seeded chunk. ``None`` keeps one
+        stream per worker (the historical single stream when serial), so the
+        null depends on ``n_jobs``; an integer makes it independent of
+        ``n_jobs``.  See :mod:`hplot._permute`.
+    n_perm_max : int | None
+        Enable sequential (Besag-Clifford) stopping: after the first *n_perm*
+        permutations, keep drawing in doubling rounds only until the null has
+        matched the observed mass *n_exceed* times, up to *n_perm_max*
+        permutations.  Default None (a fixed *n_perm*).
+    n_exceed : int
+        Exceedances after which sequential drawing stops.  Default 10.
 
     Returns
     -------
@@ -798,7 +1429,12 @@ def cluster_mass_screen(
             Start index, end index, and peak index into *grid* for the best
             cluster.  All -1 if no supra-threshold cluster was found.
         ``perm_p`` : float
-            Permutation p-value, lower-bounded at ``1 / n_perm``.
+            Permutation p-value, lower-bounded at ``1 / n_perm``.  With
+            *n_perm_max* the sequential p-value: ``n_exceed / L`` if the
+            *n_exceed*-th exceedance came at permutation ``L``, otherwise
+            ``(g + 1) / (n_draws + 1)``.
+        ``n_draws`` : int
+            Permutations drawn (``n_perm`` unless sequential).
         ``group_sizes`` : list of int
             Number of labeled patients in each group.
     """
@@ -831,28 +1467,30 @@ def cluster_mass_screen(
     mass, (bs, be, pk) = _cms_best_band(H_obs, thr, min_cluster_w)
 
     # ── Permutation null distribution ──────────────────────────────────────
-    try:
-        from tqdm.auto import tqdm as _tqdm
-    except ImportError:
-        _tqdm = None
-
-    rng = np.random.default_rng(seed)
-    null = np.empty(n_perm)
-    perm_iter = range(n_perm)
-    if progress and _tqdm is not None:
-        perm_iter = _tqdm(perm_iter, desc="label permutations", leave=False)
-
-    for b in perm_iter:
-        gp = rng.permutation(g_lab)
-        Hn = np.full(n_layers, np.nan)
-        for li, c in enumerate(cache):
-            if c is None:
-                continue
-            R, C, N, p, _v = c
-            Hn[li] = _cms_H_from(R, C, N, gp[p], k, min_per_group)
-        null[b], _ = _cms_best_band(Hn, thr, min_cluster_w)
-
-    perm_p = max(float((null >= mass).mean()), 1.0 / n_perm) if mass > 0 else 1.0
+    shared = _cms_shared(cache, g_lab)
+
+    def _null(n, seed_):
+        return np.concatenate(run_chunks(
+            _cms_null_chunk, n, shared, seed=seed_, n_jobs=n_jobs,
+            chunk_size=chunk_size, progress=progress, k=k,
+            min_per_group=min_per_group, thr=thr, min_w=min_cluster_w,
+            batch_size=batch_size))
+
+    n_draws = n_perm
+    if n_perm_max is None or int(n_perm_max) <= n_perm or mass <= 0:
+        null = _null(n_perm, seed)
+        perm_p = max(float((null >= mass).mean()), 1.0 / n_perm) if mass > 0 else 1.0
+    else:
+        h = int(n_exceed)
+        first = np.full(h, np.inf)
+        for r, (lo, hi) in enumerate(sequential_rounds(n_perm, int(n_perm_max))):
+            first = merge_first(first, first_hits(_null(hi - lo, round_seed(seed, r))
+                                                  >= mass, h, lo), h)
+            n_draws = hi
+            if np.isfinite(first[-1]):
+                break
+        perm_p, n_draws = besag_clifford_p(first, n_draws)
+        perm_p, n_draws = float(perm_p), int(n_draws)
 
     return dict(
         thr=thr,
@@ -861,6 +1499,7 @@ def cluster_mass_screen(
         mass=mass,
         band=(bs, be, pk),
         perm_p=perm_p,
+        n_draws=int(n_draws),
         group_sizes=[int((g_lab == g).sum()) for g in range(k)],
     )
 
@@ -965,26 +1604,8 @@ def _best_band_combined(h, supra, min_w):
     Returns ``(mass, start_idx, end_idx)`` with ``start_idx == end_idx == -1``
     when no qualifying run exists.
     """
-    L = len(h)
-    rm = 0.0
-    rl = 0
-    start = 0
-    best = 0.0
-    bs = be = -1
-    for li in range(L):
-        if supra[li]:
-            if rl == 0:
-                start = li
-            rm += h[li]
-            rl += 1
-            if rl >= min_w and rm > best:
-                best = rm
-                bs = start
-                be = li
-        else:
-            rm = 0.0
-            rl = 0
-    return best, bs, be
+    m, bs, be = _band_scan(np.asarray(h)[None, :], np.asarray(supra)[None, :], min_w)
+    return float(m[0]), int(bs[0]), int(be[0])
 
 
 def _best_band_masked(h, mask, min_w):
@@ -1273,6 +1894,44 @@ def _signed_layer_z(D, min_per_group=10):
     return z
 
 
+def _sign_flip_moments(D):
+    """NaN-zeroed ``(n_slides, n_layers * n_units)`` matrix, count, sum of squares
+    and the matching presence mask.
+
+    A sign flip changes neither the number of contributing slides nor the sum
+    of squares of a layer/unit, only its signed sum, so these are computed once
+    for the whole null.
+    """
+    S = D.shape[0]
+    ok = ~np.isnan(D)
+    D0 = np.where(ok, D, 0.0).reshape(S, -1)
+    return (D0, ok.sum(axis=0).reshape(-1), np.einsum("ij,ij->j", D0, D0),
+            ok.reshape(S, -1))
+
+
+def _signed_layer_z_flips(D0, n, ss, ok, signs, min_per_group=10):
+    """:func:`_signed_layer_z` of ``D * signs[b]`` for every row of ``signs``.
+
+    The signed sums of a whole batch are one GEMM ``signs @ D0``; the variance
+    follows from the fixed sum of squares as ``(ss - sum * mean) / (n - 1)``.
+    That one-pass form loses about ``eps * ss / m2`` relative precision, so
+    cells whose centred sum of squares ``m2`` is below ``1e-4 * ss`` (a large
+    offset with a small spread, or no spread at all) are recomputed two-pass
+    from ``D0`` and ``ok``. Returns ``(n_batch, n_layers * n_units)``.
+    """
+    total = signs @ D0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mu = total / np.maximum(n, 1)
+        m2 = ss - total * mu
+        se = np.sqrt(np.maximum(m2, 0.0) / np.maximum(n - 1, 1) / np.maximum(n, 1))
+        z = np.where((n >= min_per_group) & (n > 1) & (se > 0), mu / se, np.nan)
+    rows, cols = np.nonzero((m2 <= 1e-4 * ss) & (n >= min_per_group) & (n > 1))
+    if rows.size:
+        X = np.where(ok[:, cols], D0[:, cols] * signs[rows].T, np.nan)
+        z[rows, cols] = _signed_layer_z(X, min_per_group)
+    return z
+
+
 def _dominance_score(m_elev, m_depr):
     """Dominance / ambiguity measure for a gene's two directional masses.
 
@@ -1303,6 +1962,12 @@ def _sign_flip_signs(n_slides, slide_groups, n_perm, rng):
     The whole sign space is enumerated when it is no larger than ``n_perm``, which
     turns the Monte-Carlo test into an exact one.
     """
+    gidx, n_groups, exact, n_draw = _sign_flip_design(n_slides, slide_groups, n_perm)
+    return _sign_flip_block(gidx, n_groups, exact, 0, n_draw, rng), n_groups, exact
+
+
+def _sign_flip_design(n_slides, slide_groups, n_perm):
+    """``(gidx, n_groups, exact, n_draw)`` of the sign-flip null, without drawing."""
     if slide_groups is None:
         gidx = np.arange(n_slides)
     else:
@@ -1311,11 +1976,72 @@ def _sign_flip_signs(n_slides, slide_groups, n_perm, rng):
             raise ValueError("slide_groups must have one entry per slide.")
         _, gidx = np.unique(slide_groups, return_inverse=True)
     n_groups = int(gidx.max()) + 1
-    if 2 ** n_groups <= n_perm:
-        bits = (np.arange(2 ** n_groups)[:, None] >> np.arange(n_groups)) & 1
-        return (bits * 2.0 - 1.0)[:, gidx], n_groups, True
-    signs = rng.choice((-1.0, 1.0), size=(n_perm, n_groups))
-    return signs[:, gidx], n_groups, False
+    exact = 2 ** n_groups <= n_perm
+    return gidx, n_groups, exact, 2 ** n_groups if exact else int(n_perm)
+
+
+def _sign_flip_block(gidx, n_groups, exact, start, stop, rng):
+    """Rows ``start..stop-1`` of the sign design (enumerated, or drawn from ``rng``)."""
+    if exact:
+        bits = (np.arange(start, stop)[:, None] >> np.arange(n_groups)) & 1
+        return (bits * 2.0 - 1.0)[:, gidx]
+    signs = rng.choice((-1.0, 1.0), size=(stop - start, n_groups))
+    return signs[:, gidx]
+
+
+def _gradient_null_chunk(rng, start, stop, shared, progress=False, *, n_groups,
+                         exact, bidirectional, thr, min_w, min_per_group, n_layers,
+                         n_exceed=0):
+    """Exceedance counts of sign-flip draws ``start..stop-1``.
+
+    Null masses are compared with the observed ones (``shared["obs"]``) batch
+    by batch and then dropped, so memory does not grow with the number of
+    draws. Returns a ``(2, n_units)`` int64 array: for the dominant band, the
+    per-unit count of draws reaching that unit's observed mass and the count
+    of pooled (draw, unit) null masses reaching it; for directional bands,
+    the per-unit counts of the elevated and of the depressed null.
+
+    With ``n_exceed > 0`` the positions of each unit's first ``n_exceed``
+    exceedances (:func:`hplot._permute.first_hits`, one block per row of
+    ``obs``) are returned alongside the counts.
+    """
+    D0, cnt, ss, ok, obs = (shared[key] for key in ("D0", "cnt", "ss", "ok", "obs"))
+    signs = _sign_flip_block(shared["gidx"], n_groups, exact, start, stop, rng)
+    n, n_units = stop - start, obs.shape[1]
+    # bound the (batch, layers * units) z block to ~4M values
+    batch = max(1, min(256, (1 << 22) // max(D0.shape[1], 1)))
+    bar = _bar(n, "perms") if progress else None
+    counts = np.zeros((2, n_units), dtype=np.int64)
+    first = np.full((obs.shape[0], n_exceed, n_units), np.inf)
+    for b0 in range(0, n, batch):
+        b1 = min(b0 + batch, n)
+        Z = _signed_layer_z_flips(D0, cnt, ss, ok, signs[b0:b1], min_per_group)
+        # one band-scan row per (draw, unit)
+        zp = Z.reshape(-1, n_layers, n_units).transpose(0, 2, 1).reshape(-1, n_layers)
+        hp = np.nan_to_num(zp ** 2, nan=0.0)
+        supra = hp > thr
+        if bidirectional:
+            hits = []
+            for k, side in enumerate((zp > 0, zp < 0)):
+                mass = _band_scan(hp, supra & side, min_w)[0].reshape(-1, n_units)
+                hits.append(mass.astype(np.float32) >= obs[k])
+                counts[k] += hits[k].sum(axis=0)
+        else:
+            mass = _band_scan(hp, supra, min_w)[0].reshape(-1, n_units)
+            mass = mass.astype(np.float32)
+            hits = [mass >= obs[0]]
+            counts[0] += hits[0].sum(axis=0)
+            flat = np.sort(mass.ravel())
+            counts[1] += flat.size - np.searchsorted(flat, obs[0], side="left")
+        if n_exceed:
+            for k, hit in enumerate(hits):
+                first[k] = merge_first(first[k], first_hits(hit, n_exceed, start + b0),
+                                       n_exceed)
+        if bar is not None:
+            bar.update(b1 - b0)
+    if bar is not None:
+        bar.close()
+    return (counts, first) if n_exceed else counts
 
 
 def gradient_cluster_mass_screen(
@@ -1332,6 +2058,10 @@ def gradient_cluster_mass_screen(
     layer_um=None,
     progress=False,
     slide_groups=None,
+    n_jobs=None,
+    chunk_size=None,
+    n_perm_max=None,
+    n_exceed=10,
 ):
     """Single-group directional cluster-mass border-gradient screen.
 
@@ -1370,6 +2100,10 @@ def gradient_cluster_mass_screen(
     states and is enumerated exhaustively -- giving an exact test -- whenever
     that is at most ``n_perm``.
 
+    The null is never stored: each batch of draws is reduced to per-unit
+    exceedance counts against the observed masses (plus, in dominant mode, the
+    pooled count the FDR needs), so memory does not grow with ``n_perm``.
+
     Parameters
     ----------
     D : numpy.ndarray, shape (n_slides, n_layers, n_units)
@@ -1399,6 +2133,27 @@ def gradient_cluster_mass_screen(
         Show a tqdm bar over permutations if available. Default False.
     slide_groups : array-like | None
         Per-slide exchangeable-unit label. Default None (each slide its own).
+    n_jobs : int | None
+        Worker processes for the null (``None``/1 serial, -1 all cores); ``D``
+        reaches them through shared memory.
+    chunk_size : int | None
+        Draws per independently seeded chunk. ``None`` keeps one stream per
+        worker (the historical single stream when serial), so a Monte-Carlo
+        null depends on ``n_jobs``; an integer makes it independent of
+        ``n_jobs``. An exhaustive null never depends on either.
+    n_perm_max : int | None
+        Enable sequential (Besag-Clifford) stopping. After the first
+        ``n_perm`` draws, only units whose band has not yet been matched
+        ``n_exceed`` times by the null keep drawing, in doubling rounds up to
+        ``n_perm_max`` draws. A stopped unit's p-value is ``n_exceed / L``
+        (``L`` = draw of its ``n_exceed``-th exceedance); one that reaches the
+        cap gets ``(g + 1) / (n_perm_max + 1)``. The draws each hypothesis
+        used are reported in ``n_draws`` columns. The pooled-null FDR needs
+        every unit's null at every draw, so in sequential dominant mode
+        ``fdr`` is instead BH over the per-unit sequential p-values.
+        Ignored when the null is enumerated exhaustively. Default None (off).
+    n_exceed : int
+        Exceedances after which a unit stops drawing. Default 10.
 
     Returns
     -------
@@ -1433,49 +2188,80 @@ def gradient_cluster_mass_screen(
             return np.nan
         return float(layer_um.get(int(round(layer)), np.nan))
 
-    def _perm_iter(n):
-        it = range(n)
-        if progress:
-            try:
-                from tqdm.auto import tqdm as _tqdm
-                return _tqdm(it, desc="perms", leave=False)
-            except ImportError:
-                return it
-        return it
-
-    rng = np.random.default_rng(seed)
-    signs, n_groups, exact_null = _sign_flip_signs(n_slides, slide_groups, n_perm, rng)
-    n_draw = signs.shape[0]
+    gidx, n_groups, exact_null, n_draw = _sign_flip_design(n_slides, slide_groups,
+                                                           n_perm)
     meta = dict(n_groups=n_groups, n_draw=n_draw, exact_null=exact_null)
 
+    D0, cnt, ss, ok = _sign_flip_moments(D)
+    sequential = (n_perm_max is not None and not exact_null
+                  and int(n_perm_max) > n_draw)
+    meta["sequential"] = sequential
+
+    def _null_chunks(obs, n, r=0, units=None, n_exc=0):
+        d0, c, q, msk = D0, cnt, ss, ok
+        if units is not None:
+            # D0 columns are layer-major: layer * n_units + unit
+            cols = (np.arange(n_layers)[:, None] * n_units + units[None, :]).ravel()
+            d0, c, q, msk = D0[:, cols], cnt[cols], ss[cols], ok[:, cols]
+            obs = obs[:, units]
+        return run_chunks(
+            _gradient_null_chunk, n,
+            dict(D0=d0, cnt=c, ss=q, ok=msk, gidx=gidx, obs=obs),
+            seed=seed if not sequential else round_seed(seed, r),
+            n_jobs=n_jobs, chunk_size=chunk_size, progress=progress,
+            n_groups=n_groups, exact=exact_null, bidirectional=obs.shape[0] == 2,
+            thr=thr, min_w=min_w, min_per_group=min_per_group, n_layers=n_layers,
+            n_exceed=n_exc)
+
+    def _exceedances(*obs):
+        """Counts of the first ``n_draw`` draws, and per-hypothesis
+        ``(p, n_draws)`` -- sequential when enabled, plus-one otherwise."""
+        obs = np.vstack(obs)
+        if not sequential:
+            counts = sum(_null_chunks(obs, n_draw))
+            n_used = np.full(obs.shape, n_draw)
+            return counts, (1.0 + counts[:obs.shape[0]]) / (n_draw + 1.0), n_used
+        h = int(n_exceed)
+        first = np.full((obs.shape[0], h, n_units), np.inf)
+        used = np.zeros(n_units, dtype=np.int64)
+        pending = obs > 0
+        for r, (lo, hi) in enumerate(sequential_rounds(n_draw, int(n_perm_max))):
+            units = None if r == 0 else np.flatnonzero(pending.any(axis=0))
+            if units is not None and units.size == 0:
+                break
+            parts = _null_chunks(obs, hi - lo, r, units, h)
+            if r == 0:
+                counts = sum(part[0] for part in parts)
+                units = np.arange(n_units)
+            for part in parts:
+                for k in range(obs.shape[0]):
+                    first[k][:, units] = merge_first(first[k][:, units],
+                                                     part[1][k] + lo, h)
+            used[units] += hi - lo
+            pending = (obs > 0) & ~np.isfinite(first[:, -1, :])
+        p, n_used = zip(*(besag_clifford_p(first[k], used) for k in range(obs.shape[0])))
+        return counts, np.vstack(p), np.vstack(n_used)
+
     if band_mode == "dominant":
         # ---- observed: combined winner-take-all band per unit ---------------
-        obs_mass = np.zeros(n_units)
-        bs_o = np.full(n_units, -1)
-        be_o = np.full(n_units, -1)
-        for u in range(n_units):
-            m, bs, be = _best_band_combined(h_obs[:, u], h_obs[:, u] > thr, min_w)
-            obs_mass[u], bs_o[u], be_o[u] = m, bs, be
+        obs_mass, bs_o, be_o = _band_scan(h_obs.T, h_obs.T > thr, min_w)
         # ---- pooled sign-flip permutation null ------------------------------
-        null = np.empty((n_draw, n_units), dtype=np.float32)
-        for b in _perm_iter(n_draw):
-            Dp = D * signs[b][:, None, None]
-            hp = np.nan_to_num(_signed_layer_z(Dp, min_per_group) ** 2, nan=0.0)
-            for u in range(n_units):
-                null[b, u], _, _ = _best_band_combined(hp[:, u], hp[:, u] > thr, min_w)
-        perm_p = (1.0 + (null >= obs_mass[None, :]).sum(0)) / (n_draw + 1.0)
+        counts, perm_p, n_used = _exceedances(obs_mass)
+        ge_pooled, perm_p, n_used = counts[1], perm_p[0], n_used[0]
         perm_p = np.where(obs_mass > 0, perm_p, 1.0)
-        order = np.argsort(-obs_mass)
-        obs_s = obs_mass[order]
-        flat = np.sort(null.ravel())
-        ge = flat.size - np.searchsorted(flat, obs_s, side="left")
-        EV = ge / n_draw
-        R = np.arange(1, n_units + 1)
-        fdr_s = np.minimum(EV / R, 1.0)
-        fdr_s = np.minimum.accumulate(fdr_s[::-1])[::-1]
-        fdr = np.empty(n_units)
-        fdr[order] = fdr_s
-        fdr[obs_mass <= 0] = 1.0
+        if sequential:
+            # units stop at different draws, so there is no common pooled null
+            fdr = np.ones(n_units)
+            fdr[obs_mass > 0] = benjamini_hochberg(perm_p[obs_mass > 0])
+        else:
+            order = np.argsort(-obs_mass)
+            EV = ge_pooled[order] / n_draw
+            R = np.arange(1, n_units + 1)
+            fdr_s = np.minimum(EV / R, 1.0)
+            fdr_s = np.minimum.accumulate(fdr_s[::-1])[::-1]
+            fdr = np.empty(n_units)
+            fdr[order] = fdr_s
+            fdr[obs_mass <= 0] = 1.0
 
         rows = []
         wide = []
@@ -1501,11 +2287,13 @@ def gradient_cluster_mass_screen(
                          "center_um": _um(round(desc["center_of_mass"])),
                          "peak_layer": desc["peak_layer"],
                          "cluster_mass": desc["mass"],
-                         "mean_signed_effect": desc["mean_signed_effect"]})
+                         "mean_signed_effect": desc["mean_signed_effect"],
+                         **({"n_draws": int(n_used[u])} if sequential else {})})
             wide.append({"gene": unit_names[u], "dominant_mass": desc["mass"],
                          "dominant_direction": direction,
                          "dominant_center": desc["center_of_mass"],
-                         "dominant_fdr": float(fdr[u]), "dominance_score": 1.0})
+                         "dominant_fdr": float(fdr[u]), "dominance_score": 1.0,
+                         **({"n_draws": int(n_used[u])} if sequential else {})})
         long_df = pd.DataFrame(rows)
         wide_df = pd.DataFrame(wide)
         return dict(thr=thr, z=z_obs, long=long_df, wide=wide_df,
@@ -1516,29 +2304,23 @@ def gradient_cluster_mass_screen(
     obs_neg = np.zeros(n_units)
     desc_pos = [None] * n_units
     desc_neg = [None] * n_units
+    # directional_cluster_bands for every unit: one band scan per direction
+    supra_obs = h_obs.T > thr
+    _, bs_p, be_p = _band_scan(h_obs.T, supra_obs & (z_obs.T > 0), min_w)
+    _, bs_n, be_n = _band_scan(h_obs.T, supra_obs & (z_obs.T < 0), min_w)
+    grid_f = grid.astype(float)
     for u in range(n_units):
-        bands = directional_cluster_bands(z_obs[:, u], thr=thr, min_w=min_w, grid=grid)
-        de, dd = bands["elevated"], bands["depressed"]
+        de = _band_descriptor(h_obs[:, u], z_obs[:, u], bs_p[u], be_p[u], grid_f,
+                              "elevated")
+        dd = _band_descriptor(h_obs[:, u], z_obs[:, u], bs_n[u], be_n[u], grid_f,
+                              "depressed")
         desc_pos[u], desc_neg[u] = de, dd
         obs_pos[u] = de["mass"] if de else 0.0
         obs_neg[u] = dd["mass"] if dd else 0.0
 
-    null_pos = np.zeros((n_draw, n_units), dtype=np.float32)
-    null_neg = np.zeros((n_draw, n_units), dtype=np.float32)
-    for b in _perm_iter(n_draw):
-        Dp = D * signs[b][:, None, None]
-        zp = _signed_layer_z(Dp, min_per_group)
-        hp = np.nan_to_num(zp ** 2, nan=0.0)
-        supra = hp > thr
-        pos = supra & (zp > 0)
-        neg = supra & (zp < 0)
-        for u in range(n_units):
-            null_pos[b, u], _, _ = _best_band_masked(hp[:, u], pos[:, u], min_w)
-            null_neg[b, u], _, _ = _best_band_masked(hp[:, u], neg[:, u], min_w)
+    _, (p_pos, p_neg), (n_pos, n_neg) = _exceedances(obs_pos, obs_neg)
 
-    # plus-one directional permutation p-values (never zero)
-    p_pos = (1.0 + (null_pos >= obs_pos[None, :]).sum(0)) / (n_draw + 1.0)
-    p_neg = (1.0 + (null_neg >= obs_neg[None, :]).sum(0)) / (n_draw + 1.0)
+    # plus-one (or sequential) directional permutation p-values (never zero)
     p_pos = np.where(obs_pos > 0, p_pos, 1.0)
     p_neg = np.where(obs_neg > 0, p_neg, 1.0)
 
@@ -1563,9 +2345,9 @@ def gradient_cluster_mass_screen(
     for u in range(n_units):
         dom = _dominance_score(obs_pos[u], obs_neg[u])
         wrec = {"gene": unit_names[u], "dominance_score": dom}
-        for tag, desc, pv, obsm in (
-            ("elevated", desc_pos[u], p_pos[u], obs_pos[u]),
-            ("depressed", desc_neg[u], p_neg[u], obs_neg[u]),
+        for tag, desc, pv, obsm, nd in (
+            ("elevated", desc_pos[u], p_pos[u], obs_pos[u], n_pos[u]),
+            ("depressed", desc_neg[u], p_neg[u], obs_neg[u], n_neg[u]),
         ):
             if desc is None or obsm <= 0:
                 wrec[f"{tag}_start"] = np.nan
@@ -1593,7 +2375,10 @@ def gradient_cluster_mass_screen(
                 "dominance_score": dom,
                 "analysis_window_start": float(grid[0]),
                 "analysis_window_end": float(grid[-1]),
+                **({"n_draws": int(nd)} if sequential else {}),
             })
+            if sequential:
+                wrec[f"{tag}_n_draws"] = int(nd)
             wrec[f"{tag}_start"] = desc["start_layer"]
             wrec[f"{tag}_end"] = desc["end_layer"]
             wrec[f"{tag}_center"] = desc["center_of_mass"]
@@ -2233,12 +3018,14 @@ def _pathway_deviation_tensor(profiles, path_names, grid, *, sample_col, layer_c
 def _arm_assignments(arm_vec, arms, pair_ids, n_perm, rng):
     """Every relabelling the design actually allows, or a Monte-Carlo sample of them.
 
-    Returns ``(iterator, n_draw, exact)``. Which relabellings are legal is the whole
+    Returns ``(iterator, n_draw, exact)``. The Monte-Carlo iterator is unbounded --
+    ``n_perm`` only decides between the two modes and sets ``n_draw`` -- so callers
+    take as many draws as they need. Which relabellings are legal is the whole
     question: a patient-level label may move between patients, a within-patient label
     (e.g. Pre/Post) may only swap inside its own patient. Permuting the second as if it
     were the first tests a hypothesis nobody asked.
     """
-    from itertools import combinations, product
+    from itertools import combinations, count, product
     from math import comb
 
     n = len(arm_vec)
@@ -2247,7 +3034,7 @@ def _arm_assignments(arm_vec, arms, pair_ids, n_perm, rng):
         k, total = len(idx1), int(comb(n, len(idx1)))
         if n_perm is None or total <= n_perm:
             return (np.asarray(c, dtype=int) for c in combinations(range(n), k)), total, True
-        return (rng.permutation(n)[:k] for _ in range(int(n_perm))), int(n_perm), False
+        return (rng.permutation(n)[:k] for _ in count()), int(n_perm), False
 
     pairs = [np.flatnonzero(pair_ids == p) for p in pd.unique(pair_ids)]
     for p in pairs:
@@ -2263,17 +3050,59 @@ def _arm_assignments(arm_vec, arms, pair_ids, n_perm, rng):
 
     if n_perm is None or total <= n_perm:
         return (_from_signs(s) for s in product([True, False], repeat=len(pairs))), total, True
-    return (_from_signs(rng.random(len(pairs)) < 0.5) for _ in range(int(n_perm))), \
+    return (_from_signs(rng.random(len(pairs)) < 0.5) for _ in count()), \
         int(n_perm), False
 
 
+def _arm_gap(D, sel1):
+    sel0 = np.setdiff1d(np.arange(D.shape[0]), sel1, assume_unique=False)
+    with np.errstate(invalid="ignore"):
+        return np.nanmean(D[sel1], axis=0) - np.nanmean(D[sel0], axis=0)
+
+
+def _arm_null_chunk(rng, start, stop, shared, progress=False, *, n_cap, keep_p,
+                    paired, n_exceed=0):
+    """Exceedance counts, per-pathway max |gap| and kept draws of ``start..stop-1``.
+
+    Arms are coded 0/1 in ``shared["arm"]``. An exhaustive null is sliced by
+    position; a Monte-Carlo one draws ``stop - start`` assignments from ``rng``.
+    With ``n_exceed > 0`` the positions of each cell's first ``n_exceed``
+    exceedances (as :func:`hplot._permute.first_hits`) are returned as well.
+    """
+    from itertools import islice
+
+    D, obs_abs = shared["D"], shared["obs_abs"]
+    it, _, exact = _arm_assignments(shared["arm"], (0, 1),
+                                    shared["pair"] if paired else None, n_cap, rng)
+    it = islice(it, start, stop) if exact else islice(it, stop - start)
+    cnt = np.zeros(obs_abs.shape)
+    max_null = []
+    kept = []
+    first = np.full((n_exceed,) + obs_abs.shape, np.inf)
+    for d, sel1 in enumerate(it):
+        g = np.abs(_arm_gap(D, np.asarray(sel1, dtype=int)))
+        hit = g >= obs_abs - 1e-12
+        if n_exceed:
+            new = np.nonzero(hit & (cnt < n_exceed))
+            first[(cnt[new].astype(int),) + new] = start + d
+        cnt += hit
+        max_null.append(np.nanmax(np.where(np.isfinite(g), g, -np.inf), axis=0))
+        if keep_p >= 1.0 or rng.random() < keep_p:
+            kept.append(g.astype(np.float32))
+    kept = np.stack(kept) if kept else np.empty((0,) + obs_abs.shape, np.float32)
+    max_null = (np.stack(max_null) if max_null
+                else np.empty((0, obs_abs.shape[1])))
+    return (cnt, max_null, kept, first) if n_exceed else (cnt, max_null, kept)
+
+
 def hpathway_arm_contrast(profiles, *, path_names, grid, arm_of,
                           sample_col="patient", layer_col="layer",
                           baseline="window", min_baseline_layers=3,
                           min_baseline_cells=50, count_col=None, min_cells=0,
                           pair_of=None, n_perm=None, seed=0, alpha=0.05,
                           null_quantile=0.95, null_keep=4000,
-                          verbose=True):
+                          n_jobs=None, chunk_size=None, n_perm_max=None,
+                          n_exceed=10, verbose=True):
     """Do two groups differ in where a pathway sits along the border ruler?
 
     The third H-Pathway channel, alongside :func:`hpathway_layer_ora` (which sets are
@@ -2324,6 +3153,24 @@ def hpathway_arm_contrast(profiles, *, path_names, grid, arm_of,
         Cap on how many null draws are retained to estimate that quantile; draws are
         subsampled at random (unbiased) above it, so an exhaustive null of 210 or 1024
         assignments is kept in full while a large Monte-Carlo run stays bounded.
+    n_jobs : int | None
+        Worker processes for the null (``None``/1 serial, -1 all cores); the
+        deviation tensor reaches them through shared memory.
+    chunk_size : int | None
+        Assignments per independently seeded chunk. ``None`` keeps one stream
+        per worker (the historical single stream when serial); an integer makes
+        the Monte-Carlo null and the ``null_keep`` subsample independent of
+        ``n_jobs``.
+    n_perm_max : int | None
+        Sequential (Besag-Clifford) stopping for a Monte-Carlo null. After the first
+        ``n_perm`` draws, only pathways with a cell or a layer-max statistic matched
+        fewer than ``n_exceed`` times keep drawing, in doubling rounds up to
+        ``n_perm_max`` draws. A stopped test gets ``p = n_exceed / L`` (``L`` = draw of
+        its ``n_exceed``-th exceedance), one reaching the cap ``(g + 1) / (n + 1)``.
+        ``null_ref`` still comes from the first ``n_perm`` draws. Ignored for an
+        exhaustive null, which is exact already. Default None (off).
+    n_exceed : int
+        Exceedances after which a test stops drawing. Default 10.
 
     Returns
     -------
@@ -2352,6 +3199,10 @@ def hpathway_arm_contrast(profiles, *, path_names, grid, arm_of,
         arm order is decided internally, so a caller must not guess it when labelling
         a legend).
 
+        With ``n_perm_max``, both tables gain ``n_draws``: the draws behind each ``p``
+        (grid) and each ``p_exact`` (summary), and ``p_floor`` becomes
+        ``1 / (n_perm_max + 1)``.
+
     Notes
     -----
     **Read the resolution report before reading a row of zeros.** A permutation p-value
@@ -2371,7 +3222,6 @@ def hpathway_arm_contrast(profiles, *, path_names, grid, arm_of,
     path_names = list(path_names)
     grid = [int(L) for L in grid]
     nG, nP = len(grid), len(path_names)
-    rng = np.random.default_rng(seed)
 
     units, D, C = _pathway_deviation_tensor(
         profiles, path_names, grid, sample_col=sample_col, layer_col=layer_col,
@@ -2405,32 +3255,70 @@ def hpathway_arm_contrast(profiles, *, path_names, grid, arm_of,
     i0 = np.flatnonzero(arm_vec == arms[0])
     i1 = np.flatnonzero(arm_vec == arms[1])
 
-    def _gap(sel1):
-        sel0 = np.setdiff1d(np.arange(len(units)), sel1, assume_unique=False)
-        with np.errstate(invalid="ignore"):
-            return np.nanmean(D[sel1], axis=0) - np.nanmean(D[sel0], axis=0)
-
-    obs = _gap(i1)
+    obs = _arm_gap(D, i1)
     obs_abs = np.abs(obs)
 
-    it, n_draw, exact = _arm_assignments(arm_vec, arms, pair_ids, n_perm, rng)
-    cnt = np.zeros((nG, nP))
-    max_null = np.empty((n_draw, nP))
+    # arms and pairs as integer codes, so the null kernel can run in a worker
+    arm_code = (arm_vec == arms[1]).astype(int)
+    pair_code = (pd.factorize(pair_ids, use_na_sentinel=False)[0]
+                 if pair_ids is not None else np.zeros(0, dtype=int))
+    _, n_draw, exact = _arm_assignments(arm_code, (0, 1),
+                                        pair_code if pair_ids is not None else None,
+                                        n_perm, None)
     obs_max = np.nanmax(np.where(np.isfinite(obs_abs), obs_abs, -np.inf), axis=0)
     # Per-cell null draws are kept so the panel can size a dot in units of chance
     # rather than raw effect. Subsampled (unbiased) when the null is large.
     keep_p = min(1.0, float(null_keep) / max(n_draw, 1))
-    kept = []
-    for d, sel1 in enumerate(it):
-        g = np.abs(_gap(np.asarray(sel1, dtype=int)))
-        cnt += (g >= obs_abs - 1e-12)
-        max_null[d] = np.nanmax(np.where(np.isfinite(g), g, -np.inf), axis=0)
-        if keep_p >= 1.0 or rng.random() < keep_p:
-            kept.append(g.astype(np.float32))
-    null_ref = (np.nanpercentile(np.stack(kept), 100.0 * null_quantile, axis=0)
-                if kept else np.full((nG, nP), np.nan))
-
-    p = (1.0 + cnt) / (n_draw + 1.0)
+    sequential = (n_perm_max is not None and not exact
+                  and int(n_perm_max) > n_draw)
+    h = int(n_exceed) if sequential else 0
+
+    def _null(n, paths, r, keep):
+        return run_chunks(
+            _arm_null_chunk, n,
+            dict(D=D[:, :, paths], obs_abs=obs_abs[:, paths], arm=arm_code,
+                 pair=pair_code),
+            seed=round_seed(seed, r) if sequential else seed, n_jobs=n_jobs,
+            chunk_size=chunk_size, n_cap=n_perm, keep_p=keep,
+            paired=pair_ids is not None, n_exceed=h)
+
+    all_paths = np.arange(nP)
+    parts = _null(n_draw, all_paths, 0, keep_p)
+    cnt = sum(part[0] for part in parts)
+    max_null = np.concatenate([part[1] for part in parts])
+    kept = np.concatenate([part[2] for part in parts])
+    null_ref = (np.nanpercentile(kept, 100.0 * null_quantile, axis=0)
+                if len(kept) else np.full((nG, nP), np.nan))
+
+    if sequential:
+        # cells and per-pathway maxima stop once they have h exceedances; a pathway
+        # keeps drawing while any of its tests is still undecided
+        first = np.sort(np.concatenate([part[3] for part in parts]), axis=0)[:h]
+        first_max = first_hits(max_null >= obs_max[None, :] - 1e-12, h)
+        used = np.full(nP, len(max_null), dtype=np.int64)
+        for r, (lo, hi) in enumerate(sequential_rounds(n_draw, int(n_perm_max))):
+            if r == 0:
+                continue
+            pending = (np.isfinite(obs_abs) & ~np.isfinite(first[-1])).any(axis=0)
+            pending |= np.isfinite(obs_max) & ~np.isfinite(first_max[-1])
+            paths = np.flatnonzero(pending)
+            if paths.size == 0:
+                break
+            more = _null(hi - lo, paths, r, 0.0)
+            # positions and draw counts follow the draws the kernels produced
+            done = int(used[paths[0]])
+            first[:, :, paths] = merge_first(
+                first[:, :, paths],
+                np.concatenate([part[3] for part in more]) + done, h)
+            mx = np.concatenate([part[1] for part in more])
+            first_max[:, paths] = merge_first(
+                first_max[:, paths], first_hits(mx >= obs_max[paths] - 1e-12, h, done), h)
+            used[paths] += len(mx)
+        p, n_used = besag_clifford_p(first, np.broadcast_to(used, (nG, nP)))
+        p_exact, n_used_max = besag_clifford_p(first_max, used)
+    else:
+        p = (1.0 + cnt) / (n_draw + 1.0)
+        p_exact = (1.0 + (max_null >= obs_max[None, :] - 1e-12).sum(axis=0)) / (n_draw + 1.0)
     p = np.where(np.isfinite(obs_abs), p, np.nan)
     q = np.full(nG * nP, np.nan)
     flat = p.ravel()
@@ -2454,10 +3342,10 @@ def hpathway_arm_contrast(profiles, *, path_names, grid, arm_of,
              abs_gap=float(obs_abs[i, j]), null_ref=float(null_ref[i, j]),
              ratio_vs_null=float(obs_abs[i, j] / null_ref[i, j])
              if np.isfinite(null_ref[i, j]) and null_ref[i, j] > 0 else np.nan,
-             p=float(p[i, j]), q=float(q[i, j]), q_row=float(q_row[i, j]))
+             p=float(p[i, j]), q=float(q[i, j]), q_row=float(q_row[i, j]),
+             **({"n_draws": int(n_used[i, j])} if sequential else {}))
         for i, L in enumerate(grid) for j, nm in enumerate(path_names)])
 
-    p_exact = (1.0 + (max_null >= obs_max[None, :] - 1e-12).sum(axis=0)) / (n_draw + 1.0)
     # The peak is read off the chance-standardised profile. On the raw scale it would
     # simply mark the noisiest layer -- typically the sparse end of the ruler, where a
     # unit contributing a handful of cells inflates the group mean.
@@ -2467,16 +3355,17 @@ def hpathway_arm_contrast(profiles, *, path_names, grid, arm_of,
                                                ratio[:, j], -np.inf)))])
             for j in range(nP)]
     max_ratio = np.nanmax(np.where(np.isfinite(ratio), ratio, -np.inf), axis=0)
+    p_floor = 1.0 / ((int(n_perm_max) if sequential else n_draw) + 1.0)
     summary = pd.DataFrame(dict(
         pathway=path_names, max_abs_gap=obs_max, max_ratio_vs_null=max_ratio,
-        peak_layer=peak, p_exact=p_exact)).assign(
+        peak_layer=peak, p_exact=p_exact,
+        **({"n_draws": n_used_max} if sequential else {}))).assign(
         q_exact=lambda d: benjamini_hochberg(d["p_exact"].to_numpy()),
         arm_pos=str(arms[1]), arm_neg=str(arms[0]),
         n_assignments=int(n_draw), exact=bool(exact),
-        p_floor=1.0 / (n_draw + 1.0),
+        p_floor=p_floor,
     ).sort_values("p_exact", kind="mergesort").reset_index(drop=True)
 
-    p_floor = 1.0 / (n_draw + 1.0)
     m_tested = int(np.isfinite(p).sum())
 
     def _k_min(m):
@@ -2488,7 +3377,8 @@ def hpathway_arm_contrast(profiles, *, path_names, grid, arm_of,
     if verbose:
         print(f"arm contrast {arms[1]} - {arms[0]}: {len(i1)} vs {len(i0)} units | "
               f"{'EXHAUSTIVE' if exact else 'Monte-Carlo'} null, {n_draw} assignments "
-              f"({'within-pair swap' if pair_ids is not None else 'unit relabel'})")
+              f"({'within-pair swap' if pair_ids is not None else 'unit relabel'})"
+              + (f", sequential up to {int(n_perm_max)}" if sequential else ""))
         print(f"  smallest attainable p = {p_floor:.4g}")
         print(f"  BH reaches q<{alpha:g} once this many tests sit at that floor "
               f"together: {_k_min(nG)} of {nG} layers within a pathway (q_row) | "
@@ -174,6 +174,60 @@ def test_border_layers_reuses_precomputed_graph(adata):
     assert np.isfinite(adata.obs["hplot_layer"].to_numpy()).any()
 
 
+def test_border_layers_n_jobs_matches_serial(adata):
+    ref = hplot.pp.border_layers(adata, "cell_type", ["tumour"],
+                                 sample_key="sample", copy=True)
+    par = hplot.pp.border_layers(adata, "cell_type", ["tumour"],
+                                 sample_key="sample", n_jobs=2, copy=True)
+    for col in ("hplot_layer", "hplot_distance_um"):
+        np.testing.assert_array_equal(par.obs[col].to_numpy(),
+                                      ref.obs[col].to_numpy())
+    assert ref.uns["hplot_border"]["n_jobs"] == 1
+    assert par.uns["hplot_border"]["n_jobs"] == 2
+
+
+def test_border_layers_block_diagonal_matches_loop(adata):
+    ref = hplot.pp.border_layers(adata, "cell_type", ["tumour"],
+                                 sample_key="sample", copy=True)
+    blk = hplot.pp.border_layers(adata, "cell_type", ["tumour"],
+                                 sample_key="sample", block_diagonal=True,
+                                 n_jobs=2, copy=True)
+    for col in ("hplot_layer", "hplot_distance_um"):
+        np.testing.assert_array_equal(blk.obs[col].to_numpy(),
+                                      ref.obs[col].to_numpy())
+    assert blk.uns["hplot_border"]["block_diagonal"] is True
+
+
+def test_border_layers_multi_compartment_matches_single(adata):
+    multi = hplot.pp.border_layers(
+        adata, "cell_type", {"tum": ["tumour"], "str": "stroma"},
+        sample_key="sample", n_jobs=2, copy=True)
+    info = multi.uns["hplot_border"]
+    assert set(info["compartments"]) == {"tum", "str"}
+    for name, cat in (("tum", "tumour"), ("str", "stroma")):
+        ref = hplot.pp.border_layers(adata, "cell_type", [cat],
+                                     sample_key="sample", copy=True)
+        np.testing.assert_array_equal(multi.obs[f"hplot_layer_{name}"].to_numpy(),
+                                      ref.obs["hplot_layer"].to_numpy())
+        np.testing.assert_array_equal(multi.obs[f"hplot_distance_um_{name}"].to_numpy(),
+                                      ref.obs["hplot_distance_um"].to_numpy())
+    assert "hplot_layer" not in multi.obs.columns
+
+
+def test_border_layers_knn_graph_block_diagonal_matches_loop(adata):
+    ref = hplot.pp.border_layers(adata, "cell_type", ["tumour"], sample_key="sample",
+                                 graph="knn", n_neighbors=6, copy=True)
+    assert ref.uns["hplot_border"]["graph_source"] == "knn"
+    assert np.isfinite(ref.obs["hplot_layer"].to_numpy()).any()
+    blk = hplot.pp.border_layers(adata, "cell_type", ["tumour"], sample_key="sample",
+                                 graph="knn", n_neighbors=6, block_diagonal=True,
+                                 copy=True)
+    np.testing.assert_array_equal(blk.obs["hplot_layer"].to_numpy(),
+                                  ref.obs["hplot_layer"].to_numpy())
+    with pytest.raises(ValueError):
+        hplot.pp.border_layers(adata, "cell_type", ["tumour"], graph="radius")
+
+
 def test_border_layers_no_graph_and_disallowed_raises(adata):
     with pytest.raises(KeyError):
         hplot.pp.border_layers(adata, "cell_type", ["tumour"],
@@ -0,0 +1,374 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Ensure the package can be imported without installation.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from hplot import _geometry as geom
+
+
+def _slide(n=1500, seed=0):
+    """Uniform cells with a disc-shaped base compartment plus salt noise."""
+    r = np.random.default_rng(seed)
+    xy = r.uniform(0, 200, size=(n, 2))
+    d = np.linalg.norm(xy - np.array([100.0, 100.0]), axis=1)
+    is_base = (d < 60) ^ (r.random(n) < 0.05)
+    return xy, is_base
+
+
+class TestSpatialGraph(unittest.TestCase):
+    def setUp(self):
+        self.xy, self.is_base = _slide(n=600, seed=6)
+        self.edges = geom.delaunay_edges(self.xy, max_edge=25.0)
+
+    def test_clean_int32_csr_is_not_copied(self):
+        A = geom.adjacency_from_edges(len(self.xy), self.edges).astype(np.float64)
+        A.indices = A.indices.astype(np.int32)
+        A.indptr = A.indptr.astype(np.int32)
+        g = geom.as_graph(A)
+        self.assertIs(g.indices, A.indices)
+        self.assertIs(g.indptr, A.indptr)
+
+    def test_self_loops_dropped_like_binarize(self):
+        A = geom.adjacency_from_edges(len(self.xy), self.edges).astype(np.float64)
+        A.setdiag(2.0)
+        A = A.tocsr()
+        ref = geom.binarize_adjacency(A)
+        g = geom.as_graph(A)
+        self.assertEqual(g.indices.dtype, np.int32)
+        self.assertEqual((g.to_csr() != ref.astype(bool)).nnz, 0)
+
+    def test_edge_graph_matches_adjacency(self):
+        g = geom.graph_from_edges(len(self.xy), self.edges)
+        A = geom.adjacency_from_edges(len(self.xy), self.edges)
+        self.assertEqual((g.to_csr() != A.astype(bool)).nnz, 0)
+        out_g = geom.border_layers_from_coords(self.xy, self.is_base, A=g)
+        out_a = geom.border_layers_from_coords(self.xy, self.is_base, A=A)
+        for a, b in zip(out_g, out_a):
+            np.testing.assert_array_equal(a, b)
+
+
+class TestKhopCounts(unittest.TestCase):
+    def setUp(self):
+        self.xy, self.is_base = _slide()
+        edges = geom.delaunay_edges(self.xy, max_edge=25.0)
+        self.A = geom.adjacency_from_edges(len(self.xy), edges)
+
+    def test_counts_match_matrix_power(self):
+        for k in (1, 2, 3):
+            Mk = geom._khop_reachability(self.A, k)
+            nn, b = geom.khop_counts(self.A, self.is_base, k, block_size=113)
+            np.testing.assert_array_equal(nn, np.diff(Mk.indptr))
+            np.testing.assert_array_equal(
+                b, np.asarray(Mk @ self.is_base.astype(np.int64)).ravel())
+
+    def test_region_identical_to_mk_path(self):
+        for k in (0, 2, 4):
+            Mk = geom._khop_reachability(self.A, k)
+            ref = geom.base_region_mask(Mk, self.is_base, 10, 0.2)
+            nn, b = geom.khop_counts(self.A, self.is_base, k)
+            np.testing.assert_array_equal(
+                geom.region_from_counts(nn, b, 10, 0.2), ref)
+
+
+class TestBorderHops(unittest.TestCase):
+    def setUp(self):
+        xy, _ = _slide(seed=1)
+        edges = geom.delaunay_edges(xy, max_edge=12.0)   # sparse: several components
+        self.A = geom.adjacency_from_edges(len(xy), edges)
+        self.border = np.random.default_rng(1).random(len(xy)) < 0.02
+
+    def test_matches_scipy_shortest_path(self):
+        from scipy.sparse.csgraph import shortest_path
+        ref = shortest_path(self.A, unweighted=True, directed=False,
+                            indices=np.flatnonzero(self.border)).min(axis=0)
+        np.testing.assert_array_equal(geom.border_hops(self.A, self.border), ref)
+
+    def test_max_hops_cutoff(self):
+        full = geom.border_hops(self.A, self.border)
+        cut = geom.border_hops(self.A, self.border, max_hops=3)
+        np.testing.assert_array_equal(cut, np.where(full <= 3, full, np.inf))
+
+    def test_no_border_all_inf(self):
+        out = geom.border_hops(self.A, np.zeros(self.A.shape[0], dtype=bool))
+        self.assertTrue(np.isinf(out).all())
+
+
+class TestLayerWindow(unittest.TestCase):
+    def setUp(self):
+        self.xy, self.is_base = _slide(n=3000, seed=11)
+        self.ref = geom.border_layers_from_coords(self.xy, self.is_base)
+
+    def _expect(self, lo, hi):
+        um, hops = self.ref
+        lo = -np.inf if lo is None else lo
+        hi = np.inf if hi is None else hi
+        with np.errstate(invalid="ignore"):
+            keep = (hops >= lo) & (hops <= hi)
+        return np.where(keep, um, np.nan), np.where(keep, hops, np.nan)
+
+    def test_window_blanks_only_out_of_window_cells(self):
+        for lo, hi in ((-2, 3), (None, 1), (-1, None), (1, 4)):
+            out = geom.border_layers_from_coords(self.xy, self.is_base,
+                                                 min_layer=lo, max_layer=hi)
+            for a, b in zip(out, self._expect(lo, hi)):
+                np.testing.assert_array_equal(a, b)
+
+    def test_window_on_precomputed_and_tiled_graphs(self):
+        A = geom.graph_from_edges(len(self.xy), geom.delaunay_edges(self.xy, 25.0))
+        exp = self._expect(-2, 3)
+        for out in (geom.border_layers_from_coords(self.xy, self.is_base, A=A,
+                                                   min_layer=-2, max_layer=3),
+                    geom.border_layers_from_coords(self.xy, self.is_base,
+                                                   min_layer=-2, max_layer=3,
+                                                   tile_size=50.0)):
+            for a, b in zip(out, exp):
+                np.testing.assert_array_equal(a, b)
+
+
+class TestGeodesicDistance(unittest.TestCase):
+    def setUp(self):
+        self.xy, self.is_base = _slide(n=2000, seed=4)
+
+    def test_geodesic_bounds_euclidean_and_keeps_hops(self):
+        um_e, hops_e = geom.border_layers_from_coords(self.xy, self.is_base)
+        um_g, hops_g = geom.border_layers_from_coords(self.xy, self.is_base,
+                                                      distance="geodesic")
+        np.testing.assert_array_equal(hops_g, hops_e)
+        ok = np.isfinite(um_e) & np.isfinite(um_g)
+        self.assertTrue(np.all(np.abs(um_g[ok]) >= np.abs(um_e[ok]) - 1e-3))
+        np.testing.assert_array_equal(np.sign(um_g[ok]), np.sign(um_e[ok]))
+
+    def test_max_um_cutoff(self):
+        um, _ = geom.border_layers_from_coords(self.xy, self.is_base,
+                                               distance="geodesic")
+        cut, _ = geom.border_layers_from_coords(self.xy, self.is_base,
+                                                distance="geodesic", max_um=20.0)
+        np.testing.assert_array_equal(cut, np.where(np.abs(um) <= 20.0, um, np.nan))
+
+    def test_unknown_distance_raises(self):
+        with self.assertRaises(ValueError):
+            geom.border_layers_from_coords(self.xy, self.is_base, distance="manhattan")
+
+
+class TestBorderLayersSweep(unittest.TestCase):
+    def test_sweep_matches_individual_calls(self):
+        xy, is_base = _slide(n=1500, seed=5)
+        ks, n_mins, ratios = (1, 2), (5, 10), (0.2, 0.7)
+        summary, um, hops = geom.border_layers_sweep(
+            xy, is_base, ks=ks, n_mins=n_mins, ratios=ratios)
+        self.assertEqual(len(summary), 8)
+        self.assertEqual(um.shape, (8, len(xy)))
+        for i, row in summary.iterrows():
+            ref_um, ref_hops = geom.border_layers_from_coords(
+                xy, is_base, k=int(row["k"]), n_min=int(row["n_min"]),
+                ratio=row["ratio"])
+            np.testing.assert_array_equal(hops[i], ref_hops)
+            np.testing.assert_array_equal(um[i], ref_um)
+            self.assertEqual(row["n_unreachable"], int(np.isnan(ref_hops).sum()))
+
+
+class TestIncrementalBorderLayers(unittest.TestCase):
+    def _check(self, **kw):
+        xy, is_base = _slide(n=2500, seed=7)
+        rng = np.random.default_rng(7)
+        state = geom.IncrementalBorderLayers(xy, is_base, **kw)
+        cur = is_base.copy()
+        for step in range(4):
+            if step % 2:
+                changed = rng.choice(len(xy), 80, replace=False)
+            else:                       # a local patch of re-annotated cells
+                c = rng.uniform(40, 160, size=2)
+                changed = np.flatnonzero(np.linalg.norm(xy - c, axis=1) < 25)
+            cur[changed] = ~cur[changed]
+            um, hops = state.update(changed)
+            ref_um, ref_hops = geom.border_layers_from_coords(xy, cur, **kw)
+            np.testing.assert_array_equal(hops, ref_hops)
+            np.testing.assert_array_equal(um, ref_um)
+
+    def test_matches_full_recompute(self):
+        self._check()
+
+    def test_matches_full_recompute_with_cutoff(self):
+        self._check(max_hops=3)
+
+    def test_matches_full_recompute_through_empty_border(self):
+        xy, is_base = _slide(n=1500, seed=3)
+        state = geom.IncrementalBorderLayers(xy, is_base)
+        cur = is_base.copy()
+        # wipe the base, restore it, then flip a third of the slide
+        for changed in (np.flatnonzero(cur), np.flatnonzero(is_base),
+                        np.arange(0, len(xy), 3)):
+            cur[changed] = ~cur[changed]
+            um, hops = state.update(changed)
+            ref_um, ref_hops = geom.border_layers_from_coords(xy, cur)
+            np.testing.assert_array_equal(hops, ref_hops)
+            np.testing.assert_array_equal(um, ref_um)
+
+    def test_resumes_from_saved_state_without_rebuilding(self):
+        import tempfile
+        from unittest import mock
+        from hplot import GeometryCache
+
+        xy, is_base = _slide(n=1500, seed=4)
+        first = geom.IncrementalBorderLayers(xy, is_base, max_hops=5)
+        cur = is_base.copy()
+        changed = np.flatnonzero(np.linalg.norm(xy - xy[0], axis=1) < 30)
+        cur[changed] = ~cur[changed]
+        first.update(changed)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = GeometryCache(tmp)
+            cache.put("run", **first.state())
+            saved = cache.get("run")
+        boom = mock.Mock(side_effect=AssertionError("rebuilt"))
+        with mock.patch.object(geom, "khop_counts", boom), \
+                mock.patch.object(geom, "border_hops", boom), \
+                mock.patch.object(geom, "delaunay_edges", boom):
+            resumed = geom.IncrementalBorderLayers.from_state(xy, saved, max_hops=5)
+        np.testing.assert_array_equal(resumed.signed_hops, first.signed_hops)
+        changed = np.arange(0, len(xy), 7)
+        cur[changed] = ~cur[changed]
+        um, hops = resumed.update(changed)
+        ref_um, ref_hops = geom.border_layers_from_coords(xy, cur, max_hops=5)
+        np.testing.assert_array_equal(hops, ref_hops)
+        np.testing.assert_array_equal(um, ref_um)
+
+    def test_empty_update_is_noop(self):
+        xy, is_base = _slide(n=300)
+        state = geom.IncrementalBorderLayers(xy, is_base)
+        before = state.signed_hops.copy()
+        state.update([])
+        np.testing.assert_array_equal(state.signed_hops, before)
+
+
+class TestTiledBorderLayers(unittest.TestCase):
+    def test_tiled_matches_monolithic(self):
+        xy, is_base = _slide(n=4000, seed=2)
+        ref = geom.border_layers_from_coords(xy, is_base, max_hops=4)
+        for reconcile in (False, True):
+            um, hops = geom.border_layers_from_coords(
+                xy, is_base, max_hops=4, tile_size=50.0, reconcile_seams=reconcile)
+            np.testing.assert_array_equal(hops, ref[1])
+            np.testing.assert_array_equal(um, ref[0])
+
+    def test_tiled_requires_max_hops(self):
+        xy, is_base = _slide(n=200)
+        with self.assertRaises(ValueError):
+            geom.border_layers_from_coords(xy, is_base, tile_size=50.0)
+
+    def test_tiled_requires_max_edge(self):
+        xy, is_base = _slide(n=200)
+        geom.border_layers_from_coords(xy, is_base, max_edge=None)   # monolithic
+        with self.assertRaisesRegex(ValueError, "max_edge"):
+            geom.border_layers_from_coords(xy, is_base, max_edge=None, max_hops=4,
+                                           tile_size=50.0)
+
+
+class TestTiledDelaunay(unittest.TestCase):
+    def test_tiled_edges_match_monolithic(self):
+        r = np.random.default_rng(8)
+        # clustered cells leave empty gaps wider than the default halo
+        xy = np.vstack([r.normal(c, 15, size=(400, 2))
+                        for c in r.uniform(0, 400, size=(6, 2))])
+        ref = geom.delaunay_edges(xy, max_edge=25.0)
+        for tile in (30.0, 80.0):
+            out = geom.delaunay_edges(xy, max_edge=25.0, tile_size=tile)
+            self.assertTrue(out.equals(ref))
+
+    def test_tiled_layers_match_monolithic(self):
+        xy, is_base = _slide(n=1200, seed=9)
+        ref = geom.border_layers_from_coords(xy, is_base)
+        out = geom.border_layers_from_coords(xy, is_base, delaunay_tile_size=40.0)
+        for a, b in zip(out, ref):
+            np.testing.assert_array_equal(a, b)
+
+    def test_tiled_requires_max_edge(self):
+        xy, _ = _slide(n=100)
+        with self.assertRaises(ValueError):
+            geom.delaunay_edges(xy, tile_size=50.0)
+
+
+class TestKDTreeGraphs(unittest.TestCase):
+    def setUp(self):
+        self.xy, self.is_base = _slide(n=500, seed=10)
+        self.xy[1] = self.xy[0]                 # duplicated coordinates
+        d = np.linalg.norm(self.xy[:, None] - self.xy[None], axis=2)
+        self.d = d
+
+    def _pairs(self, edges):
+        return set(zip(edges["source"].tolist(), edges["target"].tolist()))
+
+    def test_radius_matches_brute_force(self):
+        i, j = np.nonzero(np.triu(self.d <= 12.0, k=1))
+        self.assertEqual(self._pairs(geom.radius_edges(self.xy, 12.0)),
+                         set(zip(i.tolist(), j.tolist())))
+
+    def test_knn_is_symmetric_union(self):
+        k = 5
+        d = self.d + np.diag(np.full(len(self.xy), np.inf))
+        d[0, 1] = d[1, 0] = 0.0
+        nbr = np.argsort(d, axis=1, kind="stable")[:, :k]
+        ref = {(min(a, b), max(a, b)) for a in range(len(self.xy)) for b in nbr[a]}
+        out = geom.knn_edges(self.xy, k)
+        self.assertEqual(self._pairs(out), ref)
+        self.assertTrue((out["source"] < out["target"]).all())
+
+    def test_layers_on_kdtree_graph(self):
+        for kw in (dict(graph="radius", radius=15.0), dict(graph="knn", n_neighbors=6)):
+            edges = geom.spatial_edges(self.xy, **kw)
+            ref = geom.border_layers_from_coords(
+                self.xy, self.is_base, A=geom.graph_from_edges(len(self.xy), edges))
+            out = geom.border_layers_from_coords(self.xy, self.is_base, **kw)
+            for a, b in zip(out, ref):
+                np.testing.assert_array_equal(a, b)
+
+    def test_missing_parameter_raises(self):
+        for kw in (dict(graph="radius"), dict(graph="knn"), dict(graph="gabriel")):
+            with self.assertRaises(ValueError):
+                geom.border_layers_from_coords(self.xy, self.is_base, **kw)
+
+
+class TestGeometryCache(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.xy, self.is_base = _slide(n=800, seed=3)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_hit_returns_identical_layers(self):
+        from hplot import GeometryCache
+        cache = GeometryCache(self.root)
+        ref = geom.border_layers_from_coords(self.xy, self.is_base)
+        first = geom.border_layers_from_coords(self.xy, self.is_base, cache=cache)
+        self.assertGreater(cache.size_bytes(), 0)
+        # a second process would see the same directory; a path works too
+        second = geom.border_layers_from_coords(self.xy, self.is_base, cache=self.root)
+        for a, b, c in zip(ref, first, second):
+            np.testing.assert_array_equal(a, b)
+            np.testing.assert_array_equal(a, c)
+
+    def test_key_changes_with_parameters(self):
+        from hplot._geocache import graph_key, hash_inputs
+        g = graph_key(self.xy, max_edge=25.0)
+        self.assertNotEqual(g, graph_key(self.xy, max_edge=20.0))
+        self.assertNotEqual(hash_inputs("layers", g, self.is_base, 2),
+                            hash_inputs("layers", g, self.is_base, 3))
+
+    def test_lru_eviction_bounds_size(self):
+        from hplot import GeometryCache
+        cache = GeometryCache(self.root, max_bytes=50_000)
+        for i in range(10):
+            cache.put(f"{i:040x}", x=np.zeros(2000))
+        self.assertLessEqual(cache.size_bytes(), 50_000)
+        self.assertIsNotNone(cache.get(f"{9:040x}"))
+        self.assertIsNone(cache.get(f"{0:040x}"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -216,6 +216,28 @@ class TestArmContrast(unittest.TestCase):
             verbose=False)
         self.assertTrue(grid["abs_gap"].notna().any())
 
+    def test_sequential_stopping_reports_draws(self):
+        prof = _profiles(n_per_arm=8, effect=0.05, seed=1)
+        kw = dict(path_names=self.names, grid=self.layers, arm_of=self._arm_of(prof),
+                  count_col="n_cells", n_perm=200, seed=2, verbose=False)
+        grid, summ = hpathway_arm_contrast(prof, n_perm_max=1600, **kw)
+        # every round draws its full share, so a rerun is identical
+        pd.testing.assert_frame_equal(
+            summ, hpathway_arm_contrast(prof, n_perm_max=1600, **kw)[1])
+        summ = summ.set_index("pathway")
+        # the planted pathway is never matched, the flat one stops early
+        self.assertEqual(int(summ.loc["SIGNAL", "n_draws"]), 1600)
+        self.assertLess(int(summ.loc["FLAT", "n_draws"]), 200)
+        self.assertAlmostEqual(float(summ.loc["SIGNAL", "p_floor"]), 1 / 1601)
+        self.assertAlmostEqual(float(summ.loc["SIGNAL", "p_exact"]), 1 / 1601)
+        stopped = grid[grid.n_draws < 1600]
+        self.assertGreater(len(stopped), 0)
+        np.testing.assert_allclose(stopped["p"], 10 / stopped["n_draws"])
+        # the first n_perm draws, and so null_ref, are those of the fixed run
+        fixed, _ = hpathway_arm_contrast(prof, **kw)
+        np.testing.assert_array_equal(grid["null_ref"], fixed["null_ref"])
+        self.assertNotIn("n_draws", fixed.columns)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,12 +2,15 @@ import os
 import sys
 import unittest
 
+import numpy as np
 import pandas as pd
 
 # Ensure the package can be imported without installation.
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from hplot.stats import compute_layer_stats, compute_layer_pvalues
+from hplot.stats import (LayerStatsAccumulator, compute_layer_stats,
+                         compute_layer_stats_multi, compute_layer_pvalues,
+                         compute_layer_pvalues_multi)
 
 
 class TestLayerStats(unittest.TestCase):
@@ -43,6 +46,101 @@ class TestLayerStats(unittest.TestCase):
             compute_layer_stats(self.df, prop="value", layer_col="missing", distance_col=None)
 
 
+class TestLayerStatsVectorised(unittest.TestCase):
+    def setUp(self):
+        r = np.random.default_rng(0)
+        n = 600
+        self.df = pd.DataFrame({
+            "layer": r.integers(-3, 5, n),
+            "a": r.normal(size=n),
+            "b": r.random(n),
+            "dist": r.normal(size=n) * 10,
+            "grp": r.choice(["x", "y", "z"], n),
+        })
+        self.df.loc[[0, 1], "dist"] = np.nan
+        self.df.loc[len(self.df)] = [9, 1.5, 0.5, 3.0, "x"]     # singleton layer
+
+    def test_matches_per_layer_reference(self):
+        out = compute_layer_stats(self.df, "a", "layer", "dist")
+        self.assertEqual(list(out.columns),
+                         ["layer", "distance", "mean", "ci_lower", "ci_upper", "n"])
+        for _, row in out.iterrows():
+            g = self.df[self.df["layer"] == row["layer"]]
+            vals = g["a"].to_numpy()
+            self.assertEqual(row["n"], len(vals))
+            self.assertAlmostEqual(row["mean"], vals.mean(), places=12)
+            self.assertAlmostEqual(row["distance"], g["dist"].mean(), places=12)
+            if len(vals) > 1:
+                from scipy.stats import t
+                half = t.ppf(0.975, len(vals) - 1) * vals.std(ddof=1) / np.sqrt(len(vals))
+                self.assertAlmostEqual(row["ci_upper"] - row["mean"], half, places=12)
+            else:
+                self.assertEqual(row["ci_lower"], row["mean"])
+
+    def test_multi_matches_single_calls(self):
+        long = compute_layer_stats_multi(self.df, ["a", "b"], "layer", "dist",
+                                         group_col="grp")
+        self.assertEqual(list(long["group"].unique()), list(self.df["grp"].unique()))
+        for (grp, target), sub in long.groupby(["group", "target"], sort=False):
+            ref = compute_layer_stats(self.df[self.df["grp"] == grp], target,
+                                      "layer", "dist")
+            got = sub.drop(columns=["group", "target"]).reset_index(drop=True)
+            pd.testing.assert_frame_equal(got, ref, check_exact=False, rtol=1e-12)
+
+
+class TestLayerStatsAccumulator(unittest.TestCase):
+    def setUp(self):
+        r = np.random.default_rng(1)
+        n = 900
+        self.df = pd.DataFrame({
+            "layer": r.integers(-4, 6, n),
+            "a": r.normal(size=n) + 50.0,
+            "b": r.random(n),
+            "dist": r.normal(size=n),
+            "grp": r.choice(["lo", "hi"], n),
+        })
+
+    def _fitted(self, targets, group):
+        from hplot import HPlot
+        return HPlot().fit(self.df, targets, "layer", group=group,
+                           distance="dist").target_grouped_stats_
+
+    def test_merged_chunks_match_fit(self):
+        import tempfile
+        from hplot import HPlot
+        for targets, group in ((["a", "b"], "grp"), ("a", None)):
+            parts = [LayerStatsAccumulator(targets, "layer", group, "dist").update(c)
+                     for c in (self.df.iloc[:250], self.df.iloc[250:600],
+                               self.df.iloc[600:])]
+            acc = parts[0].merge(parts[1]).merge(parts[2])
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "acc.npz")
+                acc.save(path)
+                acc = LayerStatsAccumulator.load(path)
+            got = HPlot.from_accumulator(acc).target_grouped_stats_
+            ref = self._fitted(targets, group)
+            self.assertEqual(list(got), list(ref))
+            for key in ref:
+                pd.testing.assert_frame_equal(got[key], ref[key].reset_index(drop=True),
+                                              check_exact=False, rtol=1e-10)
+
+    def test_fit_without_data_copy(self):
+        from hplot import HPlot
+        hp = HPlot().fit(self.df, ["a", "b"], "layer", group="grp", distance="dist",
+                         keep_data=False)
+        self.assertIsNone(hp.df_)
+        for key, stats in hp.target_grouped_stats_.items():
+            grp, target = key.split(" \u2013 ")
+            ref = compute_layer_stats(self.df[self.df["grp"] == grp], target,
+                                      "layer", "dist")
+            pd.testing.assert_frame_equal(stats, ref)
+
+    def test_merge_rejects_other_columns(self):
+        a = LayerStatsAccumulator("a", "layer")
+        with self.assertRaises(ValueError):
+            a.merge(LayerStatsAccumulator("b", "layer"))
+
+
 class TestLayerPValues(unittest.TestCase):
     def _make_df(self, a_vals, b_vals, layer=1):
         rows = [{"layer": layer, "grp": "A", "value": v} for v in a_vals]
@@ -101,6 +199,74 @@ class TestLayerPValues(unittest.TestCase):
                                     group_col="grp", correction="fdr_bh")
         self.assertIn("p_adj", out.columns)
 
+    def test_batched_matches_per_layer_scipy(self):
+        from scipy.stats import mannwhitneyu, ttest_ind
+        r = np.random.default_rng(3)
+        n = 40
+        df = pd.DataFrame({
+            "layer": np.repeat(np.arange(-3, 5), n),
+            "grp": np.tile(["A", "B"], 4 * n),
+            "x": r.normal(size=8 * n),
+            "y": r.integers(0, 3, 8 * n).astype(float),    # heavy ties
+        })
+        df.loc[r.choice(len(df), 40, replace=False), "x"] = np.nan
+        small = df.groupby(["layer", "grp"]).head(5)          # exact MWU path
+        for data in (df, small):
+            for test in ("mannwhitney", "welch"):
+                long = compute_layer_pvalues_multi(data, ["x", "y"], "layer", "grp",
+                                                   test=test, correction="fdr_bh")
+                for prop in ("x", "y"):
+                    out = compute_layer_pvalues(data, prop, "layer", "grp", test=test,
+                                                correction="fdr_bh")
+                    sub = long[long["target"] == prop].drop(columns="target")
+                    pd.testing.assert_frame_equal(sub.reset_index(drop=True), out)
+                    for _, row in out.iterrows():
+                        g = data[data["layer"] == row["layer"]]
+                        a = g.loc[g["grp"] == "A", prop].dropna().to_numpy()
+                        b = g.loc[g["grp"] == "B", prop].dropna().to_numpy()
+                        ref = (mannwhitneyu(a, b, alternative="two-sided")
+                               if test == "mannwhitney"
+                               else ttest_ind(a, b, equal_var=False))
+                        self.assertEqual(row["p_value"], ref.pvalue)
+                        self.assertEqual(row["stat"], ref.statistic)
+
+    def test_no_layers_gives_empty_frame(self):
+        df = pd.DataFrame({"layer": [np.nan, np.nan], "grp": ["A", "B"],
+                           "x": [1.0, 2.0]})
+        out = compute_layer_pvalues(df, prop="x", layer_col="layer", group_col="grp")
+        self.assertEqual(len(out), 0)
+        self.assertEqual(list(out.columns),
+                         ["layer", "distance", "p_value", "stat", "n1", "n2", "p_adj"])
+        long = compute_layer_pvalues_multi(df, ["x"], "layer", "grp")
+        self.assertEqual(len(long), 0)
+        self.assertEqual(long.columns[0], "target")
+
+    def test_permutations_match_relabelled_table(self):
+        from hplot.stats import _layer_pvalue_permutations
+        r = np.random.default_rng(5)
+        pid = np.repeat(np.arange(20), 6)
+        df = pd.DataFrame({"case_id": pid, "layer": np.tile(np.arange(-2, 4), 20),
+                           "grp": np.where(pid < 9, "A", "B"),
+                           "x": r.normal(size=pid.size)})
+        df = df.drop(index=r.choice(len(df), 10, replace=False))
+        layers, P = _layer_pvalue_permutations(df, "x", "layer", "grp",
+                                               unit_col="case_id", n_perm=3,
+                                               seed=11, batch_size=3)
+        # replay the same patient-level shuffles through the per-table path
+        units, inv = np.unique(df["case_id"].to_numpy(), return_inverse=True)
+        unit_arm = np.where(units < 9, 0, 1)
+        labels = np.random.default_rng(11).permuted(np.tile(unit_arm, (3, 1)), axis=1)
+        for k in range(3):
+            d = df.assign(grp=np.where(labels[k][inv] == 0, "A", "B"))
+            ref = compute_layer_pvalues(d, "x", "layer", "grp", groups=("A", "B"))
+            np.testing.assert_allclose(P[k], ref.set_index("layer")["p_value"]
+                                       .reindex(layers).to_numpy(), rtol=1e-12)
+        # labels move per patient, so a patient split across groups is rejected
+        bad = df.assign(grp=np.where(df.index % 2 == 0, "A", "B"))
+        with self.assertRaises(ValueError):
+            _layer_pvalue_permutations(bad, "x", "layer", "grp", unit_col="case_id",
+                                       n_perm=2)
+
 
 import numpy as np
 from scipy.stats import chi2
@@ -179,6 +345,179 @@ class TestBestBandCombined(unittest.TestCase):
         self.assertEqual((bs, be), (0, 3))
         self.assertAlmostEqual(mass, 36.0)
 
+    def test_band_scan_matches_scalar_run_loop(self):
+        from hplot.stats import _band_scan
+
+        def scalar(h, mask, min_w):
+            best, bs, be, rm, rl, start = 0.0, -1, -1, 0.0, 0, 0
+            for li in range(len(h)):
+                if mask[li]:
+                    start = li if rl == 0 else start
+                    rm += h[li]
+                    rl += 1
+                    if rl >= min_w and rm > best:
+                        best, bs, be = rm, start, li
+                else:
+                    rm, rl = 0.0, 0
+            return best, bs, be
+
+        r = np.random.default_rng(8)
+        h = r.normal(2.0, 3.0, size=(400, 9))
+        mask = r.random((400, 9)) < 0.6
+        for min_w in (1, 2, 4):
+            mass, bs, be = _band_scan(h, mask, min_w)
+            for i in range(400):
+                self.assertEqual((mass[i], bs[i], be[i]), scalar(h[i], mask[i], min_w))
+
+
+class TestClusterMassScreen(unittest.TestCase):
+    def setUp(self):
+        r = np.random.default_rng(2)
+        self.grid = np.arange(-4, 8)
+        M = r.normal(size=(90, self.grid.size))
+        self.g = r.integers(0, 3, 90)
+        M[self.g == 1, 5:8] += 0.8
+        M[r.random(M.shape) < 0.15] = np.nan
+        M[:, 2] = np.round(M[:, 2])                          # ties
+        self.mat = pd.DataFrame(M, columns=self.grid)
+
+    def test_batched_kernels_match_scalar(self):
+        from hplot.stats import (_cms_H_batch, _cms_H_from, _cms_best_band,
+                                 _cms_best_band_batch, _cms_prep)
+        _, cache = _cms_prep(self.mat, self.g >= 0, self.grid.size)
+        r = np.random.default_rng(0)
+        gp = np.stack([r.permutation(self.g) for _ in range(20)])
+        H = np.full((20, self.grid.size), np.nan)
+        for li, (R, C, N, p, _v) in enumerate(cache):
+            H[:, li] = _cms_H_batch(R, C, N, gp[:, p], 3, 20)
+            for b in range(20):
+                ref = _cms_H_from(R, C, N, gp[b, p], 3, 20)
+                self.assertTrue(ref == H[b, li] or np.isnan(ref) and np.isnan(H[b, li]))
+        for min_w in (1, 2):
+            masses = _cms_best_band_batch(H, 1.0, min_w)
+            for b in range(20):
+                self.assertEqual(masses[b], _cms_best_band(H[b], 1.0, min_w)[0])
+
+    def test_batch_size_does_not_change_result(self):
+        from hplot.stats import cluster_mass_screen
+        a = cluster_mass_screen(self.mat, self.g, 3, self.grid, n_perm=200,
+                                min_per_group=15, progress=False, batch_size=7)
+        b = cluster_mass_screen(self.mat, self.g, 3, self.grid, n_perm=200,
+                                min_per_group=15, progress=False)
+        self.assertEqual(a["perm_p"], b["perm_p"])
+        self.assertEqual(a["mass"], b["mass"])
+        self.assertGreater(a["mass"], 0)
+
+    def test_sequential_stopping_extends_only_when_rare(self):
+        from hplot.stats import cluster_mass_screen
+        kw = dict(n_perm=100, min_per_group=15, progress=False, n_perm_max=800,
+                  n_exceed=5)
+        res = cluster_mass_screen(self.mat, self.g, 3, self.grid, **kw)
+        self.assertEqual(res["n_draws"], 800)                # never matched
+        self.assertAlmostEqual(res["perm_p"], 1 / 801)
+        g_null = np.random.default_rng(2).permutation(self.g)
+        res = cluster_mass_screen(self.mat, g_null, 3, self.grid, **kw)
+        self.assertLess(res["n_draws"], 100)
+        self.assertAlmostEqual(res["perm_p"], 5 / res["n_draws"])
+
+
+class TestPermutationChunks(unittest.TestCase):
+    def test_plan_covers_draws_and_keeps_serial_stream(self):
+        from hplot._permute import plan_chunks
+        self.assertEqual(plan_chunks(10, seed=3), [(0, 10, 3)])
+        chunks = plan_chunks(10, seed=3, n_jobs=4, chunk_size=4)
+        self.assertEqual([(lo, hi) for lo, hi, _ in chunks], [(0, 4), (4, 8), (8, 10)])
+        # chunk seeds depend only on (seed, chunk index), never on n_jobs
+        again = plan_chunks(10, seed=3, n_jobs=1, chunk_size=4)
+        for (_, _, a), (_, _, b) in zip(chunks, again):
+            self.assertEqual(a.spawn_key, b.spawn_key)
+
+    def test_chunked_null_independent_of_n_jobs(self):
+        r = np.random.default_rng(4)
+        D = r.normal(size=(16, 6, 3))
+        D[:8, 2:4, 0] += 1.5
+        grid = np.arange(6)
+        a = gradient_cluster_mass_screen(D, grid, n_perm=60, min_per_group=5,
+                                         band_mode="bidirectional", chunk_size=16)
+        b = gradient_cluster_mass_screen(D, grid, n_perm=60, min_per_group=5,
+                                         band_mode="bidirectional", chunk_size=16,
+                                         n_jobs=2)
+        pd.testing.assert_frame_equal(a["wide"], b["wide"])
+        # an exhaustive null is the same enumeration whatever the split
+        c = gradient_cluster_mass_screen(D[:6], grid, n_perm=100, min_per_group=3)
+        d = gradient_cluster_mass_screen(D[:6], grid, n_perm=100, min_per_group=3,
+                                         n_jobs=2)
+        self.assertTrue(c["exact_null"])
+        pd.testing.assert_frame_equal(c["wide"], d["wide"])
+
+
+class TestSequentialStopping(unittest.TestCase):
+    def test_besag_clifford_p(self):
+        from hplot._permute import besag_clifford_p, first_hits, sequential_rounds
+        self.assertEqual(sequential_rounds(100, 700), [(0, 100), (100, 200),
+                                                       (200, 400), (400, 700)])
+        hit = np.zeros((50, 2), dtype=bool)
+        hit[[3, 9, 20], 0] = True                # third exceedance at draw 21
+        hit[7, 1] = True                         # one exceedance in 50 draws
+        p, n = besag_clifford_p(first_hits(hit, 3), 50)
+        np.testing.assert_allclose(p, [3 / 21, 2 / 51])
+        np.testing.assert_array_equal(n, [21, 50])
+
+    def test_null_units_stop_early(self):
+        r = np.random.default_rng(8)
+        D = r.normal(size=(20, 8, 30))
+        D[:, 2:5, :3] += 1.5
+        grid = np.arange(8)
+        fixed = gradient_cluster_mass_screen(D, grid, n_perm=100, seed=1)
+        off = gradient_cluster_mass_screen(D, grid, n_perm=100, seed=1,
+                                           n_perm_max=100)
+        self.assertFalse(off["sequential"])
+        pd.testing.assert_frame_equal(fixed["wide"], off["wide"])
+        seq = gradient_cluster_mass_screen(D, grid, n_perm=100, seed=1,
+                                           n_perm_max=1600, n_exceed=5)
+        self.assertTrue(seq["sequential"])
+        draws = seq["wide"].set_index("gene")["n_draws"]
+        self.assertTrue((draws[[0, 1, 2]] == 1600).all())   # planted bands
+        self.assertLess(draws.drop([0, 1, 2]).median(), 100)
+        # dominant FDR comes from the sequential p-values, not the pooled null
+        from hplot.stats import benjamini_hochberg
+        long = seq["long"]
+        np.testing.assert_allclose(long["fdr"],
+                                   benjamini_hochberg(long["permutation_p"].to_numpy()))
+
+
+class TestSignFlipZ(unittest.TestCase):
+    def test_algebraic_z_matches_direct(self):
+        from hplot.stats import (_sign_flip_moments, _signed_layer_z,
+                                 _signed_layer_z_flips)
+        r = np.random.default_rng(6)
+        D = r.normal(0.3, 1.0, size=(14, 5, 4))
+        D[r.random(D.shape) < 0.15] = np.nan
+        D[:, 0, 0] = 1.5                         # zero variance under every flip
+        D[:10, 1, 1] = np.nan                    # below the coverage gate
+        signs = r.choice((-1.0, 1.0), size=(9, 14))
+        Z = _signed_layer_z_flips(*_sign_flip_moments(D), signs, 3).reshape(9, 5, 4)
+        for b in range(9):
+            ref = _signed_layer_z(D * signs[b][:, None, None], 3)
+            np.testing.assert_array_equal(np.isnan(Z[b]), np.isnan(ref))
+            np.testing.assert_allclose(Z[b], ref, rtol=1e-12)
+
+    def test_large_offset_small_spread_matches_direct(self):
+        from hplot.stats import (_sign_flip_moments, _signed_layer_z,
+                                 _signed_layer_z_flips)
+        r = np.random.default_rng(2)
+        for spread in (1e-6, 1e-4):
+            D = 5.0 + spread * r.standard_normal((20, 3, 4))
+            D[:, 2, 3] = 5.0                         # no spread at all
+            signs = np.vstack([np.ones(20), -np.ones(20),
+                               r.choice((-1.0, 1.0), size=(4, 20))])
+            Z = _signed_layer_z_flips(*_sign_flip_moments(D), signs, 3)
+            for b in range(len(signs)):
+                ref = _signed_layer_z(D * signs[b][:, None, None], 3).ravel()
+                np.testing.assert_array_equal(np.isnan(Z[b]), np.isnan(ref))
+                # mixed signs cancel the mean itself to z ~ 1e-5, hence atol
+                np.testing.assert_allclose(Z[b], ref, rtol=1e-12, atol=1e-12)
+
 
 class TestDominanceScore(unittest.TestCase):
     def test_one_direction(self):
@@ -274,6 +613,55 @@ class TestGradientScreen(unittest.TestCase):
         for col in ("cluster_mass", "peak_layer", "fdr", "permutation_p"):
             self.assertIn(col, long.columns)
 
+    def test_streamed_counts_match_dense_null(self):
+        # the historical path kept the whole (n_draw, n_units) float32 null
+        from hplot.stats import (_band_scan, _sign_flip_block, _signed_layer_z,
+                                 benjamini_hochberg)
+        grid = np.arange(8)
+        rng = np.random.default_rng(4)
+        D = rng.normal(0.0, 1.0, size=(30, 8, 6))
+        D[:, 2:5, :3] += np.array([0.6, -0.6, 0.3])[None, None, :]
+        D[rng.random(D.shape) < 0.1] = np.nan
+        n_draw, seed, mpg = 200, 9, 10
+        signs = _sign_flip_block(np.arange(30), 30, False, 0, n_draw,
+                                 np.random.default_rng(seed))
+        sides = {"dominant": (None,), "bidirectional": (1, -1)}
+        for mode, dirs in sides.items():
+            # a loose threshold gives every unit a band and mid-range p-values
+            res = gradient_cluster_mass_screen(D, grid, band_mode=mode, n_perm=n_draw,
+                                               seed=seed, min_per_group=mpg,
+                                               cluster_alpha=0.3)
+            null = np.zeros((len(dirs), n_draw, 6), dtype=np.float32)
+            for b in range(n_draw + 1):
+                z = _signed_layer_z(D * (signs[b][:, None, None] if b < n_draw
+                                         else 1.0), mpg).T
+                h = np.nan_to_num(z ** 2, nan=0.0)
+                mass = [_band_scan(h, (h > res["thr"]) & (d is None or d * z > 0),
+                                   1)[0] for d in dirs]
+                if b < n_draw:
+                    null[:, b] = mass
+            obs = np.vstack(mass)
+            p = np.where(obs > 0, (1.0 + (null >= obs[:, None]).sum(axis=1))
+                         / (n_draw + 1.0), 1.0)
+            long = res["long"].set_index("gene")
+            if mode == "dominant":
+                flat = np.sort(null.ravel())
+                ge = flat.size - np.searchsorted(flat, obs[0], side="left")
+                order = np.argsort(-obs[0])
+                fdr_s = np.minimum(ge[order] / n_draw / np.arange(1, 7), 1.0)
+                fdr = np.empty(6)
+                fdr[order] = np.minimum.accumulate(fdr_s[::-1])[::-1]
+                fdr[obs[0] <= 0] = 1.0
+                units = long.index.to_numpy()
+                np.testing.assert_array_equal(long["permutation_p"], p[0][units])
+                np.testing.assert_array_equal(long["fdr"], fdr[units])
+                np.testing.assert_array_equal(res["wide"]["dominant_fdr"], fdr)
+            else:
+                tested = obs.T > 0                       # unit-major, elevated first
+                q = benjamini_hochberg(p.T[tested])
+                np.testing.assert_array_equal(long["permutation_p"], p.T[tested])
+                np.testing.assert_array_equal(long["fdr"], q)
+
 
 class TestDeviationTensor(unittest.TestCase):
     def setUp(self):